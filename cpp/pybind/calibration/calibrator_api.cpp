@@ -4,6 +4,10 @@
 
 void pybind_camera_calibrator(py::module &m) {
     m.def("CalibrateMultiPinholeCamera", &CalibrateMultiPinholeCamera);
+    m.def("CalibrateMultiPinholeCameraFromCorners",
+          &CalibrateMultiPinholeCameraFromCorners);
+    m.def("CalibrateMultiPinholeCameraIncremental",
+          &CalibrateMultiPinholeCameraIncremental);
 }
 
 void xrprimer_pybind_calibrator(py::module &m) {
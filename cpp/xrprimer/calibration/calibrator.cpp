@@ -91,10 +91,23 @@ bool MultiCalibrator::Push(const std::vector<std::string> &imgs) {
         findThreads[idx].join();
     }
 
-    found_corners_list.push_back(foundCorners);
+    for (size_t idx = 0; idx < camCount; idx++) {
+        if (!foundCorners[idx]) {
+            imageCornersList[idx].clear();
+        }
+    }
+
+    return PushCorners(imageCornersList);
+}
+
+bool MultiCalibrator::PushCorners(
+    const std::vector<std::vector<cv::Point2f>> &imageCornersList) {
+    std::vector<int> foundCorners(imageCornersList.size());
+    const size_t point_count = pattern_size.height * pattern_size.width;
 
     int valid = 0;
-    for (size_t idx = 0; idx < foundCorners.size(); idx++) {
+    for (size_t idx = 0; idx < imageCornersList.size(); idx++) {
+        foundCorners[idx] = imageCornersList[idx].size() == point_count;
         if (foundCorners[idx]) {
             valid++;
         } else {
@@ -103,8 +116,17 @@ bool MultiCalibrator::Push(const std::vector<std::string> &imgs) {
         }
     }
 
+    found_corners_list.push_back(foundCorners);
+
     if (valid >= 2) {
-        point2d_lists.emplace_back(imageCornersList);
+        std::vector<std::vector<cv::Point2f>> validCornersList(
+            imageCornersList.size());
+        for (size_t idx = 0; idx < imageCornersList.size(); idx++) {
+            if (foundCorners[idx]) {
+                validCornersList[idx] = imageCornersList[idx];
+            }
+        }
+        point2d_lists.emplace_back(validCornersList);
         return true;
     }
 
@@ -366,8 +388,27 @@ void MultiCalibrator::OptimizeExtrinsics() {
 
     Eigen::Vector3d point3d;
 
+    std::vector<bool> fixed_cams(pinhole_params.size(), false);
+    for (int cam_idx : fixed_cam_indices) {
+        fixed_cams[cam_idx] = true;
+    }
+
     ceres::Problem problem;
+    int skipped_frames = 0;
     for (int img_idx = 0; img_idx < point2d_lists.size(); img_idx++) {
+        // a frame seen only by fixed cameras does not affect the others
+        bool has_free_cam = false;
+        for (size_t cidx = 0; cidx < point2d_lists[img_idx].size(); cidx++) {
+            if (!point2d_lists[img_idx][cidx].empty() && !fixed_cams[cidx]) {
+                has_free_cam = true;
+                break;
+            }
+        }
+        if (!has_free_cam) {
+            skipped_frames++;
+            continue;
+        }
+
         std::vector<std::vector<Eigen::Vector2f>> point2ds(point_count);
         std::vector<std::vector<MathUtil::Matrix34f>> projs(point_count);
 
@@ -414,6 +455,17 @@ void MultiCalibrator::OptimizeExtrinsics() {
         }
     }
 
+    for (size_t idx = 0; idx < pinhole_params.size(); idx++) {
+        if (fixed_cams[idx] && problem.HasParameterBlock(rs[idx].data())) {
+            problem.SetParameterBlockConstant(rs[idx].data());
+            problem.SetParameterBlockConstant(ts[idx].data());
+        }
+    }
+    if (!fixed_cam_indices.empty()) {
+        std::cout << "Fixed cameras: " << fixed_cam_indices.size()
+                  << ", skipped frames: " << skipped_frames << std::endl;
+    }
+
     ceres::Solver::Options options;
     options.linear_solver_type = ceres::ITERATIVE_SCHUR;
     options.minimizer_type = ceres::LINE_SEARCH;
@@ -421,6 +473,7 @@ void MultiCalibrator::OptimizeExtrinsics() {
     options.minimizer_progress_to_stdout = true;
     ceres::Solver::Summary summary;
     ceres::Solve(options, &problem, &summary);
+    num_iterations = static_cast<int>(summary.iterations.size());
 
     // update
     for (size_t idx = 0; idx < pinhole_params.size(); idx++) {
@@ -435,11 +488,14 @@ void MultiCalibrator::OptimizeExtrinsics() {
     }
 }
 
-void MultiCalibrator::NormalizeCamExtrinsics() {
-    // transform camera extrinsics (use cam0 as world coordinate)
+void MultiCalibrator::NormalizeCamExtrinsics(bool keep_world) {
+    // transform camera extrinsics (use cam0 as world coordinate,
+    // or keep the current world coordinate)
     Eigen::Matrix4f RT0 = Eigen::Matrix4f::Identity();
-    RT0.topLeftCorner(3, 3) = pinhole_params[0].extrinsic_r_;
-    RT0.topRightCorner(3, 1) = pinhole_params[0].extrinsic_t_;
+    if (!keep_world) {
+        RT0.topLeftCorner(3, 3) = pinhole_params[0].extrinsic_r_;
+        RT0.topRightCorner(3, 1) = pinhole_params[0].extrinsic_t_;
+    }
 
     std::cout << "RT0:\n" << RT0 << std::endl;
 
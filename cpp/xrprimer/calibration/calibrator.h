@@ -17,10 +17,17 @@ struct MultiCalibrator {
     std::vector<std::vector<int>> found_corners_list;
     // frames/camera/points
     std::vector<std::vector<std::vector<cv::Point2f>>> point2d_lists;
+    // cameras kept unchanged by OptimizeExtrinsics
+    std::vector<int> fixed_cam_indices;
+    // iterations taken by the last OptimizeExtrinsics
+    int num_iterations = 0;
 
     void Clear() { point2d_lists.clear(); }
     bool Push(const std::vector<std::string> &image_paths);
+    // cameras/points, empty for a camera without pattern found
+    bool PushCorners(
+        const std::vector<std::vector<cv::Point2f>> &image_corners_list);
     bool Init();
     void OptimizeExtrinsics();
-    void NormalizeCamExtrinsics();
+    void NormalizeCamExtrinsics(bool keep_world = false);
 };
@@ -13,6 +13,55 @@
 #include <data_structure/camera/pinhole_camera.h>
 #include <xrprimer_export.h>
 
+static void LoadCalibConfig(const std::string &calib_config_json,
+                            MultiCalibrator &calibrator) {
+    // TODO: maybe use constructor
+    Json::Value calib_config; // will contains the root value after parsing.
+    Json::Reader reader;
+    reader.parse(calib_config_json, calib_config, false);
+    int chessboard_width = calib_config["chessboard_width"].asInt();
+    int chessboard_height = calib_config["chessboard_height"].asInt();
+    // unit: mm
+    int chessboard_square_size = calib_config["chessboard_square_size"].asInt();
+
+    calibrator.pattern_size = cv::Size(chessboard_width, chessboard_height);
+    calibrator.square_size = cv::Size2f(1e-3f * chessboard_square_size,
+                                        1e-3f * chessboard_square_size);
+}
+
+static int RunCalibration(MultiCalibrator &calibrator) {
+    if (!calibrator.Init()) {
+        std::cout
+            << "ExternalCalibrator: Can't Initialize External Param for All "
+               "Cameras!"
+            << std::endl;
+        return -1;
+    }
+    calibrator.OptimizeExtrinsics();
+    calibrator.NormalizeCamExtrinsics();
+    return calibrator.num_iterations;
+}
+
+static void
+PushCornerGroups(const std::vector<std::vector<std::vector<float>>>
+                     &corner_groups, // frames/cameras/[x, y] * points
+                 MultiCalibrator &calibrator) {
+    for (int gi = 0; gi < (int)corner_groups.size(); ++gi) {
+        std::vector<std::vector<cv::Point2f>> corners_list(
+            corner_groups[gi].size());
+        for (size_t ci = 0; ci < corner_groups[gi].size(); ++ci) {
+            const std::vector<float> &corners = corner_groups[gi][ci];
+            for (size_t pi = 0; pi + 1 < corners.size(); pi += 2) {
+                corners_list[ci].emplace_back(corners[pi], corners[pi + 1]);
+            }
+        }
+        if (!calibrator.PushCorners(corners_list)) {
+            std::cerr << "Invalid frame idx:" << gi << ", less than 2 camera!"
+                      << std::endl;
+        }
+    }
+}
+
 XRPRIMER_EXPORT
 void CalibrateMultiPinholeCamera(
     const std::string &calib_config_json,
@@ -21,21 +70,7 @@ void CalibrateMultiPinholeCamera(
     std::vector<PinholeCameraParameter> &pinhole_params) {
 
     MultiCalibrator calibrator(pinhole_params);
-    {
-        // TODO: maybe use constructor
-        Json::Value calib_config; // will contains the root value after parsing.
-        Json::Reader reader;
-        reader.parse(calib_config_json, calib_config, false);
-        int chessboard_width = calib_config["chessboard_width"].asInt();
-        int chessboard_height = calib_config["chessboard_height"].asInt();
-        // unit: mm
-        int chessboard_square_size =
-            calib_config["chessboard_square_size"].asInt();
-
-        calibrator.pattern_size = cv::Size(chessboard_width, chessboard_height);
-        calibrator.square_size = cv::Size2f(1e-3f * chessboard_square_size,
-                                            1e-3f * chessboard_square_size);
-    }
+    LoadCalibConfig(calib_config_json, calibrator);
 
     for (int gi = 0; gi < (int)img_groups.size(); ++gi) {
         std::cout << "Push frame idx: " << gi << std::endl;
@@ -44,13 +79,49 @@ void CalibrateMultiPinholeCamera(
                       << std::endl;
         }
     }
-    if (!calibrator.Init()) {
-        std::cout
-            << "ExternalCalibrator: Can't Initialize External Param for All "
-               "Cameras!"
-            << std::endl;
-        return;
+    RunCalibration(calibrator);
+}
+
+XRPRIMER_EXPORT
+int CalibrateMultiPinholeCameraFromCorners(
+    const std::string &calib_config_json,
+    const std::vector<std::vector<std::vector<float>>>
+        &corner_groups, // frames/cameras/[x, y] * points
+    std::vector<PinholeCameraParameter> &pinhole_params) {
+
+    MultiCalibrator calibrator(pinhole_params);
+    LoadCalibConfig(calib_config_json, calibrator);
+    PushCornerGroups(corner_groups, calibrator);
+    return RunCalibration(calibrator);
+}
+
+XRPRIMER_EXPORT
+int CalibrateMultiPinholeCameraIncremental(
+    const std::string &calib_config_json,
+    const std::vector<std::vector<std::vector<float>>>
+        &corner_groups, // frames/cameras/[x, y] * points
+    const std::vector<int> &fixed_cam_indices,
+    std::vector<PinholeCameraParameter> &pinhole_params) {
+
+    MultiCalibrator calibrator(pinhole_params);
+    LoadCalibConfig(calib_config_json, calibrator);
+    for (int cam_idx : fixed_cam_indices) {
+        if (cam_idx < 0 || cam_idx >= (int)pinhole_params.size()) {
+            std::cerr << "Invalid fixed camera idx:" << cam_idx << std::endl;
+            return -1;
+        }
     }
+    calibrator.fixed_cam_indices = fixed_cam_indices;
+    PushCornerGroups(corner_groups, calibrator);
+    if (calibrator.point2d_lists.empty()) {
+        std::cout << "ExternalCalibrator: No valid frame for incremental "
+                     "calibration!"
+                  << std::endl;
+        return -1;
+    }
+    // warm start from the extrinsics in pinhole_params, skip Init()
     calibrator.OptimizeExtrinsics();
-    calibrator.NormalizeCamExtrinsics();
+    // fixed cameras define the world coordinate, keep it
+    calibrator.NormalizeCamExtrinsics(!fixed_cam_indices.empty());
+    return calibrator.num_iterations;
 }
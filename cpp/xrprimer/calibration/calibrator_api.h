@@ -20,3 +20,43 @@ void CalibrateMultiPinholeCamera(
     const std::vector<std::vector<std::string>>
         &img_groups, // frames/cameras/path
     std::vector<PinholeCameraParameter> &pinhole_params);
+
+/**
+ * @brief Interface to calibrate multiple pinhole camera with chessboard
+ * corners detected in advance
+ * @param calib_config_json Config in json format for calibration
+ * @param corner_groups A vector contains multiple frames, where each frame is
+ * a vector containing corners from multiple cameras, in [x0, y0, x1, y1, ...].
+ * An empty vector stands for a camera without pattern found
+ * @param pinhole_params A vector of PinholeCameraParamter
+ * @return Number of optimization iterations, -1 if cameras cannot be
+ * initialized
+ */
+XRPRIMER_EXPORT
+int CalibrateMultiPinholeCameraFromCorners(
+    const std::string &calib_config_json,
+    const std::vector<std::vector<std::vector<float>>>
+        &corner_groups, // frames/cameras/[x, y] * points
+    std::vector<PinholeCameraParameter> &pinhole_params);
+
+/**
+ * @brief Interface to refine multiple pinhole camera with chessboard corners,
+ * warm started from the extrinsics in pinhole_params instead of solvePnP
+ * @param calib_config_json Config in json format for calibration
+ * @param corner_groups A vector contains multiple frames, where each frame is
+ * a vector containing corners from multiple cameras, in [x0, y0, x1, y1, ...].
+ * An empty vector stands for a camera without pattern found
+ * @param fixed_cam_indices Indices of cameras kept unchanged. Frames seen
+ * only by fixed cameras are skipped. If it is not empty, the fixed cameras
+ * define the world coordinate, otherwise camera 0 does
+ * @param pinhole_params A vector of PinholeCameraParamter, whose extrinsics
+ * are in world2cam direction
+ * @return Number of optimization iterations, -1 on invalid input
+ */
+XRPRIMER_EXPORT
+int CalibrateMultiPinholeCameraIncremental(
+    const std::string &calib_config_json,
+    const std::vector<std::vector<std::vector<float>>>
+        &corner_groups, // frames/cameras/[x, y] * points
+    const std::vector<int> &fixed_cam_indices,
+    std::vector<PinholeCameraParameter> &pinhole_params);
@@ -0,0 +1,139 @@
+import os
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+from xrprimer.calibration.chessboard_utils import (
+    batch_find_chessboard_corners,
+    find_chessboard_corners,
+    select_mview_frames,
+)
+
+output_dir = 'tests/data/output/calibration/test_chessboard_utils'
+
+
+@pytest.fixture(scope='module', autouse=True)
+def fixture():
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=False)
+
+
+def _draw_chessboard(x_offset: int) -> np.ndarray:
+    img = np.full(shape=(480, 640), fill_value=255, dtype=np.uint8)
+    square_size = 40
+    for row in range(8):
+        for col in range(7):
+            if (row + col) % 2 == 0:
+                top = 60 + row * square_size
+                left = x_offset + col * square_size
+                img[top:top + square_size, left:left + square_size] = 0
+    return img
+
+
+def test_find_chessboard_corners():
+    img = _draw_chessboard(x_offset=100)
+    corners = find_chessboard_corners(
+        img=img, chessboard_width=6, chessboard_height=7)
+    assert corners.shape == (42, 2)
+    assert corners.dtype == np.float32
+    # bgr image and image path
+    bgr_corners = find_chessboard_corners(
+        img=cv2.cvtColor(img, cv2.COLOR_GRAY2BGR),
+        chessboard_width=6,
+        chessboard_height=7)
+    assert np.allclose(bgr_corners, corners)
+    img_path = os.path.join(output_dir, 'chessboard.png')
+    cv2.imwrite(img_path, img)
+    path_corners = find_chessboard_corners(
+        img=img_path, chessboard_width=6, chessboard_height=7)
+    assert np.allclose(path_corners, corners)
+    # not found
+    assert find_chessboard_corners(
+        img=np.full_like(img, 128), chessboard_width=6,
+        chessboard_height=7) is None
+    assert find_chessboard_corners(
+        img='', chessboard_width=6, chessboard_height=7) is None
+
+
+def test_batch_find_chessboard_corners():
+    img_paths = []
+    for img_idx in range(4):
+        img_path = os.path.join(output_dir, f'chessboard_{img_idx:02d}.png')
+        cv2.imwrite(img_path, _draw_chessboard(x_offset=100 + img_idx * 20))
+        img_paths.append(img_path)
+    blank_path = os.path.join(output_dir, 'blank.png')
+    cv2.imwrite(blank_path, np.full((480, 640), 128, dtype=np.uint8))
+    img_paths += [blank_path, '']
+    corners_list = batch_find_chessboard_corners(
+        img_paths=img_paths,
+        chessboard_width=6,
+        chessboard_height=7,
+        n_workers=2)
+    assert len(corners_list) == len(img_paths)
+    for corners in corners_list[:4]:
+        assert corners.shape == (42, 2)
+    assert corners_list[4] is None
+    assert corners_list[5] is None
+    # cached corners, not found included
+    cache_dir = os.path.join(output_dir, 'corner_cache')
+    for _ in range(2):
+        cached_corners_list = batch_find_chessboard_corners(
+            img_paths=img_paths,
+            chessboard_width=6,
+            chessboard_height=7,
+            cache_dir=cache_dir)
+        assert len(os.listdir(cache_dir)) == 5
+        for corners, cached_corners in zip(corners_list, cached_corners_list):
+            if corners is None:
+                assert cached_corners is None
+            else:
+                assert np.all(corners == cached_corners)
+    # another pattern size, another key
+    batch_find_chessboard_corners(
+        img_paths=img_paths[:1],
+        chessboard_width=7,
+        chessboard_height=6,
+        cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 6
+
+
+def test_select_mview_frames():
+    rng = np.random.default_rng(0)
+    grid = np.stack(
+        np.meshgrid(np.arange(6), np.arange(7)), axis=-1).reshape(-1, 2)
+    n_frame, n_view = 300, 3
+    mview_corners = []
+    for _ in range(n_frame):
+        sframe_corners = []
+        for _ in range(n_view):
+            if rng.random() < 0.3:
+                sframe_corners.append(None)
+                continue
+            square_size = rng.uniform(20, 60)
+            center = rng.uniform([200, 200], [1700, 900])
+            sframe_corners.append((grid - 2.5) * square_size + center)
+        mview_corners.append(sframe_corners)
+    # a frame seen by only one view is useless
+    mview_corners.append([grid * 30.0 + 100, None, None])
+    selected_idxs, stats = select_mview_frames(
+        mview_corners=mview_corners, max_frames=40)
+    assert len(selected_idxs) == stats['n_selected_frame'] == 40
+    assert selected_idxs == sorted(set(selected_idxs))
+    assert n_frame not in selected_idxs
+    for frame_idx in selected_idxs:
+        n_found = sum(corners is not None
+                      for corners in mview_corners[frame_idx])
+        assert n_found >= 2
+    assert stats['n_frame'] == n_frame + 1
+    assert stats['n_selected_corner'] < stats['n_corner']
+    assert stats['n_view_pair'] == 3
+    # diverse frames cover all the poses before redundant ones
+    assert stats['n_selected_pose_bin'] == stats['n_pose_bin']
+    assert stats['min_pair_frames'] >= 3
+    # fewer candidates than max_frames
+    selected_idxs, stats = select_mview_frames(
+        mview_corners=mview_corners[:10], max_frames=40)
+    assert len(selected_idxs) == stats['n_valid_frame']
@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+import pytest
+
+from xrprimer.calibration.evaluation import evaluate_mview_reprojection_error
+from xrprimer.data_structure.camera import (
+    FisheyeCameraParameter,
+    PinholeCameraParameter,
+)
+
+K = [[1000.0, 0.0, 960.0], [0.0, 1000.0, 540.0], [0.0, 0.0, 1.0]]
+
+
+def _get_cameras(n_view: int, fisheye: bool = False) -> list:
+    cam_list = []
+    for view_idx in range(n_view):
+        angle = 0.3 * view_idx
+        r_mat = cv2.Rodrigues(np.array([0.0, angle, 0.0]))[0]
+        center = np.array([3 * np.sin(angle), 0.0, -3 * np.cos(angle)])
+        cam_cls = FisheyeCameraParameter if fisheye else \
+            PinholeCameraParameter
+        cam_param = cam_cls(
+            K=K,
+            R=r_mat,
+            T=-r_mat @ center,
+            name=f'cam_{view_idx:02d}',
+            height=1080,
+            width=1920,
+            world2cam=True,
+            convention='opencv')
+        if fisheye:
+            cam_param.set_dist_coeff([1e-2, -1e-3], [1e-4, 1e-4])
+        cam_list.append(cam_param)
+    return cam_list
+
+
+def _get_mview_corners(cam_list: list, n_frame: int) -> list:
+    rng = np.random.default_rng(0)
+    board = np.stack(
+        np.meshgrid(np.arange(6), np.arange(7)), axis=-1).reshape(-1, 2)
+    board = np.concatenate((board * 0.05, np.zeros((42, 1))), axis=1)
+    mview_corners = []
+    for frame_idx in range(n_frame):
+        r_mat = cv2.Rodrigues(rng.normal(0, 0.3, 3))[0]
+        points3d = board @ r_mat.T + rng.normal(0, 0.2, 3)
+        sframe_corners = []
+        for cam_param in cam_list:
+            dist_coeffs = np.array(cam_param.get_dist_coeff()) \
+                if isinstance(cam_param, FisheyeCameraParameter) else None
+            corners, _ = cv2.projectPoints(
+                points3d, np.array(cam_param.get_extrinsic_r()),
+                np.array(cam_param.get_extrinsic_t()),
+                np.array(cam_param.get_intrinsic(3)), dist_coeffs)
+            sframe_corners.append(corners.reshape(-1, 2).astype(np.float32))
+        mview_corners.append(sframe_corners)
+    return mview_corners
+
+
+def test_evaluate_mview_reprojection_error():
+    n_view, n_frame = 4, 20
+    cam_list = _get_cameras(n_view)
+    mview_corners = _get_mview_corners(cam_list, n_frame)
+    # a frame seen by only one view is not evaluated
+    mview_corners[0] = [mview_corners[0][0]] + [None] * (n_view - 1)
+    mview_corners[1][2] = None
+    # a frame with wrong corners
+    mview_corners[5][1] = mview_corners[5][1] + 20
+    # cameras returned by calibrators are cam2world
+    input_cam_list = []
+    for cam_param in cam_list:
+        cam_param = cam_param.clone()
+        cam_param.inverse_extrinsic()
+        input_cam_list.append(cam_param)
+    report = evaluate_mview_reprojection_error(mview_corners, input_cam_list)
+    assert report['corner_errors'].shape == (n_frame, n_view, 42)
+    assert report['frame_errors'].shape == (n_frame, )
+    assert report['view_errors'].shape == (n_view, )
+    assert report['n_frame'] == n_frame
+    assert report['n_valid_frame'] == n_frame - 1
+    assert np.all(np.isnan(report['corner_errors'][0]))
+    assert np.isnan(report['frame_errors'][0])
+    assert np.all(np.isnan(report['corner_errors'][1, 2]))
+    assert report['outlier_frame_idxs'] == [5]
+    clean_errors = np.delete(report['frame_errors'], [0, 5])
+    assert np.all(clean_errors < 1e-2)
+    assert report['max'] >= report['p95'] >= report['median']
+    # an explicit threshold
+    report = evaluate_mview_reprojection_error(
+        mview_corners, input_cam_list, outlier_threshold=1e3)
+    assert len(report['outlier_frame_idxs']) == 0
+    # n_view mismatch
+    with pytest.raises(ValueError):
+        evaluate_mview_reprojection_error(mview_corners, input_cam_list[:-1])
+
+
+def test_evaluate_fisheye_reprojection_error():
+    cam_list = _get_cameras(3, fisheye=True)
+    mview_corners = _get_mview_corners(cam_list, 5)
+    report = evaluate_mview_reprojection_error(mview_corners, cam_list)
+    assert report['n_valid_frame'] == 5
+    assert report['mean'] < 1e-1
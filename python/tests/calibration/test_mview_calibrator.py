@@ -42,7 +42,7 @@ def get_frame_list(n_view: int) -> list:
     return mframe_list
 
 
-def test_mview_pinhole_calibrator():
+def get_pinhole_list() -> list:
     # init pinhole parameters with intrinsic
     init_param_dir = os.path.join(input_dir, 'config')
     file_names = sorted(glob.glob(os.path.join(init_param_dir, '*.json')))
@@ -54,12 +54,21 @@ def test_mview_pinhole_calibrator():
         pinhole_param = PinholeCameraParameter(
             K=init_k, name=f'pinhole_{cam_idx:02d}', convention='opencv')
         pinhole_list.append(pinhole_param)
+    return pinhole_list
+
+
+def get_pinhole_calibrator_config() -> dict:
+    return dict(
+        mmcv.Config.fromfile('config/calibration/' +
+                             'mview_pinhole_calibrator.py'))
+
+
+def test_mview_pinhole_calibrator():
+    pinhole_list = get_pinhole_list()
     n_view = len(pinhole_list)
     mframe_list = get_frame_list(n_view)
     # test dict config
-    calibrator_config = dict(
-        mmcv.Config.fromfile('config/calibration/' +
-                             'mview_pinhole_calibrator.py'))
+    calibrator_config = get_pinhole_calibrator_config()
     calibrator = build_calibrator(calibrator_config)
     pinhole_list = calibrator.calibrate(mframe_list, pinhole_list)
     for pinhole_param in pinhole_list:
@@ -67,6 +76,91 @@ def test_mview_pinhole_calibrator():
             os.path.join(output_dir, f'{pinhole_param.name}.json'))
 
 
+def test_mview_pinhole_calibrator_corners():
+    pinhole_list = get_pinhole_list()
+    n_view = len(pinhole_list)
+    mframe_list = get_frame_list(n_view)
+    calibrator_config = get_pinhole_calibrator_config()
+    calibrator = build_calibrator(calibrator_config)
+    mview_corners = calibrator.find_mview_corners(mframe_list)
+    for mview_list, sframe_corners in zip(mframe_list, mview_corners):
+        for img_path, corners in zip(mview_list, sframe_corners):
+            if len(img_path) <= 0:
+                assert corners is None
+            elif corners is not None:
+                assert corners.shape == (calibrator.chessboard_width *
+                                         calibrator.chessboard_height, 2)
+    corner_pinhole_list = calibrator.calibrate(
+        None, pinhole_list, mview_corners=mview_corners)
+    path_pinhole_list = calibrator.calibrate(mframe_list, pinhole_list)
+    # precomputed corners are the same as corners found in calibrate
+    for corner_param, path_param in zip(corner_pinhole_list,
+                                        path_pinhole_list):
+        assert corner_param.name == path_param.name
+        assert np.allclose(
+            corner_param.get_extrinsic_t(),
+            path_param.get_extrinsic_t(),
+            atol=1e-2)
+    # calibrate on a subset of frames
+    calibrator_config['max_frames'] = max(len(mframe_list) // 2, 1)
+    calibrator = build_calibrator(calibrator_config)
+    subset_pinhole_list = calibrator.calibrate(
+        None, pinhole_list, mview_corners=mview_corners)
+    assert len(subset_pinhole_list) == len(pinhole_list)
+    with pytest.raises(ValueError):
+        calibrator.calibrate_corners([], pinhole_list)
+
+
+def test_mview_pinhole_calibrator_incremental():
+    pinhole_list = get_pinhole_list()
+    n_view = len(pinhole_list)
+    mframe_list = get_frame_list(n_view)
+    calibrator_config = get_pinhole_calibrator_config()
+    calibrator = build_calibrator(calibrator_config)
+    mview_corners = calibrator.find_mview_corners(mframe_list)
+    cold_pinhole_list = calibrator.calibrate(
+        None, pinhole_list, mview_corners=mview_corners)
+    assert calibrator.cold_start_n_iterations > 0
+    # warm start from the solution, camera 0 is fixed
+    warm_pinhole_list = calibrator.calibrate_incremental(
+        None,
+        cold_pinhole_list,
+        fixed_camera_indexes=[0],
+        mview_corners=mview_corners)
+    assert np.allclose(
+        warm_pinhole_list[0].get_extrinsic_r(),
+        cold_pinhole_list[0].get_extrinsic_r(),
+        atol=1e-5)
+    for warm_param, cold_param in zip(warm_pinhole_list, cold_pinhole_list):
+        assert warm_param.name == cold_param.name
+        assert np.allclose(
+            warm_param.get_extrinsic_t(),
+            cold_param.get_extrinsic_t(),
+            atol=1e-2)
+    # all cameras but the first one are fixed
+    warm_pinhole_list = calibrator.calibrate_incremental(
+        None,
+        cold_pinhole_list,
+        fixed_camera_indexes=list(range(1, n_view)),
+        mview_corners=mview_corners)
+    assert len(warm_pinhole_list) == n_view
+    # invalid fixed cameras
+    with pytest.raises(ValueError):
+        calibrator.calibrate_incremental(
+            None,
+            cold_pinhole_list,
+            fixed_camera_indexes=list(range(n_view)),
+            mview_corners=mview_corners)
+    with pytest.raises(ValueError):
+        calibrator.calibrate_incremental(
+            None,
+            cold_pinhole_list,
+            fixed_camera_indexes=[n_view],
+            mview_corners=mview_corners)
+    with pytest.raises(ValueError):
+        calibrator.calibrate_incremental(None, cold_pinhole_list)
+
+
 def test_mview_fisheye_calibrator():
     # init pinhole parameters with intrinsic
     init_param_dir = os.path.join(input_dir, 'config')
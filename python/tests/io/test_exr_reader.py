@@ -0,0 +1,101 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from xrprimer.io import exr_reader
+from xrprimer.io.exr_reader import ExrReader
+
+output_dir = 'tests/data/output/io/test_exr_reader'
+
+pytestmark = pytest.mark.skipif(
+    not exr_reader.has_exr, reason='OpenEXR has not been installed.')
+
+
+@pytest.fixture(scope='module', autouse=True)
+def fixture():
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=False)
+
+
+def _write_exr(exr_path: str, height: int, width: int) -> dict:
+    Imath, OpenEXR = exr_reader.Imath, exr_reader.OpenEXR
+    half = Imath.Channel(Imath.PixelType(Imath.PixelType.HALF))
+    float_ = Imath.Channel(Imath.PixelType(Imath.PixelType.FLOAT))
+    rng = np.random.default_rng(0)
+    data = dict(
+        R=rng.random((height, width)).astype(np.float16),
+        G=rng.random((height, width)).astype(np.float16),
+        B=rng.random((height, width)).astype(np.float16),
+        Z=(rng.random((height, width)) * 100).astype(np.float32))
+    header = OpenEXR.Header(width, height)
+    header['channels'] = dict(R=half, G=half, B=half, Z=float_)
+    exr_file = OpenEXR.OutputFile(exr_path, header)
+    exr_file.writePixels(
+        {name: array.tobytes()
+         for name, array in data.items()})
+    exr_file.close()
+    return data
+
+
+def test_read_channels():
+    height, width = 24, 32
+    exr_path = os.path.join(output_dir, 'test_read_channels.exr')
+    data = _write_exr(exr_path, height, width)
+    reader = ExrReader(exr_path)
+    assert reader.size == (width, height)
+    assert sorted(reader.channels) == ['B', 'G', 'R', 'Z']
+    # multi-channel output matches per-channel decoding
+    float_type = exr_reader.Imath.PixelType(exr_reader.Imath.PixelType.FLOAT)
+    channels = ['R', 'G', 'B', 'Z']
+    array = reader.read_channels(channels)
+    assert array.shape == (height, width, 4)
+    assert array.dtype == np.float32
+    for channel_idx, channel in enumerate(channels):
+        channel_array = np.frombuffer(
+            reader.file.channel(channel, float_type),
+            dtype=np.float32).reshape(height, width)
+        assert np.all(array[..., channel_idx] == channel_array)
+        assert np.all(array[..., channel_idx] == reader.read_channel(channel))
+        assert np.all(array[..., channel_idx] == data[channel])
+    # half precision, into a reused buffer
+    out = np.empty((height, width, 3), dtype=np.float16)
+    ret_array = reader.read_channels(['B', 'R', 'G'], np.float16, out=out)
+    assert ret_array is out
+    assert np.all(out[..., 0] == data['B'])
+    assert np.all(out[..., 2] == data['G'])
+    # wrong channel, dtype or buffer
+    with pytest.raises(ValueError):
+        reader.read_channels(['A'])
+    with pytest.raises(ValueError):
+        reader.read_channels(['R'], dtype=np.float64)
+    with pytest.raises(ValueError):
+        reader.read_channels(['R', 'G'], out=out)
+
+
+def test_header_parsed_once(monkeypatch):
+    exr_path = os.path.join(output_dir, 'test_header_parsed_once.exr')
+    _write_exr(exr_path, 8, 8)
+    input_file_cls = exr_reader.OpenEXR.InputFile
+    n_header_calls = [0]
+
+    class CountingInputFile:
+
+        def __init__(self, path: str):
+            self.file = input_file_cls(path)
+
+        def header(self):
+            n_header_calls[0] += 1
+            return self.file.header()
+
+        def __getattr__(self, name: str):
+            return getattr(self.file, name)
+
+    monkeypatch.setattr(exr_reader.OpenEXR, 'InputFile', CountingInputFile)
+    reader = ExrReader(exr_path)
+    reader.read_channel('R')
+    reader.read_channels(['R', 'G', 'B'])
+    assert len(reader.channels) == 4
+    assert n_header_calls[0] == 1
@@ -12,10 +12,16 @@ from xrprimer.data_structure.camera import (
 )
 from xrprimer.transform.camera.distortion import (
     FastImageUndistortor,
+    clear_undistort_maps_cache,
+    get_cached_undistort_maps,
+    get_undistort_maps,
     undistort_camera,
+    undistort_frames,
     undistort_images,
     undistort_points,
+    undistort_video,
 )
+from xrprimer.utils.ffmpeg_utils import VideoInfoReader, VideoWriter
 
 input_dir = 'tests/data/transform/camera/test_distortion'
 output_dir = 'tests/data/output/transform/camera/test_distortion'
@@ -150,3 +156,118 @@ def test_fast_undistort_images():
     cv2.imwrite(
         filename=os.path.join(output_dir, 'fast_undist_img.jpg'),
         img=undist_img)
+
+
+def test_cached_undistort_maps():
+    fisheye_param = FisheyeCameraParameter(name='distort')
+    fisheye_param.load(os.path.join(input_dir, 'dist_fisheye_param.json'))
+    fisheye_param.set_KRT(R=np.eye(3))
+    clear_undistort_maps_cache()
+    map1, map2 = get_cached_undistort_maps(fisheye_param=fisheye_param)
+    assert map1.dtype == np.int16
+    assert map1.shape == (fisheye_param.height, fisheye_param.width, 2)
+    assert not map1.flags.writeable
+    # same camera, same maps
+    cached_map1, _ = get_cached_undistort_maps(
+        fisheye_param=fisheye_param.clone())
+    assert cached_map1 is map1
+    # extrinsics do not matter
+    moved_param = fisheye_param.clone()
+    moved_param.set_KRT(T=np.ones(3))
+    cached_map1, _ = get_cached_undistort_maps(fisheye_param=moved_param)
+    assert cached_map1 is map1
+    # distortion matters
+    changed_param = fisheye_param.clone()
+    changed_param.set_dist_coeff(
+        dist_coeff_k=[0.0, 0.0, 0.0, 0.0, 0.0, 0.0], dist_coeff_p=[0.0, 0.0])
+    changed_map1, _ = get_cached_undistort_maps(fisheye_param=changed_param)
+    assert changed_map1 is not map1
+    clear_undistort_maps_cache()
+    new_map1, _ = get_cached_undistort_maps(fisheye_param=fisheye_param)
+    assert new_map1 is not map1
+    assert np.all(new_map1 == map1)
+    # the same result as cv2.undistort
+    test_img = cv2.imread(filename=os.path.join(input_dir, 'dist_img.png'))
+    new_cam_param, new_img = undistort_images(
+        distorted_cam=fisheye_param, image_array=test_img[np.newaxis])
+    cv2_img = cv2.undistort(
+        test_img,
+        np.array(fisheye_param.get_intrinsic(k_dim=3)),
+        np.array(fisheye_param.get_dist_coeff()),
+        newCameraMatrix=np.array(new_cam_param.get_intrinsic(k_dim=3)))
+    assert np.all(new_img[0] == cv2_img)
+    # selectable interpolation
+    undistortor = FastImageUndistortor(
+        fisheye_param=fisheye_param, interpolation=cv2.INTER_LINEAR)
+    assert np.all(undistortor.undistort_image(test_img) == cv2_img)
+    # nearest maps are cached apart, and sample the same pixels
+    # as floating-point maps
+    nearest_map1, nearest_map2 = get_cached_undistort_maps(
+        fisheye_param=fisheye_param, interpolation=cv2.INTER_NEAREST)
+    assert nearest_map1 is not new_map1
+    assert nearest_map2 is None
+    float_map1, float_map2 = get_undistort_maps(
+        fisheye_param=fisheye_param, m1type=cv2.CV_32FC1)
+    float_img = cv2.remap(
+        test_img, float_map1, float_map2, interpolation=cv2.INTER_NEAREST)
+    undistortor = FastImageUndistortor(fisheye_param=fisheye_param)
+    assert np.all(undistortor.undistort_image(test_img) == float_img)
+    _, nearest_img = undistort_images(
+        distorted_cam=fisheye_param,
+        image_array=test_img[np.newaxis],
+        interpolation=cv2.INTER_NEAREST)
+    assert np.all(nearest_img[0] == float_img)
+    nearest_frames = undistort_frames(
+        distorted_cam=fisheye_param,
+        frames=[test_img],
+        interpolation=cv2.INTER_NEAREST)
+    assert np.all(next(nearest_frames) == float_img)
+
+
+def test_undistort_frames():
+    fisheye_param = FisheyeCameraParameter(name='distort')
+    fisheye_param.load(os.path.join(input_dir, 'dist_fisheye_param.json'))
+    fisheye_param.set_KRT(R=np.eye(3))
+    test_img = cv2.imread(filename=os.path.join(input_dir, 'dist_img.png'))
+    test_imgs = np.stack([test_img, test_img[::-1, ::-1], test_img] * 3)
+    _, undist_imgs = undistort_images(
+        distorted_cam=fisheye_param, image_array=test_imgs)
+    # frames from a generator, buffers copied before the next one
+    frame_list = []
+    for frame in undistort_frames(
+            distorted_cam=fisheye_param,
+            frames=(img for img in test_imgs),
+            n_threads=2):
+        frame_list.append(frame.copy())
+    assert np.all(np.stack(frame_list) == undist_imgs)
+    # wrong resolution
+    with pytest.raises(ValueError):
+        list(
+            undistort_frames(
+                distorted_cam=fisheye_param, frames=[test_img[:-2]]))
+    # frames from a video
+    height = fisheye_param.height - fisheye_param.height % 2
+    width = fisheye_param.width - fisheye_param.width % 2
+    fisheye_param.height, fisheye_param.width = height, width
+    input_path = os.path.join(output_dir, 'dist_video.mp4')
+    video_writer = VideoWriter(
+        output_path=input_path, resolution=(height, width), fps=15.0)
+    for _ in range(5):
+        video_writer.write(test_img[:height, :width])
+    video_writer.close()
+    output_path = os.path.join(output_dir, 'undist_video.mp4')
+    pinhole_param = undistort_video(
+        distorted_cam=fisheye_param,
+        input_path=input_path,
+        output_path=output_path)
+    assert isinstance(pinhole_param, PinholeCameraParameter)
+    video_info = VideoInfoReader(output_path)
+    assert int(video_info['nb_frames']) == 5
+    assert int(video_info['height']) == height
+    # wrong resolution
+    fisheye_param.height += 2
+    with pytest.raises(ValueError):
+        undistort_video(
+            distorted_cam=fisheye_param,
+            input_path=input_path,
+            output_path=output_path)
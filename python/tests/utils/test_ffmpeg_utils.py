@@ -1,3 +1,4 @@
+import logging
 import os
 import shutil
 
@@ -6,12 +7,16 @@ import numpy as np
 import pytest
 
 from xrprimer.utils.ffmpeg_utils import (
+    MultiVideoReader,
     VideoInfoReader,
     VideoWriter,
     array_to_images,
     array_to_video,
+    batch_read_video_info,
     images_to_array,
     images_to_array_opencv,
+    images_to_generator_opencv,
+    images_to_sorted_images,
     pad_for_libx264,
     video_to_array,
 )
@@ -95,6 +100,54 @@ def test_images_to_array():
     assert img_arr.shape == (20, 256, 512, 3)
     img_arr = images_to_array_opencv(test_frames_dir, start=0, end=20)
     assert img_arr.shape == (20, 256, 512, 3)
+    img_arr = images_to_array_opencv(
+        test_frames_dir, start=0, end=20, stride=3, n_workers=2)
+    assert img_arr.shape == (7, 256, 512, 3)
+    assert np.all(img_arr[1] == cv2.imread(
+        os.path.join(test_frames_dir, f'{3:06d}.png')))
+    # test images_to_generator_opencv
+    n_frame = 0
+    for img in images_to_generator_opencv(
+            test_frames_dir, resolution=(128, 128), n_workers=2):
+        assert img.shape == (128, 128, 3)
+        n_frame += 1
+    assert n_frame == 25
+
+
+def test_images_to_array_unsorted():
+    unsorted_frames_dir = os.path.join(output_dir, 'test_unsorted_frames')
+    os.makedirs(unsorted_frames_dir)
+    n_frame = 36
+    for i in range(n_frame):
+        test_img = np.full(shape=(32, 64, 3), fill_value=i, dtype=np.uint8)
+        cv2.imwrite(
+            filename=os.path.join(unsorted_frames_dir, f'frame_{i * 7}.png'),
+            img=test_img)
+    img_arr = images_to_array(
+        unsorted_frames_dir, img_format=None, disable_log=True)
+    assert img_arr.shape == (n_frame, 32, 64, 3)
+    # sorted by name, frame_0, frame_105, frame_112, ..., frame_98
+    sorted_indexes = sorted(
+        range(n_frame), key=lambda index: f'frame_{index * 7}.png')
+    assert img_arr[:, 0, 0, 0].tolist() == sorted_indexes
+    assert img_arr[1, 0, 0, 0] == 15
+    img_arr = images_to_array(
+        unsorted_frames_dir, img_format=None, start=2, end=5)
+    assert img_arr.shape == (3, 32, 64, 3)
+    assert img_arr[:, 0, 0, 0].tolist() == sorted_indexes[2:5]
+    # no temp folder with copied images
+    assert not os.path.exists(unsorted_frames_dir + '_temp')
+    # input images are kept, only temporary files are removed
+    img_arr = images_to_array(
+        unsorted_frames_dir, img_format=None, remove_raw_files=True)
+    assert img_arr.shape == (n_frame, 32, 64, 3)
+    assert len(os.listdir(unsorted_frames_dir)) == n_frame
+    # test symlink sorting
+    sorted_frames_dir = os.path.join(output_dir, 'test_sorted_links')
+    img_format = images_to_sorted_images(
+        unsorted_frames_dir, sorted_frames_dir, use_symlink=True)
+    assert img_format == '%06d.png'
+    assert os.path.islink(os.path.join(sorted_frames_dir, '000000.png'))
 
 
 def test_array_to_images():
@@ -112,6 +165,21 @@ def test_array_to_images():
     with pytest.raises(NotImplementedError):
         path = os.path.join(output_dir, 'test_array_to_images_resolution')
         array_to_images(img_arr, output_folder=path, resolution=(512, 1024))
+    # test generator input
+    path = os.path.join(output_dir, 'test_array_to_images_generator')
+    array_to_images((frame for frame in img_arr), output_folder=path)
+    assert len(os.listdir(path)) == 3
+    # test n_frames
+    path = os.path.join(output_dir, 'test_array_to_images_n_frames')
+    array_to_images(list(img_arr), output_folder=path, n_frames=2)
+    assert len(os.listdir(path)) == 2
+    # test empty or wrong input
+    with pytest.raises(ValueError):
+        array_to_images(iter([]), output_folder=path)
+    with pytest.raises(ValueError):
+        array_to_images([img_arr[0], img_arr[0, :128]], output_folder=path)
+    with pytest.raises(TypeError):
+        array_to_images(0, output_folder=path)
 
 
 def test_array_to_video():
@@ -136,3 +204,94 @@ def test_array_to_video():
     reader = VideoInfoReader(path)
     assert int(reader['nb_frames']) == 3
     assert int(reader['avg_frame_rate'].split('/')[0]) == 10
+    # test generator input with odd size
+    path = os.path.join(output_dir, 'test_array_to_video_generator.mp4')
+    array_to_video((frame[:255, :511] for frame in img_arr), output_path=path)
+    reader = VideoInfoReader(path)
+    assert int(reader['nb_frames']) == 3
+    assert int(reader['height']) == 256
+    assert int(reader['width']) == 512
+    # test n_frames
+    path = os.path.join(output_dir, 'test_array_to_video_n_frames.mp4')
+    array_to_video(img_arr, output_path=path, n_frames=2)
+    reader = VideoInfoReader(path)
+    assert int(reader['nb_frames']) == 2
+
+
+def test_multi_video_reader():
+    test_video_path = os.path.join(output_dir, 'test_video.mp4')
+    # test synchronized frames
+    reader = MultiVideoReader([test_video_path, test_video_path])
+    assert len(reader) == 75
+    mview_frame = reader.get_next_frame()
+    assert mview_frame.shape == (2, 256, 512, 3)
+    assert np.all(mview_frame[0] == mview_frame[1])
+    n_frame = 1
+    for mview_frame in reader:
+        n_frame += 1
+    assert n_frame == 75
+    assert reader.get_next_frame() is None
+    latency = reader.get_latency()
+    assert latency['decode'].shape == (2, )
+    assert latency['wait'].shape == (2, )
+    reader.close()
+    # test resolution and range
+    reader = MultiVideoReader([test_video_path, test_video_path],
+                              resolution=(128, 128),
+                              start=0,
+                              end=20,
+                              n_prefetch=2)
+    mview_frame = reader.get_next_frame()
+    assert mview_frame.shape == (2, 128, 128, 3)
+    # test dump frames for calibrators, numbered after the frame read
+    frames = reader.dump_frames(
+        os.path.join(output_dir, 'test_multi_video_reader'), interval=5)
+    assert len(frames) == 3
+    assert len(frames[0]) == 2
+    assert os.path.exists(frames[0][0])
+    assert os.path.basename(frames[0][1]) == 'frame_000005_view_001.png'
+    reader.close()
+    # test empty input
+    with pytest.raises(ValueError):
+        MultiVideoReader([])
+
+
+def test_video_info_cache():
+    test_video_path = os.path.join(output_dir, 'test_video.mp4')
+    VideoInfoReader.clear_cache()
+    # test cache hit, the same stream is returned without probing
+    reader = VideoInfoReader(test_video_path)
+    assert int(reader['width']) == 512
+    cached_reader = VideoInfoReader(test_video_path)
+    assert cached_reader.video_stream is reader.video_stream
+    # test logger as the second positional argument
+    logger = logging.getLogger('test_video_info_cache')
+    assert VideoInfoReader(test_video_path, logger).logger is logger
+    uncached_reader = VideoInfoReader(test_video_path, use_cache=False)
+    assert uncached_reader.video_stream is not reader.video_stream
+    assert uncached_reader.video_stream == reader.video_stream
+    # test cache miss after the file is changed
+    copied_path = os.path.join(output_dir, 'test_video_info_cache.mp4')
+    shutil.copy(test_video_path, copied_path)
+    reader = VideoInfoReader(copied_path)
+    os.utime(copied_path, ns=(0, 0))
+    assert VideoInfoReader(copied_path).video_stream is not \
+        reader.video_stream
+    # test sidecar
+    VideoInfoReader.clear_cache()
+    sidecar_path = copied_path + VideoInfoReader.SIDECAR_SUFFIX
+    reader = VideoInfoReader(copied_path, use_sidecar=True)
+    assert os.path.exists(sidecar_path)
+    VideoInfoReader.clear_cache()
+    sidecar_reader = VideoInfoReader(
+        copied_path, use_cache=False, use_sidecar=True)
+    assert sidecar_reader.video_stream == reader.video_stream
+    # test batch read
+    VideoInfoReader.clear_cache()
+    readers = batch_read_video_info(
+        [test_video_path, copied_path] * 4, n_workers=4)
+    assert len(readers) == 8
+    for reader in readers:
+        assert int(reader['height']) == 256
+    with pytest.raises(FileNotFoundError):
+        batch_read_video_info([test_video_path, 'missing_video.mp4'])
@@ -0,0 +1,73 @@
+import os
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+from xrprimer.utils.image_writer_utils import ImageWriter
+
+output_dir = 'tests/data/output/utils/test_image_writer_utils'
+
+
+@pytest.fixture(scope='module', autouse=True)
+def fixture():
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=False)
+
+
+def test_image_writer():
+    img_arr = np.random.randint(
+        low=0, high=255, size=(20, 64, 128, 3), dtype=np.uint8)
+    # test writing png and flush
+    writer = ImageWriter(n_workers=4, queue_size=2)
+    for frame_idx in range(len(img_arr)):
+        writer.write(
+            os.path.join(output_dir, f'{frame_idx:06d}.png'),
+            img_arr[frame_idx])
+    writer.flush()
+    assert len(os.listdir(output_dir)) == 20
+    for frame_idx in range(len(img_arr)):
+        img = cv2.imread(os.path.join(output_dir, f'{frame_idx:06d}.png'))
+        assert np.all(img == img_arr[frame_idx])
+    writer.close()
+    # test writing after close
+    with pytest.raises(ValueError):
+        writer.write(os.path.join(output_dir, 'closed.png'), img_arr[0])
+    # test copy, the image can be modified after write()
+    path = os.path.join(output_dir, 'copy.png')
+    canvas = img_arr[0].copy()
+    with ImageWriter(n_workers=1) as writer:
+        writer.write(path, canvas, copy=True)
+        canvas[:] = 0
+    assert np.all(cv2.imread(path) == img_arr[0])
+    # test png compression
+    smooth_img = np.zeros(shape=(256, 256, 3), dtype=np.uint8)
+    smooth_img[:, 128:] = 255
+    fast_path = os.path.join(output_dir, 'compression_0.png')
+    small_path = os.path.join(output_dir, 'compression_9.png')
+    with ImageWriter(png_compression=0) as writer:
+        writer.write(fast_path, smooth_img)
+    with ImageWriter(png_compression=9) as writer:
+        writer.write(small_path, smooth_img)
+    assert os.path.getsize(small_path) < os.path.getsize(fast_path)
+    # test jpeg quality
+    low_path = os.path.join(output_dir, 'quality_10.jpg')
+    high_path = os.path.join(output_dir, 'quality_100.jpg')
+    with ImageWriter(jpeg_quality=10) as writer:
+        writer.write(low_path, img_arr[0])
+    with ImageWriter(jpeg_quality=100) as writer:
+        writer.write(high_path, img_arr[0])
+    assert os.path.getsize(low_path) < os.path.getsize(high_path)
+    # test wrong args
+    with pytest.raises(ValueError):
+        ImageWriter(png_compression=10)
+    with pytest.raises(ValueError):
+        ImageWriter(jpeg_quality=101)
+    # test failed writing
+    with pytest.raises(Exception):
+        with ImageWriter() as writer:
+            writer.write(
+                os.path.join(output_dir, 'missing_dir', 'fail.png'),
+                img_arr[0])
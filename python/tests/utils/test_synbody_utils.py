@@ -0,0 +1,307 @@
+import json
+import os
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+# synbody_utils requires packages in requirements/synbody.txt
+synbody_utils = pytest.importorskip(
+    'xrprimer.utils.synbody_utils',
+    reason='requirements/synbody.txt has not been installed.')
+
+output_dir = 'tests/data/output/utils/test_synbody_utils'
+n_frame = 12
+
+
+@pytest.fixture(scope='module', autouse=True)
+def fixture():
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=False)
+
+
+def _write_sequence(sequence_dir: str, n_frame: int) -> None:
+    camera_actor = dict(fov=90.0, rotation=[0.0] * 3, location=[0.0] * 3)
+    seq_data = dict(
+        Actors=dict(
+            CharacterActors=dict(
+                actor_0=dict(
+                    name='actor_0',
+                    location=[100.0, 200.0, 0.0],
+                    rotation=[90.0, 0.0, 0.0],
+                    mask_rgb_value=[255, 0, 0],
+                    smplx='actor_0.npz'),
+                actor_1=dict(
+                    name='actor_1',
+                    location=[-300.0, 0.0, 50.0],
+                    rotation=[-45.0, 10.0, 30.0],
+                    mask_rgb_value=[0, 255, 0],
+                    smplx='actor_1.npz')),
+            CameraActor=camera_actor))
+    os.makedirs(sequence_dir, exist_ok=True)
+    with open(os.path.join(sequence_dir, 'seq_data.json'), 'w') as f_write:
+        json.dump(seq_data, f_write)
+    for modal, suffix in (('rgb', '.jpeg'), ('normal', '.png')):
+        os.makedirs(os.path.join(sequence_dir, modal), exist_ok=True)
+        for frame in range(1, n_frame + 1):
+            # every frame differs, so that frame order can be checked
+            img = np.full((16, 24, 3), frame * 10, dtype=np.uint8)
+            img[:, :, 1] = np.arange(24, dtype=np.uint8) * frame
+            cv2.imwrite(
+                os.path.join(sequence_dir, modal, f'{frame:04d}{suffix}'), img)
+    os.makedirs(os.path.join(sequence_dir, 'smplx'), exist_ok=True)
+    for actor_idx in range(2):
+        _write_smplx(
+            os.path.join(sequence_dir, 'smplx', f'actor_{actor_idx}.npz'),
+            n_frame=n_frame,
+            seed=actor_idx)
+
+
+def _write_smplx(smplx_path: str, n_frame: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    global_orient = rng.uniform(-2, 2, size=(n_frame + 1, 3))
+    # rest pose and a tiny rotation
+    global_orient[0] = 0
+    global_orient[1] = 1e-5
+    humandata_smplx = dict(
+        global_orient=global_orient.astype(np.float32),
+        transl=rng.uniform(-1, 1, size=(n_frame + 1, 3)).astype(np.float32),
+        betas=rng.uniform(-1, 1, size=(10, )).astype(np.float32),
+        body_pose=rng.uniform(-1, 1,
+                              size=(n_frame + 1, 63)).astype(np.float32),
+        gender='neutral')
+    np.savez(smplx_path, smplx=humandata_smplx)
+    return humandata_smplx
+
+
+def test_get_modal_range():
+    sequence_dir = os.path.join(output_dir, 'test_get_modal_range')
+    _write_sequence(sequence_dir, n_frame)
+    reader = synbody_utils.SynbodyReader(
+        os.path.join(sequence_dir, 'seq_data.json'))
+    for modal in (reader.RGB, reader.NORMAL):
+        get_frame = reader.get_rgb if modal == reader.RGB \
+            else reader.get_normal
+        sequential_frames = np.stack(
+            [get_frame(frame) for frame in range(1, n_frame + 1)])
+        # threaded loading gives the same frames in the same order
+        threaded_frames = reader.get_modal_range(modal, n_workers=4)
+        assert threaded_frames.shape == (n_frame, 16, 24, 3)
+        assert np.all(threaded_frames == sequential_frames)
+        single_thread_frames = reader.get_modal_range(modal, n_workers=1)
+        assert np.all(single_thread_frames == sequential_frames)
+        generated_frames = list(
+            reader.get_modal_range(modal, n_workers=4, return_generator=True))
+        assert len(generated_frames) == n_frame
+        assert np.all(np.stack(generated_frames) == sequential_frames)
+        # start, end and stride
+        strided_frames = reader.get_modal_range(
+            modal, start=2, end=10, stride=3, n_workers=4)
+        assert len(strided_frames) == 3
+        assert np.all(strided_frames == sequential_frames[1:9:3])
+    # normal maps are lossless
+    normal_frames = reader.get_normal_range(n_workers=4)
+    for frame_idx, normal_frame in enumerate(normal_frames):
+        assert np.all(normal_frame[:, :, 0] == (frame_idx + 1) * 10)
+    rgb_frames = reader.get_rgb_range(n_workers=4)
+    assert np.all(rgb_frames == reader.get_modal_range(reader.RGB))
+
+
+def test_get_modal_range_out_of_range():
+    sequence_dir = os.path.join(output_dir,
+                                'test_get_modal_range_out_of_range')
+    _write_sequence(sequence_dir, n_frame)
+    reader = synbody_utils.SynbodyReader(
+        os.path.join(sequence_dir, 'seq_data.json'))
+    # empty range
+    empty_frames = reader.get_rgb_range(start=5, end=5)
+    assert len(empty_frames) == 0
+    assert len(
+        list(reader.get_rgb_range(start=5, end=5, return_generator=True))) == 0
+    assert len(reader.get_rgb_range(start=n_frame + 1)) == 0
+    # frames not found
+    with pytest.raises(ValueError):
+        reader.get_rgb_range(start=1, end=n_frame + 2)
+    with pytest.raises(ValueError):
+        reader.get_rgb_range(start=0, end=3)
+    with pytest.raises(ValueError):
+        reader.get_rgb(n_frame + 1)
+    # folder or modal not found
+    with pytest.raises(ValueError):
+        reader.get_mask_range()
+    with pytest.raises(ValueError):
+        reader.get_modal_range('not_a_modal')
+
+
+def _get_smplx_per_frame(reader) -> list:
+    """Placements of actors applied by scipy, actor by actor."""
+    from scipy.spatial.transform import Rotation as spRotation
+    smplx = []
+    for actor_data in reader.seq_data_reader.get_actors():
+        actor_rot = spRotation.from_rotvec(actor_data['global_orient'])
+        humandata_smplx = np.load(
+            reader.sequence_dir / 'smplx' / actor_data['smplx'],
+            allow_pickle=True)['smplx'].item()
+        global_rot = actor_rot * spRotation.from_rotvec(
+            humandata_smplx['global_orient'])
+        humandata_smplx['global_orient'] = global_rot.as_rotvec().astype(
+            np.float32)
+        transl = humandata_smplx['transl']
+        humandata_smplx['transl'] = actor_rot.apply(
+            transl - transl[0, :]) + transl[0, :] + actor_data['transl']
+        smplx.append(humandata_smplx)
+    return smplx
+
+
+def _assert_smplx_close(smplx: dict, expected_smplx: dict) -> None:
+    for key, value in expected_smplx.items():
+        if not isinstance(value, np.ndarray):
+            continue
+        assert np.shape(smplx[key]) == value.shape
+        assert np.allclose(smplx[key], value, atol=1e-5)
+
+
+def test_get_smplx():
+    sequence_dir = os.path.join(output_dir, 'test_get_smplx')
+    _write_sequence(sequence_dir, n_frame)
+    mmap_dir = os.path.join(output_dir, 'test_get_smplx_mmap')
+    reader = synbody_utils.SynbodyReader(
+        os.path.join(sequence_dir, 'seq_data.json'))
+    expected_smplx_list = _get_smplx_per_frame(reader)
+    for kwargs in (dict(), dict(mmap_dir=mmap_dir)):
+        # per actor
+        smplx_list = reader.get_smplx(**kwargs)
+        assert len(smplx_list) == len(expected_smplx_list)
+        for smplx, expected_smplx in zip(smplx_list, expected_smplx_list):
+            _assert_smplx_close(smplx, expected_smplx)
+            assert smplx['gender'] == expected_smplx['gender']
+            assert smplx['global_orient'].dtype == np.float32
+        # batched
+        smplx_batch = reader.get_smplx_batch(**kwargs)
+        assert smplx_batch['transl'].shape == (2, n_frame + 1, 3)
+        assert smplx_batch['betas'].shape == (2, 10)
+        assert 'gender' not in smplx_batch
+        for actor_idx, expected_smplx in enumerate(expected_smplx_list):
+            _assert_smplx_close(
+                {key: value[actor_idx]
+                 for key, value in smplx_batch.items()}, expected_smplx)
+    # memory-mapped from the cache
+    smplx = reader.get_smplx(mmap_dir=mmap_dir)[0]
+    assert isinstance(smplx['body_pose'], np.memmap)
+    assert len(os.listdir(mmap_dir)) == 2
+
+
+def test_get_smplx_cache():
+    sequence_dir = os.path.join(output_dir, 'test_get_smplx_cache')
+    _write_sequence(sequence_dir, n_frame)
+    mmap_dir = os.path.join(output_dir, 'test_get_smplx_cache_mmap')
+    seq_data_path = os.path.join(sequence_dir, 'seq_data.json')
+    smplx_path = os.path.join(sequence_dir, 'smplx', 'actor_0.npz')
+    reader = synbody_utils.SynbodyReader(seq_data_path)
+    for kwargs in (dict(), dict(mmap_dir=mmap_dir)):
+        # a cache hit returns the same data
+        smplx = reader.get_smplx(**kwargs)[0]
+        cached_smplx = reader.get_smplx(**kwargs)[0]
+        for key in ('global_orient', 'transl', 'body_pose', 'betas'):
+            assert np.all(cached_smplx[key] == smplx[key])
+        if 'mmap_dir' in kwargs:
+            # memory maps are shared and read-only
+            assert cached_smplx['body_pose'] is smplx['body_pose']
+            assert not smplx['body_pose'].flags.writeable
+        else:
+            # copies can be edited in place
+            assert cached_smplx['body_pose'] is not smplx['body_pose']
+            smplx['body_pose'][:] = 0
+            smplx['betas'] *= 2
+            assert np.all(
+                reader.get_smplx()[0]['betas'] == cached_smplx['betas'])
+        smplx_batch = reader.get_smplx_batch(**kwargs)
+        assert np.all(
+            reader.get_smplx_batch(
+                **kwargs)['transl'] == smplx_batch['transl'])
+    # a changed npz file is read again by a new reader
+    stat = os.stat(smplx_path)
+    new_smplx = _write_smplx(smplx_path, n_frame=n_frame, seed=10)
+    os.utime(smplx_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    new_reader = synbody_utils.SynbodyReader(seq_data_path)
+    for kwargs in (dict(), dict(mmap_dir=mmap_dir)):
+        assert np.all(
+            new_reader.get_smplx(
+                **kwargs)[0]['body_pose'] == new_smplx['body_pose'])
+        assert np.all(
+            new_reader.get_smplx_batch(
+                **kwargs)['betas'][0] == new_smplx['betas'])
+        assert not np.all(new_smplx['body_pose'] == smplx['body_pose'])
+    assert len(os.listdir(mmap_dir)) == 3
+    # actors of different number of frames can not be batched
+    _write_smplx(smplx_path, n_frame=n_frame + 1, seed=0)
+    with pytest.raises(ValueError):
+        synbody_utils.SynbodyReader(seq_data_path).get_smplx_batch()
+
+
+def test_synbody_index(monkeypatch):
+    dataset_dir = os.path.join(output_dir, 'test_synbody_index')
+    sequence_dirs = ['scene_0/seq_0', 'scene_1/seq_0']
+    for sequence_dir in sequence_dirs:
+        _write_sequence(os.path.join(dataset_dir, sequence_dir), n_frame)
+    index_path = os.path.join(output_dir, 'test_synbody_index.jsonl')
+    index = synbody_utils.build_synbody_index(
+        dataset_dir, index_path=index_path, n_workers=2)
+    assert [entry['sequence_dir'] for entry in index] == sequence_dirs
+    assert synbody_utils.load_synbody_index(index_path) == index
+    entry = index[0]
+    assert entry['n_frames'] == dict(rgb=n_frame, normal=n_frame)
+    assert entry['modal_files']['rgb']['frames'] == {'.jpeg': [[1, 13]]}
+    assert entry['modal_files']['smplx']['others'] == \
+        ['actor_0.npz', 'actor_1.npz']
+    assert entry['actor_names'] == ['actor_0', 'actor_1']
+    # reopen a sequence from the index without listing its folders
+    reader = synbody_utils.SynbodyReader(
+        os.path.join(dataset_dir, sequence_dirs[0], 'seq_data.json'))
+    rgb_frames = reader.get_rgb_range()
+    smplx_batch = reader.get_smplx_batch()
+    with monkeypatch.context() as patch:
+        patch.setattr(synbody_utils.os, 'listdir', None)
+        index_reader = synbody_utils.SynbodyReader.from_index_entry(
+            entry, dataset_dir)
+        assert np.all(index_reader.get_rgb(3) == rgb_frames[2])
+        assert np.all(index_reader.get_rgb_range(n_workers=4) == rgb_frames)
+        assert np.all(
+            index_reader.get_smplx_batch()['transl'] == smplx_batch['transl'])
+        assert np.allclose(index_reader.get_camera().get_intrinsic(),
+                           entry['camera']['K'])
+
+
+def test_synbody_index_stale():
+    dataset_dir = os.path.join(output_dir, 'test_synbody_index_stale')
+    sequence_dirs = ['seq_0', 'seq_1']
+    for sequence_dir in sequence_dirs:
+        _write_sequence(os.path.join(dataset_dir, sequence_dir), n_frame)
+    index = synbody_utils.build_synbody_index(dataset_dir)
+    # a frame removed after indexing
+    os.remove(os.path.join(dataset_dir, 'seq_0', 'rgb', '0005.jpeg'))
+    reader = synbody_utils.SynbodyReader.from_index_entry(
+        index[0], dataset_dir)
+    with pytest.raises(ValueError):
+        reader.get_rgb(5)
+    with pytest.raises(ValueError):
+        reader.get_rgb_range(n_workers=4)
+    # a frame not in the index
+    with pytest.raises(ValueError):
+        reader.get_rgb(n_frame + 1)
+    # a modal not in the index
+    with pytest.raises(ValueError):
+        reader.get_mask(1)
+    # a frame written after indexing is found on disk
+    shutil.copy(
+        os.path.join(dataset_dir, 'seq_0', 'rgb', '0001.jpeg'),
+        os.path.join(dataset_dir, 'seq_0', 'rgb', f'{n_frame + 1:04d}.jpeg'))
+    assert np.all(reader.get_rgb(n_frame + 1) == reader.get_rgb(1))
+    # a sequence removed after indexing
+    shutil.rmtree(os.path.join(dataset_dir, 'seq_1'))
+    reader = synbody_utils.SynbodyReader.from_index_entry(
+        index[1], dataset_dir)
+    with pytest.raises(ValueError):
+        reader.get_rgb(1)
@@ -13,6 +13,7 @@ from xrprimer.data_structure.keypoints import Keypoints
 from xrprimer.visualization.keypoints.visualize_keypoints3d import (
     visualize_keypoints3d,
     visualize_keypoints3d_projected,
+    visualize_keypoints3d_projected_mview,
 )
 
 # yapf: enable
@@ -102,6 +103,54 @@ def test_visualize_keypoints3d_projected():
             background_dir=background_dir)
 
 
+def test_visualize_keypoints3d_projected_mview():
+    scene_dir = os.path.join(input_dir, 'Shelf_unittest',
+                             'xrmocap_meta_perception2d', 'scene_0')
+    keypoints3d = Keypoints.fromfile(
+        os.path.join(scene_dir, 'keypoints3d_GT.npz'))
+    n_frame = keypoints3d.get_frame_number()
+    cameras = [
+        FisheyeCameraParameter.fromfile(
+            os.path.join(scene_dir, 'camera_parameters',
+                         f'fisheye_param_{view_idx:02d}.json'))
+        for view_idx in range(3)
+    ]
+    background_dirs = [
+        os.path.join(input_dir, 'Shelf_unittest', f'Camera{view_idx}')
+        for view_idx in range(3)
+    ]
+    # test 3 views in a 2x2 mosaic
+    output_path = os.path.join(output_dir, 'test_projected_mview.mp4')
+    mosaic_arr = visualize_keypoints3d_projected_mview(
+        keypoints=keypoints3d,
+        cameras=cameras,
+        output_path=output_path,
+        return_array=True,
+        background_dirs=background_dirs,
+        tile_resolution=(cameras[0].height // 2, cameras[0].width // 2))
+    assert mosaic_arr.shape[0] == n_frame
+    assert mosaic_arr.shape[1] == cameras[0].height // 2 * 2
+    # the same as a single view projection
+    sview_arr = visualize_keypoints3d_projected(
+        keypoints=keypoints3d,
+        camera=cameras[0],
+        output_path=os.path.join(output_dir, 'test_projected_sview.mp4'),
+        return_array=True,
+        background_dir=background_dirs[0])
+    tile_arr = mosaic_arr[:, :cameras[0].height // 2, :cameras[0].width // 2]
+    assert tile_arr.shape[1:] == (cameras[0].height // 2,
+                                  cameras[0].width // 2, 3)
+    assert sview_arr.shape[0] == n_frame
+    # Plot neither points nor lines
+    with pytest.raises(ValueError):
+        visualize_keypoints3d_projected_mview(
+            keypoints=keypoints3d,
+            cameras=cameras,
+            output_path=output_path,
+            plot_points=False,
+            plot_lines=False)
+
+
 def test_visualize_keypoints3d_sperson():
     keypoints3d_path = os.path.join(output_dir, 'keypoints_3d_32f_1p.npz')
     keypoints3d = Keypoints.fromfile(keypoints3d_path)
@@ -202,3 +251,27 @@ def test_visualize_keypoints3d_axis():
         plot_lines=True,
         plot_axis=True,
         dpi=_DPI)
+
+
+def test_visualize_keypoints3d_rasterizer():
+    keypoints3d_path = os.path.join(output_dir, 'keypoints_3d_32f_2p.npz')
+    keypoints3d = Keypoints.fromfile(keypoints3d_path)
+    output_path = os.path.join(output_dir, 'test_ply_plot_rasterizer.mp4')
+    mpl_arr = visualize_keypoints3d(
+        keypoints=keypoints3d,
+        output_path=output_path,
+        return_array=True,
+        plot_axis=True,
+        dpi=_DPI)
+    raster_arr = visualize_keypoints3d(
+        keypoints=keypoints3d,
+        output_path=output_path,
+        return_array=True,
+        plot_axis=True,
+        dpi=_DPI,
+        backend='rasterizer')
+    assert raster_arr.shape == mpl_arr.shape
+    # test wrong backend
+    with pytest.raises(ValueError):
+        visualize_keypoints3d(
+            keypoints=keypoints3d, output_path=output_path, backend='opengl')
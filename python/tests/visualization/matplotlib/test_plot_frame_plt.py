@@ -5,7 +5,7 @@ import cv2
 import numpy as np
 import pytest
 
-from xrprimer.visualization.matplotlib import plot_frame
+from xrprimer.visualization.matplotlib import MatplotlibRenderer, plot_frame
 from xrprimer.visualization.palette.line_palette import LinePalette
 from xrprimer.visualization.palette.point_palette import PointPalette
 
@@ -88,3 +88,42 @@ def test_points_and_lines() -> None:
     img_arr = plot_frame(
         point_palette=point_palette, line_palette=line_palette)
     cv2.imwrite(os.path.join(output_dir, 'points_and_lines.jpg'), img_arr)
+
+
+def test_renderer() -> None:
+    point_array = np.random.uniform(low=0, high=100, size=(10, 3))
+    conn_array = np.stack((np.arange(9), np.arange(1, 10)), axis=1)
+    point_palette = PointPalette(point_array=point_array)
+    line_palette = LinePalette(
+        conn_array=conn_array,
+        point_array=point_array,
+        color_array=[0, 255, 0])
+    visual_range = np.array([[0, 100], [0, 100], [0, 100]])
+    renderer = MatplotlibRenderer(dpi=50)
+    # test frames from a reused renderer are the same as new ones
+    for cam_longtitude in (0, 45, 90):
+        img_arr = plot_frame(
+            point_palette=point_palette,
+            line_palette=line_palette,
+            visual_range=visual_range,
+            cam_longtitude=cam_longtitude,
+            renderer=renderer)
+        ref_arr = plot_frame(
+            point_palette=point_palette,
+            line_palette=line_palette,
+            visual_range=visual_range,
+            cam_longtitude=cam_longtitude,
+            dpi=50)
+        assert img_arr.shape == ref_arr.shape
+        assert img_arr.shape[-1] == 3
+        assert np.all(img_arr == ref_arr)
+    # test masked points and lines are removed from the renderer
+    point_palette.set_point_mask(np.zeros(shape=(10, 1)))
+    line_palette.set_conn_mask(np.zeros(shape=(9, 1)))
+    empty_arr = plot_frame(
+        point_palette=point_palette,
+        line_palette=line_palette,
+        visual_range=visual_range,
+        renderer=renderer)
+    assert not np.all(empty_arr == img_arr)
+    renderer.close()
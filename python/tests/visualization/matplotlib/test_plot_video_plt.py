@@ -5,6 +5,8 @@ import numpy as np
 import pytest
 
 from xrprimer.visualization.matplotlib import plot_video
+from xrprimer.visualization.matplotlib.plot_frame import _get_visual_range
+from xrprimer.visualization.matplotlib.plot_video import _get_mframe_points3d
 from xrprimer.visualization.palette import LinePalette, PointPalette
 
 output_dir = 'tests/data/output/visualization/matplotlib/test_plot_video'
@@ -117,3 +119,96 @@ def test_plot_args():
     output_path = os.path.join(output_dir, 'plot_args_neither.mp4')
     with pytest.raises(ValueError):
         plot_video(output_path=output_path)
+
+
+def test_n_workers():
+    point_palette = PointPalette(point_array=np.zeros(shape=(1, 3)), )
+    n_frames = 10
+    mframe_point_data = np.zeros(shape=(n_frames, 1, 3))
+    for i in range(n_frames):
+        mframe_point_data[i] += i * 10
+    output_path = os.path.join(output_dir, 'test_n_workers_serial')
+    serial_arr = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_point_data,
+        point_palette=point_palette,
+        return_array=True,
+        dpi=50)
+    output_path = os.path.join(output_dir, 'test_n_workers_parallel')
+    parallel_arr = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_point_data,
+        point_palette=point_palette,
+        return_array=True,
+        dpi=50,
+        n_workers=2)
+    assert len(os.listdir(output_path)) == n_frames
+    assert np.all(parallel_arr == serial_arr)
+
+
+def test_return_generator():
+    point_palette = PointPalette(point_array=np.zeros(shape=(1, 3)), )
+    n_frames = 5
+    mframe_point_data = np.zeros(shape=(n_frames, 1, 3))
+    for i in range(n_frames):
+        mframe_point_data[i] += i * 10
+    output_path = os.path.join(output_dir, 'test_return_generator.mp4')
+    ref_arr = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_point_data,
+        point_palette=point_palette,
+        return_array=True,
+        dpi=50)
+    ret_value = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_point_data,
+        point_palette=point_palette,
+        return_generator=True,
+        dpi=50)
+    assert np.all(np.stack(list(ret_value)) == ref_arr)
+
+
+def test_visual_range():
+    n_frames, n_point = 200, 17
+    mframe_point_data = np.random.uniform(
+        low=-1, high=1, size=(n_frames, n_point, 3))
+    mframe_point_mask = np.random.randint(0, 2, size=(n_frames, n_point))
+    conn_array = np.stack((np.arange(n_point - 1), np.arange(1, n_point)),
+                          axis=1)
+    mframe_line_mask = np.random.randint(0, 2, size=(n_frames, n_point - 1))
+    # test gathering the same points as looping frame by frame
+    points3d = _get_mframe_points3d(
+        mframe_point_data=mframe_point_data,
+        mframe_point_mask=mframe_point_mask,
+        mframe_line_data=mframe_point_data,
+        mframe_line_mask=mframe_line_mask,
+        conn_array=conn_array)
+    ref_points = [mframe_point_data[mframe_point_mask == 1]]
+    for frame_idx, line_idx in zip(*np.where(mframe_line_mask == 1)):
+        ref_points.append(mframe_point_data[frame_idx, conn_array[line_idx]])
+    ref_points = np.concatenate(ref_points, axis=0)
+    assert np.allclose(np.sort(points3d, axis=0), np.sort(ref_points, axis=0))
+    visual_range = _get_visual_range(points_array=points3d, scale=1.0)
+    assert visual_range.shape == (3, 2)
+    span = visual_range[:, 1] - visual_range[:, 0]
+    assert np.allclose(span, span[0])
+    assert np.all(visual_range[:, 0] <= points3d.min(axis=0))
+    assert np.all(visual_range[:, 1] >= points3d.max(axis=0))
+    # test outliers and nan are ignored with percentile
+    outlier_points = np.concatenate(
+        (points3d, [[1000.0, 0, 0], [np.nan, 0, 0]]), axis=0)
+    visual_range = _get_visual_range(
+        points_array=outlier_points, scale=1.0, percentile=1.0)
+    assert visual_range[0, 1] < 10
+    with pytest.raises(ValueError):
+        _get_visual_range(points_array=points3d, scale=1.0, percentile=50)
+    # test plot_video with visual_range_percentile
+    point_palette = PointPalette(point_array=np.zeros(shape=(n_point, 3)))
+    output_path = os.path.join(output_dir, 'test_visual_range.mp4')
+    plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_point_data[:5],
+        mframe_point_mask=mframe_point_mask[:5],
+        point_palette=point_palette,
+        visual_range_percentile=5.0,
+        dpi=50)
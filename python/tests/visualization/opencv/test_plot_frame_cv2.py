@@ -167,3 +167,55 @@ def test_points_and_lines():
         line_palette=line_palette,
         background_arr=canvas)
     cv2.imwrite(os.path.join(output_dir, 'points_and_lines.jpg'), img_arr)
+
+
+def test_batched_drawing():
+    n_point = 50
+    point_array = np.random.uniform(low=-20, high=420, size=(n_point, 2))
+    conn_array = np.stack((np.arange(n_point - 1), np.arange(1, n_point)),
+                          axis=1)
+    color_array = np.repeat(
+        np.array(list(RGB_COLORS.values())), [20, 20, n_point - 40], axis=0)
+    point_palette = PointPalette(
+        point_array=point_array, color_array=color_array)
+    point_palette.set_point_mask(np.random.randint(0, 2, size=(n_point, 1)))
+    line_palette = LinePalette(
+        conn_array=conn_array,
+        point_array=point_array,
+        color_array=color_array[:-1])
+    line_palette.set_conn_mask(np.random.randint(0, 2, size=(n_point - 1, 1)))
+    # test bgr colors are cached until color_array is replaced
+    bgr_colors = point_palette.get_color_array_bgr()
+    assert np.all(bgr_colors == color_array[:, ::-1])
+    assert point_palette.get_color_array_bgr() is bgr_colors
+    point_palette.set_color_array(color_array)
+    assert point_palette.get_color_array_bgr() is not bgr_colors
+    # test the same result as drawing one by one
+    img_arr = plot_frame(
+        point_palette=point_palette,
+        line_palette=line_palette,
+        background_arr=np.zeros(shape=[400, 400, 3], dtype=np.uint8),
+        line_thickness=2,
+        point_radius=5)
+    ref_arr = np.zeros(shape=[400, 400, 3], dtype=np.uint8)
+    for line_idx in range(len(line_palette)):
+        if line_palette.conn_mask[line_idx] == 0:
+            continue
+        points = np.around(point_array[conn_array[line_idx]]).astype(np.int32)
+        cv2.line(
+            img=ref_arr,
+            pt1=points[0],
+            pt2=points[1],
+            color=color_array[line_idx, ::-1].tolist(),
+            thickness=2)
+    for point_idx in range(len(point_palette)):
+        if point_palette.point_mask[point_idx] == 0:
+            continue
+        point = np.around(point_array[point_idx]).astype(np.int32)
+        cv2.circle(
+            img=ref_arr,
+            center=point,
+            radius=5,
+            color=color_array[point_idx, ::-1].tolist(),
+            thickness=-1)
+    assert np.all(img_arr == ref_arr)
@@ -0,0 +1,115 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from xrprimer.utils.ffmpeg_utils import array_to_images, array_to_video
+from xrprimer.visualization.opencv import plot_mview_video, plot_video
+from xrprimer.visualization.palette import LinePalette, PointPalette
+
+output_dir = 'tests/data/output/visualization/opencv/test_plot_mview_video'
+n_view = 3
+n_frames = 5
+img_dirs = [
+    os.path.join(output_dir, f'input_img_dir_{view_idx}')
+    for view_idx in range(n_view)
+]
+video_paths = [
+    os.path.join(output_dir, f'input_video_{view_idx}.mp4')
+    for view_idx in range(n_view)
+]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def fixture():
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=False)
+    for view_idx in range(n_view):
+        img_arr = np.zeros(shape=(n_frames, 64, 128, 3), dtype=np.uint8)
+        for i in range(n_frames):
+            img_arr[i] = 40 * i + 10 * view_idx
+        array_to_images(image_array=img_arr, output_folder=img_dirs[view_idx])
+        array_to_video(image_array=img_arr, output_path=video_paths[view_idx])
+
+
+def test_plot_mview_video():
+    point_palette = PointPalette(point_array=np.zeros(shape=(3, 2)))
+    line_palette = LinePalette(
+        point_array=np.zeros(shape=(3, 2)),
+        conn_array=[[0, 1], [1, 2]],
+        color_array=[0, 255, 0])
+    mview_point_data = np.random.uniform(
+        low=0, high=64, size=(n_view, n_frames, 3, 2))
+    mview_point_mask = np.ones(shape=(n_frames, 3))
+    mview_point_mask[2, 0] = 0
+    # test background dirs, each tile is the same as a single view video
+    output_path = os.path.join(output_dir, 'mview_dirs.mp4')
+    mosaic_arr = plot_mview_video(
+        output_path=output_path,
+        mview_point_data=mview_point_data,
+        mview_line_data=mview_point_data,
+        mview_point_mask=mview_point_mask,
+        point_palette=point_palette,
+        line_palette=line_palette,
+        background_dirs=img_dirs,
+        return_array=True)
+    # 3 views in 2 columns
+    assert mosaic_arr.shape == (n_frames, 128, 256, 3)
+    for view_idx in range(n_view):
+        sview_arr = plot_video(
+            output_path=os.path.join(output_dir, f'sview_{view_idx}.mp4'),
+            mframe_point_data=mview_point_data[view_idx],
+            mframe_line_data=mview_point_data[view_idx],
+            mframe_point_mask=mview_point_mask,
+            point_palette=point_palette,
+            line_palette=line_palette,
+            background_dir=img_dirs[view_idx],
+            return_array=True)
+        row_idx, col_idx = divmod(view_idx, 2)
+        assert np.all(mosaic_arr[:, row_idx * 64:(row_idx + 1) * 64, col_idx *
+                                 128:(col_idx + 1) * 128] == sview_arr)
+    # the empty tile is black
+    assert np.all(mosaic_arr[:, 64:, 128:] == 0)
+    # test background videos, tiles in a row, resized
+    output_path = os.path.join(output_dir, 'mview_videos')
+    mosaic_arr = plot_mview_video(
+        output_path=output_path,
+        mview_point_data=mview_point_data,
+        point_palette=point_palette,
+        background_videos=video_paths,
+        n_cols=3,
+        tile_resolution=(32, 64),
+        return_array=True)
+    assert mosaic_arr.shape == (n_frames, 32, 192, 3)
+    assert len(os.listdir(output_path)) == n_frames
+    # test no background
+    output_path = os.path.join(output_dir, 'mview_no_background.mp4')
+    frame_iter = plot_mview_video(
+        output_path=output_path,
+        mview_line_data=mview_point_data,
+        line_palette=line_palette,
+        view_resolutions=[(64, 128)] * n_view,
+        tile_resolution=(31, 63),
+        return_generator=True)
+    assert np.stack(list(frame_iter)).shape == (n_frames, 64, 128, 3)
+    # test wrong args
+    with pytest.raises(ValueError):
+        plot_mview_video(
+            output_path=output_path,
+            mview_point_data=mview_point_data,
+            point_palette=point_palette)
+    with pytest.raises(ValueError):
+        plot_mview_video(
+            output_path=output_path,
+            mview_point_data=mview_point_data,
+            point_palette=point_palette,
+            background_dirs=img_dirs[:2])
+    with pytest.raises(ValueError):
+        plot_mview_video(
+            output_path=output_path,
+            mview_point_data=mview_point_data,
+            point_palette=point_palette,
+            background_dirs=img_dirs,
+            background_videos=video_paths)
@@ -193,3 +193,91 @@ def test_plot_args():
     output_path = os.path.join(output_dir, 'plot_args_neither.mp4')
     with pytest.raises(ValueError):
         plot_video(output_path=output_path, background_arr=img_arr)
+
+
+def test_n_workers():
+    point_palette = PointPalette(point_array=np.zeros(shape=(1, 2)), )
+    mframe_point_data = np.zeros(shape=(5, 1, 2))
+    for i in range(5):
+        mframe_point_data[i] += i * 10
+    for background_kwargs in (dict(background_dir=img_dir),
+                              dict(background_video=video_path),
+                              dict(height=64, width=128)):
+        serial_arr = plot_video(
+            output_path=os.path.join(output_dir, 'test_n_workers_serial.mp4'),
+            mframe_point_data=mframe_point_data,
+            point_palette=point_palette,
+            return_array=True,
+            **background_kwargs)
+        output_path = os.path.join(output_dir, 'test_n_workers_parallel')
+        parallel_arr = plot_video(
+            output_path=output_path,
+            mframe_point_data=mframe_point_data,
+            point_palette=point_palette,
+            return_array=True,
+            n_workers=2,
+            **background_kwargs)
+        assert len(os.listdir(output_path)) == 5
+        assert np.all(parallel_arr == serial_arr)
+
+
+def test_return_args():
+    point_palette = PointPalette(point_array=np.zeros(shape=(1, 2)), )
+    mframe_point_data = np.zeros(shape=(5, 1, 2))
+    for i in range(5):
+        mframe_point_data[i] += i * 10
+    output_path = os.path.join(output_dir, 'test_return_args.mp4')
+    ref_arr = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_point_data,
+        point_palette=point_palette,
+        height=64,
+        width=128,
+        return_array=True)
+    assert ref_arr.shape == (5, 64, 128, 3)
+    # test filling a memmap buffer
+    memmap_path = os.path.join(output_dir, 'test_return_args.npy')
+    array_buffer = np.lib.format.open_memmap(
+        memmap_path, mode='w+', dtype=np.uint8, shape=(5, 64, 128, 3))
+    ret_value = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_point_data,
+        point_palette=point_palette,
+        height=64,
+        width=128,
+        array_buffer=array_buffer)
+    assert ret_value is array_buffer
+    array_buffer.flush()
+    assert np.all(np.load(memmap_path) == ref_arr)
+    # test wrong buffer shape
+    with pytest.raises(ValueError):
+        plot_video(
+            output_path=output_path,
+            mframe_point_data=mframe_point_data,
+            point_palette=point_palette,
+            height=64,
+            width=128,
+            array_buffer=np.zeros(shape=(5, 32, 32, 3), dtype=np.uint8))
+    # test lazy generator
+    output_path = os.path.join(output_dir, 'test_return_args_generator')
+    ret_value = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_point_data,
+        point_palette=point_palette,
+        height=64,
+        width=128,
+        return_generator=True)
+    assert not os.path.exists(os.path.join(output_path, '000000.png'))
+    frames = list(ret_value)
+    assert len(frames) == 5
+    assert np.all(np.stack(frames) == ref_arr)
+    assert len(os.listdir(output_path)) == 5
+    with pytest.raises(ValueError):
+        plot_video(
+            output_path=output_path,
+            mframe_point_data=mframe_point_data,
+            point_palette=point_palette,
+            height=64,
+            width=128,
+            return_array=True,
+            return_generator=True)
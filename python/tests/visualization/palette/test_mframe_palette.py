@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from xrprimer.visualization.palette import (
+    LinePalette,
+    MframeLinePalette,
+    MframePointPalette,
+    PointPalette,
+)
+
+
+def test_mframe_point_palette() -> None:
+    n_frame, n_point = 5, 3
+    point_palette = PointPalette(
+        point_array=np.zeros(shape=(n_point, 2)),
+        color_array=np.array([255, 0, 0]),
+        point_mask=np.array([1, 0, 1]))
+    mframe_point_array = np.random.rand(n_frame, n_point, 2)
+    # default masks come from the template palette
+    mframe_palette = MframePointPalette(
+        point_palette=point_palette, mframe_point_array=mframe_point_array)
+    assert len(mframe_palette) == n_frame
+    frame_palette = mframe_palette.get_frame(2)
+    assert isinstance(frame_palette, PointPalette)
+    assert np.shares_memory(frame_palette.point_array,
+                            mframe_palette.point_array)
+    assert np.all(frame_palette.point_array == mframe_point_array[2])
+    assert np.all(frame_palette.point_mask == point_palette.point_mask)
+    assert frame_palette.color_array is point_palette.color_array
+    # the template palette is not modified
+    assert np.all(point_palette.point_array == 0)
+    # per-frame masks, same as set_point_mask
+    mframe_point_mask = np.random.randint(2, size=(n_frame, n_point))
+    mframe_palette = MframePointPalette(
+        point_palette=point_palette,
+        mframe_point_array=mframe_point_array,
+        mframe_point_mask=np.expand_dims(mframe_point_mask, -1))
+    for frame_idx in range(n_frame):
+        frame_palette = mframe_palette.get_frame(frame_idx)
+        point_palette.set_point_mask(
+            np.expand_dims(mframe_point_mask[frame_idx], -1))
+        assert frame_palette.point_mask.dtype == point_palette.point_mask.dtype
+        assert np.all(frame_palette.point_mask == point_palette.point_mask)
+    # slice
+    sliced_palette = mframe_palette.slice_frames(1, 3)
+    assert len(sliced_palette) == 2
+    assert np.all(
+        sliced_palette.get_frame(0).point_array == mframe_point_array[1])
+    # wrong shapes
+    with pytest.raises(ValueError):
+        MframePointPalette(
+            point_palette=point_palette,
+            mframe_point_array=np.zeros(shape=(n_frame, n_point + 1, 2)))
+    with pytest.raises(ValueError):
+        MframePointPalette(
+            point_palette=point_palette,
+            mframe_point_array=mframe_point_array,
+            mframe_point_mask=np.ones(shape=(n_frame - 1, n_point)))
+
+
+def test_mframe_line_palette() -> None:
+    n_frame, n_point = 5, 3
+    line_palette = LinePalette(
+        conn_array=np.array([[0, 1], [1, 2]]),
+        point_array=np.zeros(shape=(n_point, 3)),
+        color_array=np.array([0, 255, 0]))
+    mframe_point_array = np.random.rand(n_frame, n_point, 3)
+    mframe_conn_mask = np.random.randint(2, size=(n_frame, 2))
+    mframe_palette = MframeLinePalette(
+        line_palette=line_palette,
+        mframe_point_array=mframe_point_array,
+        mframe_conn_mask=mframe_conn_mask)
+    assert len(mframe_palette) == n_frame
+    frame_palette = mframe_palette.get_frame(4)
+    assert isinstance(frame_palette, LinePalette)
+    assert np.all(frame_palette.point_array == mframe_point_array[4])
+    assert np.all(frame_palette.conn_mask == mframe_conn_mask[4])
+    assert frame_palette.conn_array is line_palette.conn_array
+    assert np.all(line_palette.conn_mask == 1)
+    with pytest.raises(ValueError):
+        MframeLinePalette(
+            line_palette=line_palette,
+            mframe_point_array=mframe_point_array,
+            mframe_conn_mask=np.ones(shape=(n_frame, 3)))
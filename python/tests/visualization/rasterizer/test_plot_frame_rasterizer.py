@@ -0,0 +1,142 @@
+import os
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+from xrprimer.visualization.palette.line_palette import LinePalette
+from xrprimer.visualization.palette.point_palette import PointPalette
+from xrprimer.visualization.rasterizer import get_orbit_camera, plot_frame
+from xrprimer.visualization.rasterizer.plot_frame import project_points
+
+output_dir = 'tests/data/output/visualization/rasterizer/test_plot_frame'
+
+
+@pytest.fixture(scope='module', autouse=True)
+def fixture() -> None:
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=False)
+
+
+def test_orbit_camera() -> None:
+    visual_range = np.array([[0, 100], [0, 100], [0, 100]])
+    intrinsic, extrinsic_r, extrinsic_t = get_orbit_camera(
+        visual_range=visual_range,
+        cam_latitude=0.0,
+        cam_longtitude=0.0,
+        height=480,
+        width=640)
+    assert np.allclose(extrinsic_r @ extrinsic_r.T, np.eye(3))
+    # the central of visual_range is projected to the image center
+    pixels, depth = project_points(
+        points=np.array([[50.0, 50.0, 50.0]]),
+        intrinsic=intrinsic,
+        extrinsic_r=extrinsic_r,
+        extrinsic_t=extrinsic_t)
+    assert np.allclose(pixels[0], (320, 240))
+    assert depth[0] > 0
+    # watching from +x, y goes right and z goes up
+    pixels, _ = project_points(
+        points=np.array([[50.0, 60.0, 50.0], [50.0, 50.0, 60.0]]),
+        intrinsic=intrinsic,
+        extrinsic_r=extrinsic_r,
+        extrinsic_t=extrinsic_t)
+    assert pixels[0, 0] > 320
+    assert pixels[1, 1] < 240
+    # all corners of visual_range are inside the image
+    corners = np.stack(
+        np.meshgrid(*visual_range, indexing='ij'), axis=-1).reshape(-1, 3)
+    for longtitude in (0, 30, 60, 90):
+        krt = get_orbit_camera(
+            visual_range=visual_range, cam_longtitude=longtitude)
+        pixels, _ = project_points(corners, *krt)
+        assert np.all(pixels >= 0)
+        assert np.all(pixels[:, 0] < 640)
+        assert np.all(pixels[:, 1] < 480)
+    # batched cameras give the same result as a single camera
+    krt_list = [
+        get_orbit_camera(visual_range=visual_range, cam_longtitude=longtitude)
+        for longtitude in (0, 30, 60)
+    ]
+    batched_krt = [np.stack(arrays, axis=0) for arrays in zip(*krt_list)]
+    mframe_points = np.random.uniform(0, 100, size=(3, 10, 3))
+    batched_pixels, batched_depth = project_points(mframe_points, *batched_krt)
+    for frame_idx in range(3):
+        pixels, depth = project_points(mframe_points[frame_idx],
+                                       *krt_list[frame_idx])
+        assert np.allclose(batched_pixels[frame_idx], pixels)
+        assert np.allclose(batched_depth[frame_idx], depth)
+
+
+def test_plot_frame() -> None:
+    visual_range = np.array([[0, 100], [0, 100], [0, 100]])
+    point_palette = PointPalette(
+        point_array=[[20, 20, 20], [50, 50, 50], [80, 80, 80]],
+        color_array=[255, 0, 0])
+    line_palette = LinePalette(
+        conn_array=[[0, 1], [1, 2]],
+        point_array=point_palette.point_array,
+        color_array=[0, 255, 0])
+    img_arr = plot_frame(
+        point_palette=point_palette,
+        line_palette=line_palette,
+        visual_range=visual_range,
+        height=240,
+        width=320)
+    cv2.imwrite(os.path.join(output_dir, 'points_and_lines.jpg'), img_arr)
+    assert img_arr.shape == (240, 320, 3)
+    # red points in BGR
+    assert np.any(np.all(img_arr == (0, 0, 255), axis=-1))
+    assert np.any(np.all(img_arr == (0, 255, 0), axis=-1))
+    # test floor
+    no_floor_arr = plot_frame(
+        point_palette=point_palette,
+        line_palette=line_palette,
+        visual_range=visual_range,
+        height=240,
+        width=320,
+        plot_floor=False)
+    assert not np.all(no_floor_arr == img_arr)
+    # test an explicit camera, the same as the default orbit
+    intrinsic, extrinsic_r, extrinsic_t = get_orbit_camera(
+        visual_range=visual_range, height=240, width=320)
+    camera_arr = plot_frame(
+        point_palette=point_palette,
+        line_palette=line_palette,
+        visual_range=visual_range,
+        height=240,
+        width=320,
+        intrinsic=intrinsic,
+        extrinsic_r=extrinsic_r,
+        extrinsic_t=extrinsic_t)
+    assert np.all(camera_arr == img_arr)
+    with pytest.raises(ValueError):
+        plot_frame(point_palette=point_palette, intrinsic=intrinsic)
+    # test mask, nothing but the floor left
+    point_palette.set_point_mask([0, 0, 0])
+    line_palette.set_conn_mask([0, 0])
+    masked_arr = plot_frame(
+        point_palette=point_palette,
+        line_palette=line_palette,
+        visual_range=visual_range,
+        height=240,
+        width=320,
+        plot_floor=False)
+    assert np.all(masked_arr == 255)
+    # test depth order, the nearer line covers the farther one
+    line_palette = LinePalette(
+        conn_array=[[0, 1], [2, 3]],
+        point_array=[[50, 0, 50], [50, 100, 50], [90, 0, 50], [90, 100, 50]],
+        color_array=[[0, 0, 255], [255, 0, 0]])
+    img_arr = plot_frame(
+        line_palette=line_palette,
+        visual_range=visual_range,
+        cam_latitude=0.0,
+        cam_longtitude=0.0,
+        plot_floor=False)
+    assert np.all(img_arr[240, 320] == (255, 0, 0)[::-1])
+    # test plot neither
+    with pytest.raises(RuntimeError):
+        plot_frame()
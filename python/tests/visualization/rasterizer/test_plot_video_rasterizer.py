@@ -0,0 +1,135 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from xrprimer.visualization.palette import LinePalette, PointPalette
+from xrprimer.visualization.rasterizer import get_orbit_camera, plot_video
+
+output_dir = 'tests/data/output/visualization/rasterizer/test_plot_video'
+
+
+@pytest.fixture(scope='module', autouse=True)
+def fixture() -> None:
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=False)
+
+
+def test_output_args() -> None:
+    point_palette = PointPalette(point_array=np.zeros(shape=(1, 3)), )
+    n_frames = 10
+    mframe_point_data = np.zeros(shape=(n_frames, 1, 3))
+    for i in range(n_frames):
+        mframe_point_data[i] += i * 10
+    # test write video correctly
+    output_path = os.path.join(output_dir, 'test_output_args_video.mp4')
+    ret_value = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_point_data,
+        point_palette=point_palette)
+    assert ret_value is None
+    # test write video return array
+    ret_value = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_point_data,
+        point_palette=point_palette,
+        return_array=True,
+        height=240,
+        width=320)
+    assert ret_value.shape == (n_frames, 240, 320, 3)
+    # test write img dir and return a generator
+    output_path = os.path.join(output_dir, 'test_output_args_img_dir')
+    frame_iter = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_point_data,
+        point_palette=point_palette,
+        return_generator=True,
+        height=240,
+        width=320)
+    assert np.all(np.stack(list(frame_iter)) == ret_value)
+    assert len(os.listdir(output_path)) == n_frames
+    # test not overwrite
+    output_path = os.path.join(output_dir, 'test_output_args_video.mp4')
+    with pytest.raises(FileExistsError):
+        plot_video(
+            output_path=output_path,
+            mframe_point_data=mframe_point_data,
+            point_palette=point_palette,
+            overwrite=False)
+
+
+def test_plot_args() -> None:
+    n_frames = 300
+    line_palette = LinePalette(
+        point_array=np.zeros(shape=(4, 3)),
+        conn_array=np.array([[0, 1], [0, 2], [0, 3]]),
+        color_array=((255, 0, 0), (0, 255, 0), (0, 0, 255)))
+    mframe_line_data = np.zeros(shape=(n_frames, 4, 3))
+    mframe_line_data[:, 1, 0] += 5
+    mframe_line_data[:, 2, 1] += 5
+    mframe_line_data[:, 3, 2] += 5
+    mframe_line_mask = np.ones(shape=(n_frames, 3))
+    mframe_line_mask[100:200, 0] = 0
+    point_palette = PointPalette(point_array=np.zeros(shape=(4, 3)))
+    # test plot both with masks, compared with parallel rendering
+    output_path = os.path.join(output_dir, 'plot_args_both.mp4')
+    serial_arr = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_line_data,
+        point_palette=point_palette,
+        mframe_line_data=mframe_line_data,
+        mframe_line_mask=mframe_line_mask,
+        line_palette=line_palette,
+        return_array=True,
+        height=120,
+        width=160)
+    parallel_arr = plot_video(
+        output_path=output_path,
+        mframe_point_data=mframe_line_data,
+        point_palette=point_palette,
+        mframe_line_data=mframe_line_data,
+        mframe_line_mask=mframe_line_mask,
+        line_palette=line_palette,
+        return_array=True,
+        height=120,
+        width=160,
+        n_workers=2)
+    assert np.all(serial_arr == parallel_arr)
+    # the camera moves along the orbit
+    assert not np.all(serial_arr[0] == serial_arr[50])
+    # test a fixed camera for all frames
+    visual_range = np.array([[-1, 6], [-1, 6], [-1, 6]])
+    intrinsic, extrinsic_r, extrinsic_t = get_orbit_camera(
+        visual_range=visual_range, height=120, width=160)
+    output_path = os.path.join(output_dir, 'plot_args_camera.mp4')
+    fixed_arr = plot_video(
+        output_path=output_path,
+        visual_range=visual_range,
+        mframe_line_data=mframe_line_data[:10],
+        line_palette=line_palette,
+        intrinsics=intrinsic,
+        extrinsic_rs=extrinsic_r,
+        extrinsic_ts=extrinsic_t,
+        return_array=True,
+        height=120,
+        width=160)
+    assert np.all(fixed_arr == fixed_arr[0:1])
+    with pytest.raises(ValueError):
+        plot_video(
+            output_path=output_path,
+            mframe_line_data=mframe_line_data[:10],
+            line_palette=line_palette,
+            intrinsics=intrinsic)
+    # test a mask in wrong shape, checked by MframeLinePalette
+    with pytest.raises(ValueError):
+        plot_video(
+            output_path=output_path,
+            mframe_line_data=mframe_line_data[:10],
+            mframe_line_mask=mframe_line_mask[:10, :2],
+            line_palette=line_palette)
+    # test plot neither
+    output_path = os.path.join(output_dir, 'plot_args_neither.mp4')
+    with pytest.raises(ValueError):
+        plot_video(output_path=output_path)
@@ -0,0 +1,296 @@
+import hashlib
+import heapq
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+import cv2
+import numpy as np
+
+from xrprimer.utils.log_utils import get_logger
+
+# bump it when detection args change, to invalidate cached corners
+_CORNERS_CACHE_VERSION = 1
+
+
+def find_chessboard_corners(img: Union[str, np.ndarray], chessboard_width: int,
+                            chessboard_height: int) -> Union[np.ndarray, None]:
+    """Find inner corners of a chessboard in an image, with the same flags
+    as the C++ multi-view calibrator, and sub-pixel refinement.
+
+    Args:
+        img (Union[str, np.ndarray]):
+            Path to an image file, or an image array in shape [h, w, 3]
+            or [h, w]. '' stands for an empty image.
+        chessboard_width (int):
+            How many internal corners along the
+            horizontal edge of the chessboard.
+        chessboard_height (int):
+            How many internal corners along the
+            vertical edge of the chessboard.
+
+    Returns:
+        Union[np.ndarray, None]:
+            Corner locations in shape [n_corner, 2], dtype np.float32,
+            or None if the pattern is not found.
+    """
+    if isinstance(img, str):
+        if len(img) <= 0:
+            return None
+        img = cv2.imread(img, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            return None
+    elif img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    pattern_size = (chessboard_width, chessboard_height)
+    pattern_found, corners = cv2.findChessboardCorners(
+        img, pattern_size, None, cv2.CALIB_CB_ADAPTIVE_THRESH +
+        cv2.CALIB_CB_NORMALIZE_IMAGE + cv2.CALIB_CB_FAST_CHECK)
+    if not pattern_found:
+        return None
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+    corners = cv2.cornerSubPix(img, corners, (11, 11), (-1, -1), criteria)
+    return corners.reshape(-1, 2)
+
+
+def batch_find_chessboard_corners(
+    img_paths: List[str],
+    chessboard_width: int,
+    chessboard_height: int,
+    n_workers: int = 4,
+    cache_dir: Union[str, None] = None,
+    logger: Union[None, str, logging.Logger] = None
+) -> List[Union[np.ndarray, None]]:
+    """Find chessboard corners in many images, with a fixed-size thread pool.
+    Detected corners can be cached on disk, keyed by a hash of the image
+    file and the pattern size, so that re-running a calibration does not
+    detect them again.
+
+    Args:
+        img_paths (List[str]):
+            Paths to the image files. '' stands for an empty image.
+        chessboard_width (int):
+            How many internal corners along the
+            horizontal edge of the chessboard.
+        chessboard_height (int):
+            How many internal corners along the
+            vertical edge of the chessboard.
+        n_workers (int, optional):
+            Number of threads detecting corners.
+            Defaults to 4.
+        cache_dir (Union[str, None], optional):
+            Path to the directory of cached corners. It will be
+            created if not exists.
+            Defaults to None, do not cache.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Returns:
+        List[Union[np.ndarray, None]]:
+            Corners in shape [n_corner, 2] in the same order as img_paths,
+            None for images without pattern found.
+    """
+    logger = get_logger(logger)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def find_corners(img_path: str) -> Union[np.ndarray, None]:
+        if cache_dir is None or len(img_path) <= 0:
+            return find_chessboard_corners(
+                img=img_path,
+                chessboard_width=chessboard_width,
+                chessboard_height=chessboard_height)
+        try:
+            with open(img_path, 'rb') as f_read:
+                img_bytes = f_read.read()
+        except OSError:
+            logger.warning(f'Failed to read {img_path}, ignored.')
+            return None
+        cache_path = os.path.join(
+            cache_dir,
+            _get_corners_cache_key(img_bytes, chessboard_width,
+                                   chessboard_height) + '.npy')
+        if os.path.isfile(cache_path):
+            try:
+                corners = np.load(cache_path)
+                return corners if len(corners) > 0 else None
+            except (OSError, ValueError):
+                logger.warning(f'Failed to read {cache_path}, ignored.')
+        img = cv2.imdecode(
+            np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+        corners = find_chessboard_corners(
+            img=img,
+            chessboard_width=chessboard_width,
+            chessboard_height=chessboard_height) \
+            if img is not None else None
+        # an empty array stands for pattern not found
+        cache_corners = corners if corners is not None \
+            else np.zeros(shape=(0, 2), dtype=np.float32)
+        tmp_path = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f_write:
+                np.save(f_write, cache_corners)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            logger.warning(f'Failed to write {cache_path}, ignored.')
+        return corners
+
+    n_workers = max(min(int(n_workers), len(img_paths)), 1)
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(find_corners, img_paths))
+
+
+def _get_corners_cache_key(img_bytes: bytes, chessboard_width: int,
+                           chessboard_height: int) -> str:
+    img_hash = hashlib.sha1(img_bytes).hexdigest()
+    return f'{img_hash}_{chessboard_width}x{chessboard_height}' + \
+        f'_v{_CORNERS_CACHE_VERSION}'
+
+
+def select_mview_frames(
+    mview_corners: List[List[Union[np.ndarray, None]]],
+    max_frames: int,
+    n_grid: int = 4,
+    n_scale_bins: int = 3,
+    n_angle_bins: int = 4,
+    min_pair_frames: int = 3,
+    logger: Union[None, str, logging.Logger] = None
+) -> Tuple[List[int], Dict[str, Union[int, float]]]:
+    """Select a diverse subset of multi-view frames for calibration. Frames
+    are picked greedily by how many new board poses they cover, and by how
+    many view pairs still see the board together in fewer than
+    min_pair_frames selected frames. A board pose is binned by view,
+    location of its center in a n_grid x n_grid grid, its size and its
+    in-plane angle. Frames with fewer than 2 views are never selected.
+
+    Args:
+        mview_corners (List[List[Union[np.ndarray, None]]]):
+            A nested list of chessboard corners. The shape is
+            [n_frame, n_view], and each element is an array
+            in shape [n_corner, 2], or None for pattern not found.
+        max_frames (int):
+            Max number of frames to select.
+        n_grid (int, optional):
+            Number of location bins along each image axis.
+            Defaults to 4.
+        n_scale_bins (int, optional):
+            Number of board size bins. Defaults to 3.
+        n_angle_bins (int, optional):
+            Number of in-plane angle bins. Defaults to 4.
+        min_pair_frames (int, optional):
+            How many selected frames a view pair shall share.
+            Defaults to 3.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Returns:
+        Tuple[List[int], Dict[str, Union[int, float]]]:
+            List[int]:
+                Sorted indexes of the selected frames.
+            Dict[str, Union[int, float]]:
+                Coverage statistics, with keys n_frame, n_valid_frame,
+                n_selected_frame, n_pose_bin, n_selected_pose_bin,
+                n_view_pair, min_pair_frames (of the selected frames),
+                n_corner and n_selected_corner.
+    """
+    logger = get_logger(logger)
+    n_view = len(mview_corners[0]) if len(mview_corners) > 0 else 0
+    # normalize corners by the extent of each view
+    view_min = np.full(shape=(n_view, 2), fill_value=np.inf)
+    view_max = np.full(shape=(n_view, 2), fill_value=-np.inf)
+    for sframe_corners in mview_corners:
+        for view_idx, corners in enumerate(sframe_corners):
+            if corners is not None:
+                view_min[view_idx] = np.minimum(view_min[view_idx],
+                                                corners.min(axis=0))
+                view_max[view_idx] = np.maximum(view_max[view_idx],
+                                                corners.max(axis=0))
+    view_extent = np.maximum(view_max - view_min, 1e-6)
+    frame_pose_bins = []
+    frame_pairs = []
+    frame_n_corners = []
+    valid_frame_idxs = []
+    all_pairs = set()
+    for frame_idx, sframe_corners in enumerate(mview_corners):
+        found_views = [
+            view_idx for view_idx, corners in enumerate(sframe_corners)
+            if corners is not None
+        ]
+        if len(found_views) < 2:
+            continue
+        pose_bins = set()
+        n_corner = 0
+        for view_idx in found_views:
+            corners = (np.asarray(sframe_corners[view_idx]) -
+                       view_min[view_idx]) / view_extent[view_idx]
+            n_corner += len(corners)
+            grid_x, grid_y = np.clip(
+                (corners.mean(axis=0) * n_grid).astype(int), 0, n_grid - 1)
+            diagonal = np.linalg.norm(
+                corners.max(axis=0) - corners.min(axis=0)) / np.sqrt(2)
+            scale_bin = min(int(diagonal * n_scale_bins), n_scale_bins - 1)
+            row_vector = corners[1] - corners[0]
+            angle = np.arctan2(row_vector[1], row_vector[0]) % (2 * np.pi)
+            angle_bin = int(angle / (2 * np.pi) * n_angle_bins) % n_angle_bins
+            pose_bins.add((view_idx, grid_x, grid_y, scale_bin, angle_bin))
+        pairs = [(view_a, view_b)
+                 for pair_idx, view_a in enumerate(found_views)
+                 for view_b in found_views[pair_idx + 1:]]
+        all_pairs.update(pairs)
+        frame_pose_bins.append(pose_bins)
+        frame_pairs.append(pairs)
+        frame_n_corners.append(n_corner)
+        valid_frame_idxs.append(frame_idx)
+    covered_pose_bins = set()
+    pair_counts = {pair: 0 for pair in all_pairs}
+
+    def get_gain(candidate_idx: int) -> float:
+        pose_gain = len(frame_pose_bins[candidate_idx] - covered_pose_bins)
+        pair_gain = sum(pair_counts[pair] < min_pair_frames
+                        for pair in frame_pairs[candidate_idx])
+        # prefer frames with more corners when nothing new is covered
+        return pose_gain + pair_gain + \
+            1e-6 * frame_n_corners[candidate_idx]
+
+    # lazy greedy, gains never grow as more frames are selected
+    heap = [(-get_gain(candidate_idx), candidate_idx)
+            for candidate_idx in range(len(valid_frame_idxs))]
+    heapq.heapify(heap)
+    selected_idxs = []
+    while len(heap) > 0 and len(selected_idxs) < max_frames:
+        _, candidate_idx = heapq.heappop(heap)
+        gain = get_gain(candidate_idx)
+        if len(heap) > 0 and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, candidate_idx))
+            continue
+        selected_idxs.append(candidate_idx)
+        covered_pose_bins.update(frame_pose_bins[candidate_idx])
+        for pair in frame_pairs[candidate_idx]:
+            pair_counts[pair] += 1
+    all_pose_bins = set().union(*frame_pose_bins)
+    selected_frame_idxs = sorted(valid_frame_idxs[idx]
+                                 for idx in selected_idxs)
+    stats = dict(
+        n_frame=len(mview_corners),
+        n_valid_frame=len(valid_frame_idxs),
+        n_selected_frame=len(selected_frame_idxs),
+        n_pose_bin=len(all_pose_bins),
+        n_selected_pose_bin=len(covered_pose_bins),
+        n_view_pair=len(all_pairs),
+        min_pair_frames=min(pair_counts.values())
+        if len(pair_counts) > 0 else 0,
+        n_corner=int(sum(frame_n_corners)),
+        n_selected_corner=int(
+            sum(frame_n_corners[idx] for idx in selected_idxs)))
+    logger.info(
+        f'Selected {stats["n_selected_frame"]}/{stats["n_valid_frame"]}' +
+        ' valid frames, covering' +
+        f' {stats["n_selected_pose_bin"]}/{stats["n_pose_bin"]} pose bins,' +
+        f' {stats["n_selected_corner"]}/{stats["n_corner"]} corners.' +
+        ' Every view pair is shared by' +
+        f' >= {stats["min_pair_frames"]} selected frames.')
+    return selected_frame_idxs, stats
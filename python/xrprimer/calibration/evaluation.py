@@ -0,0 +1,266 @@
+import logging
+from typing import Dict, List, Union
+
+import numpy as np
+
+from xrprimer.data_structure.camera import (
+    FisheyeCameraParameter,
+    PinholeCameraParameter,
+)
+from xrprimer.transform.camera.distortion import undistort_points
+from xrprimer.transform.convention.camera import convert_camera_parameter
+from xrprimer.utils.log_utils import get_logger
+
+
+def evaluate_mview_reprojection_error(
+    mview_corners: List[List[Union[np.ndarray, None]]],
+    camera_parameters: List[Union[PinholeCameraParameter,
+                                  FisheyeCameraParameter]],
+    outlier_threshold: Union[float, None] = None,
+    logger: Union[None, str, logging.Logger] = None
+) -> Dict[str, Union[np.ndarray, float, int, List[int]]]:
+    """Evaluate a multi-view calibration by reprojection errors of
+    chessboard corners. Corners of every frame seen by at least 2 views
+    are triangulated with all the views at once (DLT), and projected back
+    to the views detecting them in a single batched numpy projection, with
+    the same camera model as cv2.projectPoints.
+
+    Args:
+        mview_corners (List[List[Union[np.ndarray, None]]]):
+            A nested list of chessboard corners. The shape is
+            [n_frame, n_view], and each element is an array
+            in shape [n_corner, 2], or None for pattern not found.
+        camera_parameters (List[Union[PinholeCameraParameter,
+                FisheyeCameraParameter]]):
+            A list of calibrated cameras, len(camera_parameters) == n_view.
+        outlier_threshold (Union[float, None], optional):
+            A frame whose mean error is larger than outlier_threshold
+            pixels is an outlier. Defaults to None,
+            median + 3 * MAD of frame errors, scaled to std,
+            and no smaller than 1 pixel.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        ValueError: n_view of mview_corners does not match
+            camera_parameters, or corners are in different shapes.
+
+    Returns:
+        Dict[str, Union[np.ndarray, float, int, List[int]]]:
+            corner_errors (np.ndarray):
+                Errors in pixels in shape [n_frame, n_view, n_corner],
+                np.nan where not evaluated.
+            frame_errors (np.ndarray):
+                Mean errors of frames in shape [n_frame, ].
+            view_errors (np.ndarray):
+                Mean errors of views in shape [n_view, ].
+            mean, median, rmse, p95, max (float):
+                Statistics of all evaluated corner errors.
+            n_frame, n_valid_frame (int):
+                Number of frames, and frames seen by at least 2 views.
+            outlier_threshold (float):
+                Threshold of frame errors in pixels.
+            outlier_frame_idxs (List[int]):
+                Indexes of outlier frames.
+    """
+    logger = get_logger(logger)
+    n_frame = len(mview_corners)
+    n_view = len(camera_parameters)
+    corners_list = []
+    for frame_idx, sframe_corners in enumerate(mview_corners):
+        if len(sframe_corners) != n_view:
+            logger.error(f'Frame {frame_idx} has {len(sframe_corners)}' +
+                         f' views, while there are {n_view} cameras.')
+            raise ValueError
+        corners_list += [
+            corners for corners in sframe_corners if corners is not None
+        ]
+    n_corner = len(corners_list[0]) if len(corners_list) > 0 else 0
+    corners_array = np.zeros(shape=(n_frame, n_view, n_corner, 2))
+    view_mask = np.zeros(shape=(n_frame, n_view), dtype=bool)
+    for frame_idx, sframe_corners in enumerate(mview_corners):
+        for view_idx, corners in enumerate(sframe_corners):
+            if corners is None:
+                continue
+            corners = np.asarray(corners, dtype=np.float64).reshape(-1, 2)
+            if len(corners) != n_corner:
+                logger.error('Corners shall be in the same shape,' +
+                             f' expecting ({n_corner}, 2),' +
+                             f' getting {corners.shape} at frame' +
+                             f' {frame_idx}, view {view_idx}.')
+                raise ValueError
+            corners_array[frame_idx, view_idx] = corners
+            view_mask[frame_idx, view_idx] = True
+    valid_frame_mask = view_mask.sum(axis=1) >= 2
+    view_mask[~valid_frame_mask] = False
+    corner_errors = np.full(
+        shape=(n_frame, n_view, n_corner), fill_value=np.nan)
+    if valid_frame_mask.any() and n_corner > 0:
+        cam_list = _get_opencv_world2cam_cameras(camera_parameters)
+        points3d = _triangulate_dlt(
+            corners=corners_array[valid_frame_mask],
+            view_mask=view_mask[valid_frame_mask],
+            cam_list=cam_list)
+        # project all detected (frame, view) pairs in one batch
+        valid_frame_idxs = np.where(valid_frame_mask)[0]
+        pair_frame_idxs, pair_view_idxs = np.where(view_mask[valid_frame_mask])
+        projected = _project_points(
+            points3d=points3d[pair_frame_idxs],
+            view_idxs=pair_view_idxs,
+            cam_list=cam_list)
+        pair_frame_idxs = valid_frame_idxs[pair_frame_idxs]
+        corner_errors[pair_frame_idxs, pair_view_idxs] = np.linalg.norm(
+            projected - corners_array[pair_frame_idxs, pair_view_idxs],
+            axis=-1)
+    corner_mask = ~np.isnan(corner_errors)
+    valid_errors = corner_errors[corner_mask]
+    frame_errors = _masked_mean(corner_errors, corner_mask, axis=(1, 2))
+    view_errors = _masked_mean(corner_errors, corner_mask, axis=(0, 2))
+    valid_frame_errors = frame_errors[valid_frame_mask]
+    if outlier_threshold is None:
+        if len(valid_frame_errors) > 0:
+            median = np.median(valid_frame_errors)
+            mad = np.median(np.abs(valid_frame_errors - median))
+            # frames below 1 pixel are never outliers by default
+            outlier_threshold = max(float(median + 3 * 1.4826 * mad), 1.0)
+        else:
+            outlier_threshold = np.inf
+    outlier_frame_idxs = np.where(valid_frame_mask & (
+        np.nan_to_num(frame_errors) > outlier_threshold))[0].tolist()
+    has_error = len(valid_errors) > 0
+    report = dict(
+        corner_errors=corner_errors,
+        frame_errors=frame_errors,
+        view_errors=view_errors,
+        mean=float(np.mean(valid_errors)) if has_error else np.nan,
+        median=float(np.median(valid_errors)) if has_error else np.nan,
+        rmse=float(np.sqrt(np.mean(valid_errors**2))) if has_error else np.nan,
+        p95=float(np.percentile(valid_errors, 95)) if has_error else np.nan,
+        max=float(np.max(valid_errors)) if has_error else np.nan,
+        n_frame=n_frame,
+        n_valid_frame=int(valid_frame_mask.sum()),
+        outlier_threshold=outlier_threshold,
+        outlier_frame_idxs=outlier_frame_idxs)
+    logger.info('Reprojection error of' +
+                f' {report["n_valid_frame"]}/{n_frame} frames:' +
+                f' mean {report["mean"]:.3f}, median {report["median"]:.3f},' +
+                f' rmse {report["rmse"]:.3f}, p95 {report["p95"]:.3f},' +
+                f' max {report["max"]:.3f} pixels.' +
+                f' {len(outlier_frame_idxs)} outlier frames' +
+                f' above {outlier_threshold:.3f} pixels.')
+    return report
+
+
+def _get_opencv_world2cam_cameras(
+    camera_parameters: List[Union[PinholeCameraParameter,
+                                  FisheyeCameraParameter]]
+) -> List[Union[PinholeCameraParameter, FisheyeCameraParameter]]:
+    """Clone cameras in opencv convention, with world2cam extrinsics."""
+    cam_list = []
+    for input_cam in camera_parameters:
+        cam_param = input_cam.clone()
+        if not cam_param.world2cam:
+            cam_param.inverse_extrinsic()
+        if cam_param.convention != 'opencv':
+            cam_param = convert_camera_parameter(
+                cam_param=cam_param, dst='opencv')
+        cam_list.append(cam_param)
+    return cam_list
+
+
+def _triangulate_dlt(
+    corners: np.ndarray, view_mask: np.ndarray,
+    cam_list: List[Union[PinholeCameraParameter, FisheyeCameraParameter]]
+) -> np.ndarray:
+    """Triangulate corners [n_frame, n_view, n_corner, 2] with all views
+    marked in view_mask [n_frame, n_view] at once, by solving the DLT
+    normal equations of every point in a batch. Returns points3d in
+    shape [n_frame, n_corner, 3]."""
+    n_view = corners.shape[1]
+    normed_corners = np.zeros_like(corners)
+    extrinsics = np.zeros(shape=(n_view, 3, 4))
+    for view_idx, cam_param in enumerate(cam_list):
+        view_corners = corners[view_mask[:, view_idx], view_idx]
+        if isinstance(cam_param, FisheyeCameraParameter) and \
+                view_corners.size > 0:
+            cam_param, view_corners = undistort_points(
+                distorted_cam=cam_param, points=view_corners)
+        # normalized image coordinates are better conditioned than pixels
+        inv_k = np.linalg.inv(
+            np.array(cam_param.get_intrinsic(k_dim=3), dtype=np.float64))
+        normed_corners[view_mask[:, view_idx], view_idx] = \
+            view_corners @ inv_k[:2, :2].T + inv_k[:2, 2]
+        extrinsics[view_idx, :, :3] = cam_param.get_extrinsic_r()
+        extrinsics[view_idx, :, 3] = cam_param.get_extrinsic_t()
+    weights = view_mask.astype(np.float64)[:, :, None, None]
+    # rows of the DLT system, [n_frame, n_corner, 2 * n_view, 4]
+    dlt_mat = np.concatenate(
+        ((normed_corners[..., 0:1] * extrinsics[None, :, None, 2] -
+          extrinsics[None, :, None, 0]) * weights,
+         (normed_corners[..., 1:2] * extrinsics[None, :, None, 2] -
+          extrinsics[None, :, None, 1]) * weights),
+        axis=1).transpose(0, 2, 1, 3)
+    normal_mat = np.matmul(dlt_mat.transpose(0, 1, 3, 2), dlt_mat)
+    try:
+        # fix the homogeneous coordinate to 1
+        points3d = np.linalg.solve(normal_mat[..., :3, :3],
+                                   -normal_mat[..., :3, 3:])[..., 0]
+    except np.linalg.LinAlgError:
+        # degenerate views, eigenvector of the smallest eigenvalue
+        _, eig_vecs = np.linalg.eigh(normal_mat)
+        points4d = eig_vecs[..., 0]
+        dividend = points4d[..., 3:]
+        dividend[dividend == 0] = 1
+        points3d = points4d[..., :3] / dividend
+    return points3d
+
+
+def _project_points(
+    points3d: np.ndarray, view_idxs: np.ndarray,
+    cam_list: List[Union[PinholeCameraParameter, FisheyeCameraParameter]]
+) -> np.ndarray:
+    """Project points3d [n_pair, n_point, 3], the i-th group by camera
+    view_idxs[i], with the opencv camera model (k1-k6, p1, p2) in one
+    numpy batch. Returns points2d in shape [n_pair, n_point, 2]."""
+    n_view = len(cam_list)
+    r_mats = np.zeros(shape=(n_view, 3, 3))
+    t_vecs = np.zeros(shape=(n_view, 3))
+    k_mats = np.zeros(shape=(n_view, 3, 3))
+    # k1, k2, p1, p2, k3, k4, k5, k6
+    dist_coeffs = np.zeros(shape=(n_view, 8))
+    for view_idx, cam_param in enumerate(cam_list):
+        r_mats[view_idx] = cam_param.get_extrinsic_r()
+        t_vecs[view_idx] = cam_param.get_extrinsic_t()
+        k_mats[view_idx] = cam_param.get_intrinsic(k_dim=3)
+        if isinstance(cam_param, FisheyeCameraParameter):
+            dist_coeffs[view_idx] = [
+                cam_param.k1, cam_param.k2, cam_param.p1, cam_param.p2,
+                cam_param.k3, cam_param.k4, cam_param.k5, cam_param.k6
+            ]
+    points_cam = np.matmul(points3d, r_mats[view_idxs].transpose(0, 2, 1)) + \
+        t_vecs[view_idxs, None]
+    xy = points_cam[..., :2] / points_cam[..., 2:]
+    x, y = xy[..., 0], xy[..., 1]
+    k1, k2, p1, p2, k3, k4, k5, k6 = \
+        dist_coeffs[view_idxs, :, None].transpose(1, 0, 2)
+    r2 = x * x + y * y
+    radial = (1 + ((k3 * r2 + k2) * r2 + k1) * r2) / \
+        (1 + ((k6 * r2 + k5) * r2 + k4) * r2)
+    x_distorted = x * radial + 2 * p1 * x * y + p2 * (r2 + 2 * x * x)
+    y_distorted = y * radial + p1 * (r2 + 2 * y * y) + 2 * p2 * x * y
+    k_mats = k_mats[view_idxs, None]
+    # like cv2.projectPoints, skew is ignored
+    return np.stack((k_mats[..., 0, 0] * x_distorted + k_mats[..., 0, 2],
+                     k_mats[..., 1, 1] * y_distorted + k_mats[..., 1, 2]),
+                    axis=-1)
+
+
+def _masked_mean(array: np.ndarray, mask: np.ndarray,
+                 axis: tuple) -> np.ndarray:
+    """Mean of array where mask is True, np.nan for empty slices."""
+    count = mask.sum(axis=axis)
+    total = np.where(mask, array, 0).sum(axis=axis)
+    ret_array = np.full(shape=count.shape, fill_value=np.nan)
+    np.divide(total, count, out=ret_array, where=count > 0)
+    return ret_array
@@ -1,17 +1,15 @@
 import logging
-import os
-import shutil
 from typing import List, Tuple, Union
 
-import cv2
 import numpy as np
 
-from xrprimer.data_structure.camera import FisheyeCameraParameter
-from xrprimer.transform.camera.distortion import undistort_images
-from xrprimer.utils.path_utils import (
-    Existence,
-    check_path_existence,
-    prepare_output_path,
+from xrprimer.data_structure.camera import (
+    FisheyeCameraParameter,
+    PinholeCameraParameter,
+)
+from xrprimer.transform.camera.distortion import (
+    undistort_camera,
+    undistort_points,
 )
 from .mview_pinhole_calibrator import MviewPinholeCalibrator
 from .sview_fisheye_calibrator import SviewFisheyeDistortionCalibrator
@@ -28,6 +26,9 @@ class MviewFisheyeCalibrator(MviewPinholeCalibrator):
                  calibrate_intrinsic: bool = False,
                  calibrate_distortion: bool = False,
                  calibrate_extrinsic: bool = True,
+                 max_frames: Union[int, None] = None,
+                 n_workers: int = 4,
+                 corner_cache_dir: Union[str, None] = None,
                  logger: Union[None, str, logging.Logger] = None) -> None:
         """Initialization for MviewFisheyeCalibrator class.
 
@@ -41,8 +42,9 @@ class MviewFisheyeCalibrator(MviewPinholeCalibrator):
             chessboard_square_size (int):
                 The edge length of a unit square in millimeter.
             work_dir (str):
-                A path to an empty dir or nonexistent dir, undistorted
-                frames will be saved there.
+                A path to the working dir. Kept for compatibility,
+                nothing is written there since chessboard corners
+                are undistorted in memory.
             calibrate_intrinsic (bool, optional):
                 Whether to calibrate intrinsic. Defaults to False.
             calibrate_distortion (bool, optional):
@@ -50,6 +52,18 @@ class MviewFisheyeCalibrator(MviewPinholeCalibrator):
                 Defaults to False.
             calibrate_extrinsic (bool, optional):
                 Whether to calibrate extrinsic. Defaults to True.
+            max_frames (Union[int, None], optional):
+                Max number of frames passed to the extrinsic optimization.
+                If there are more frames, a diverse subset is selected by
+                board pose coverage and view-pair co-visibility.
+                Defaults to None, use all frames.
+            n_workers (int, optional):
+                Number of threads detecting chessboard corners.
+                Defaults to 4.
+            corner_cache_dir (Union[str, None], optional):
+                Path to the directory caching detected corners,
+                keyed by image hash and pattern size.
+                Defaults to None, do not cache.
             logger (Union[None, str, logging.Logger], optional):
                 Logger for logging. If None, root logger will be selected.
                 Defaults to None.
@@ -59,6 +73,9 @@ class MviewFisheyeCalibrator(MviewPinholeCalibrator):
             chessboard_width=chessboard_width,
             chessboard_height=chessboard_height,
             chessboard_square_size=chessboard_square_size,
+            max_frames=max_frames,
+            n_workers=n_workers,
+            corner_cache_dir=corner_cache_dir,
             logger=logger)
         self.work_dir = work_dir
         if calibrate_intrinsic:
@@ -75,39 +92,51 @@ class MviewFisheyeCalibrator(MviewPinholeCalibrator):
 
     def calibrate(
         self,
-        frames: List[List[str]],
+        frames: Union[List[List[str]], None],
         fisheye_param_list: List[FisheyeCameraParameter],
+        mview_corners: Union[List[List[Union[np.ndarray, None]]], None] = None,
     ) -> List[FisheyeCameraParameter]:
         """Calibrate multi-FisheyeCameraParameters with a chessboard. It takes
         intrinsics and distortion coefficients from fisheye_param_list,
-        calibrates only extrinsics on undistorted frames.
+        calibrates only extrinsics on undistorted chessboard corners.
 
         Args:
-            frames (List[List[str]]):
+            frames (Union[List[List[str]], None]):
                 A nested list of distorted image paths. The shape is
                 [n_frame, n_view], and each element is the path to
                 an image file. '' stands for an empty image.
+                It could be None if mview_corners is given.
             fisheye_param_list (List[FisheyeCameraParameter]):
                 A list of FisheyeCameraParameters. Intrinsic matrix
                 and distortion coefficients are necessary for calibration.
+            mview_corners (Union[List[List[Union[np.ndarray, None]]], None],
+                    optional):
+                Precomputed chessboard corners in the distorted frames.
+                The shape is [n_frame, n_view], and each element is
+                an array in shape [n_corner, 2], or None for pattern
+                not found.
+                Defaults to None, find corners in frames.
 
         Returns:
             List[FisheyeCameraParameter]:
                 A list of calibrated fisheye cameras, name, logger,
                 resolution will be kept.
         """
-        prepare_output_path(
-            output_path=self.work_dir,
-            path_type='dir',
-            overwrite=False,
-            logger=self.logger)
-        if len(frames) <= 0:
-            self.logger.error('Frames are necessary for fisheye extrinsic' +
-                              ' calibration.')
-            raise ValueError
-        if len(frames[0]) != len(fisheye_param_list):
-            self.logger.error(
-                'n_view of frames must be equal to len(fisheye_param_list).')
+        if mview_corners is None:
+            if frames is None or len(frames) <= 0:
+                self.logger.error('Frames are necessary for fisheye' +
+                                  ' extrinsic calibration.')
+                raise ValueError
+            if len(frames[0]) != len(fisheye_param_list):
+                self.logger.error('n_view of frames must be equal to' +
+                                  ' len(fisheye_param_list).')
+                raise ValueError
+            # corners are found only once for all the stages
+            mview_corners = self.find_mview_corners(frames=frames)
+        elif len(mview_corners) <= 0 or \
+                len(mview_corners[0]) != len(fisheye_param_list):
+            self.logger.error('n_view of mview_corners must be equal to' +
+                              ' len(fisheye_param_list).')
             raise ValueError
         ret_list = [fisheye_param for fisheye_param in fisheye_param_list]
         if self.calibrate_distortion:
@@ -116,26 +145,30 @@ class MviewFisheyeCalibrator(MviewPinholeCalibrator):
                 chessboard_height=self.chessboard_height,
                 logger=self.logger)
             for view_idx, fisheye_param in enumerate(ret_list):
-                sview_frames = []
-                for mview_frames in frames:
-                    if len(mview_frames[view_idx]) > 0:
-                        sview_frames.append(mview_frames[view_idx])
+                sview_frames = None
+                if frames is not None:
+                    sview_frames = [
+                        mview_frames[view_idx] for mview_frames in frames
+                    ]
                 calibrated_fisheye_param = \
                     sview_distortion_calibrator.calibrate(
                         frames=sview_frames,
-                        fisheye_param=fisheye_param)
+                        fisheye_param=fisheye_param,
+                        sview_corners=[
+                            sframe_corners[view_idx]
+                            for sframe_corners in mview_corners
+                        ])
                 ret_list[view_idx] = calibrated_fisheye_param
         if self.calibrate_extrinsic:
-            undistorted_frames, pinhole_param_list = \
-                self.__prepare_undistorted_frames__(
-                    frames=frames,
+            undist_mview_corners, pinhole_param_list = \
+                self.__undistort_corners__(
+                    mview_corners=mview_corners,
                     fisheye_param_list=ret_list)
-            pinhole_param_list = MviewPinholeCalibrator.calibrate(
+            pinhole_param_list = MviewPinholeCalibrator.calibrate_corners(
                 self,
-                frames=undistorted_frames,
+                mview_corners=undist_mview_corners,
                 pinhole_param_list=pinhole_param_list,
             )
-            self.__remove_work_dir__()
             for view_idx, pinhole_param in enumerate(pinhole_param_list):
                 fisheye_param = ret_list[view_idx].clone()
                 fisheye_param.convention = 'opencv'
@@ -146,72 +179,52 @@ class MviewFisheyeCalibrator(MviewPinholeCalibrator):
                 ret_list[view_idx] = fisheye_param
         return ret_list
 
-    def __prepare_undistorted_frames__(
+    def __undistort_corners__(
         self,
-        frames: List[List[str]],
+        mview_corners: List[List[Union[np.ndarray, None]]],
         fisheye_param_list: List[FisheyeCameraParameter],
-    ) -> Tuple[List[List[str]], List[FisheyeCameraParameter]]:
-        """Undistort images in frames, return paths to undistorted images and
+    ) -> Tuple[List[List[Union[np.ndarray, None]]],
+               List[PinholeCameraParameter]]:
+        """Undistort chessboard corners found in distorted images, instead of
+        undistorting the whole images. Return undistorted corners and
         undistorted pinhole cameras.
 
         Args:
-            frames (List[List[str]]):
-                A nested list of distorted image paths. The shape is
-                [n_frame, n_view], and each element is the path to
-                an image file. '' stands for an empty image.
+            mview_corners (List[List[Union[np.ndarray, None]]]):
+                A nested list of distorted corners in shape
+                [n_corner, 2]. The shape is [n_frame, n_view].
+                None stands for a view without pattern found.
             fisheye_param_list (List[FisheyeCameraParameter]):
                 A list of FisheyeCameraParameters. Intrinsic matrix
                 and distortion coefficients are necessary for calibration.
 
         Returns:
-            undistorted_frames (List[List[str]]):
-                A nested list of undistorted image paths.
-            pinhole_param_list (List[FisheyeCameraParameter]):
+            undist_mview_corners (List[List[Union[np.ndarray, None]]]):
+                A nested list of undistorted corners in shape
+                [n_corner, 2]. None stands for a view without
+                pattern found.
+            pinhole_param_list (List[PinholeCameraParameter]):
                 A list of PinholeCameraParameters
         """
         n_view = len(fisheye_param_list)
         pinhole_param_list = []
-        undistorted_frames = [[] for _ in range(len(frames))]
+        undist_mview_corners = [[None] * n_view for _ in mview_corners]
         for view_idx in range(n_view):
-            sview_path_list = []
-            default_shape = None
-            for frame_idx, mview_paths in enumerate(frames):
-                img_path = mview_paths[view_idx]
-                if default_shape is None and len(img_path) > 0:
-                    default_shape = cv2.imread(img_path).shape
-                sview_path_list.append(img_path)
-            sview_img_list = []
+            sview_corners_list = []
             sview_idx_list = []
-            for frame_idx, img_path in enumerate(sview_path_list):
-                if len(img_path) > 0:
-                    img = cv2.imread(img_path)
-                    sview_img_list.append(img)
+            for frame_idx, sframe_corners in enumerate(mview_corners):
+                if sframe_corners[view_idx] is not None:
+                    sview_corners_list.append(sframe_corners[view_idx])
                     sview_idx_list.append(frame_idx)
-            sview_img_arr = np.asarray(sview_img_list)
-            pinhole_param, undist_img_arr = undistort_images(
-                distorted_cam=fisheye_param_list[view_idx],
-                image_array=sview_img_arr)
+            if len(sview_corners_list) > 0:
+                # undistort corners of all frames in one call
+                pinhole_param, undist_corners = undistort_points(
+                    distorted_cam=fisheye_param_list[view_idx],
+                    points=np.stack(sview_corners_list, axis=0))
+                for corners, frame_idx in zip(undist_corners, sview_idx_list):
+                    undist_mview_corners[frame_idx][view_idx] = corners
+            else:
+                pinhole_param = undistort_camera(
+                    distorted_cam=fisheye_param_list[view_idx])
             pinhole_param_list.append(pinhole_param)
-            sview_img_list = [img_arr for img_arr in undist_img_arr]
-            for img, frame_idx in zip(sview_img_list, sview_idx_list):
-                path = os.path.join(
-                    self.work_dir,
-                    f'frame_{frame_idx:06d}_view_{view_idx:03d}.png')
-                cv2.imwrite(path, img)
-            for frame_idx, img_path in enumerate(sview_path_list):
-                path = os.path.join(
-                    self.work_dir,
-                    f'frame_{frame_idx:06d}_view_{view_idx:03d}.png')
-                if len(img_path) > 0:
-                    undistorted_frames[frame_idx].append(path)
-                else:
-                    undistorted_frames[frame_idx].append('')
-        return undistorted_frames, pinhole_param_list
-
-    def __remove_work_dir__(self):
-        """Remove temp files in self.work_dir."""
-        if check_path_existence(self.work_dir) == \
-                Existence.DirectoryExistEmpty or \
-                check_path_existence(self.work_dir) == \
-                Existence.DirectoryExistNotEmpty:
-            shutil.rmtree(self.work_dir)
+        return undist_mview_corners, pinhole_param_list
@@ -1,12 +1,22 @@
 import json
 import logging
+import time
 from typing import List, Union
 
+import numpy as np
+
 from xrprimer.data_structure.camera import PinholeCameraParameter
+from xrprimer.transform.convention.camera import convert_camera_parameter
+from xrprimer_cpp import VectorFloat as VectorFloat_cpp
+from xrprimer_cpp import VectorInt as VectorInt_cpp
 from xrprimer_cpp import \
     VectorPinholeCameraParameter as VectorPinholeCameraParameter_cpp
 from xrprimer_cpp import calibrator as calibrator_cpp
 from .base_calibrator import BaseCalibrator
+from .chessboard_utils import (
+    batch_find_chessboard_corners,
+    select_mview_frames,
+)
 
 
 class MviewPinholeCalibrator(BaseCalibrator):
@@ -18,6 +28,9 @@ class MviewPinholeCalibrator(BaseCalibrator):
                  chessboard_square_size: int,
                  calibrate_intrinsic: bool = False,
                  calibrate_extrinsic: bool = True,
+                 max_frames: Union[int, None] = None,
+                 n_workers: int = 4,
+                 corner_cache_dir: Union[str, None] = None,
                  logger: Union[None, str, logging.Logger] = None) -> None:
         """Initialization for MviewPinholeCalibrator class.
 
@@ -34,6 +47,18 @@ class MviewPinholeCalibrator(BaseCalibrator):
                 Whether to calibrate intrinsic. Defaults to False.
             calibrate_extrinsic (bool, optional):
                 Whether to calibrate extrinsic. Defaults to True.
+            max_frames (Union[int, None], optional):
+                Max number of frames passed to the optimization. If there
+                are more frames, a diverse subset is selected by board pose
+                coverage and view-pair co-visibility.
+                Defaults to None, use all frames.
+            n_workers (int, optional):
+                Number of threads detecting chessboard corners.
+                Defaults to 4.
+            corner_cache_dir (Union[str, None], optional):
+                Path to the directory caching detected corners,
+                keyed by image hash and pattern size.
+                Defaults to None, do not cache.
             logger (Union[None, str, logging.Logger], optional):
                 Logger for logging. If None, root logger will be selected.
                 Defaults to None.
@@ -42,6 +67,9 @@ class MviewPinholeCalibrator(BaseCalibrator):
         self.chessboard_width = chessboard_width
         self.chessboard_height = chessboard_height
         self.chessboard_square_size = chessboard_square_size
+        self.max_frames = max_frames
+        self.n_workers = n_workers
+        self.corner_cache_dir = corner_cache_dir
         if calibrate_intrinsic:
             self.logger.error('Intrinsic calibration not implemented yet.')
             raise NotImplementedError
@@ -51,19 +79,98 @@ class MviewPinholeCalibrator(BaseCalibrator):
             raise ValueError
         self.calibrate_intrinsic = calibrate_intrinsic
         self.calibrate_extrinsic = calibrate_extrinsic
+        # iterations of the last extrinsic optimization from scratch
+        self.cold_start_n_iterations = None
 
     def calibrate(
         self,
-        frames: List[List[str]],
+        frames: Union[List[List[str]], None],
         pinhole_param_list: List[PinholeCameraParameter],
+        mview_corners: Union[List[List[Union[np.ndarray, None]]], None] = None,
     ) -> List[PinholeCameraParameter]:
         """Calibrate multi-PinholeCameraParameters with a chessboard.
 
+        Args:
+            frames (Union[List[List[str]], None]):
+                A nested list of image paths. The shape is
+                [n_frame, n_view], and each element is the path to
+                an image file. '' stands for an empty image.
+                It could be None if mview_corners is given.
+            pinhole_param_list (List[PinholeCameraParameter]):
+                A list of PinholeCameraParameters. Intrinsic matrix
+                is necessary for calibration.
+            mview_corners (Union[List[List[Union[np.ndarray, None]]], None],
+                    optional):
+                Precomputed chessboard corners, see calibrate_corners().
+                Defaults to None, find corners in frames.
+
+        Returns:
+            List[PinholeCameraParameter]:
+                A list of calibrated pinhole cameras, name, logger,
+                resolution will be kept.
+        """
+        if mview_corners is None:
+            if frames is None or len(frames) <= 0:
+                self.logger.error('Frames are necessary for pinhole' +
+                                  ' extrinsic calibration.')
+                raise ValueError
+            if len(frames[0]) != len(pinhole_param_list):
+                self.logger.error('n_view of frames must be equal to' +
+                                  ' len(pinhole_param_list).')
+                raise ValueError
+            mview_corners = self.find_mview_corners(frames=frames)
+        return self.calibrate_corners(
+            mview_corners=mview_corners, pinhole_param_list=pinhole_param_list)
+
+    def find_mview_corners(
+            self,
+            frames: List[List[str]]) -> List[List[Union[np.ndarray, None]]]:
+        """Find chessboard corners in multi-view frames, with a thread pool
+        and the corner cache of this calibrator.
+
         Args:
             frames (List[List[str]]):
                 A nested list of image paths. The shape is
                 [n_frame, n_view], and each element is the path to
                 an image file. '' stands for an empty image.
+
+        Returns:
+            List[List[Union[np.ndarray, None]]]:
+                A nested list of corners in shape [n_corner, 2].
+                None stands for a view without pattern found.
+        """
+        img_paths = [
+            img_path for mview_paths in frames for img_path in mview_paths
+        ]
+        corners_list = batch_find_chessboard_corners(
+            img_paths=img_paths,
+            chessboard_width=self.chessboard_width,
+            chessboard_height=self.chessboard_height,
+            n_workers=self.n_workers,
+            cache_dir=self.corner_cache_dir,
+            logger=self.logger)
+        mview_corners = []
+        start = 0
+        for mview_paths in frames:
+            mview_corners.append(corners_list[start:start + len(mview_paths)])
+            start += len(mview_paths)
+        return mview_corners
+
+    def calibrate_corners(
+        self,
+        mview_corners: List[List[Union[np.ndarray, None]]],
+        pinhole_param_list: List[PinholeCameraParameter],
+    ) -> List[PinholeCameraParameter]:
+        """Calibrate multi-PinholeCameraParameters with chessboard corners
+        detected in advance. No image is read.
+
+        Args:
+            mview_corners (List[List[Union[np.ndarray, None]]]):
+                A nested list of chessboard corners. The shape is
+                [n_frame, n_view], and each element is an array
+                of corner locations in shape [n_corner, 2], in the
+                order of cv2.findChessboardCorners.
+                None stands for a view without pattern found.
             pinhole_param_list (List[PinholeCameraParameter]):
                 A list of PinholeCameraParameters. Intrinsic matrix
                 is necessary for calibration.
@@ -73,36 +180,193 @@ class MviewPinholeCalibrator(BaseCalibrator):
                 A list of calibrated pinhole cameras, name, logger,
                 resolution will be kept.
         """
+        if len(mview_corners) <= 0:
+            self.logger.error('Corners are necessary for pinhole extrinsic' +
+                              ' calibration.')
+            raise ValueError
+        if len(mview_corners[0]) != len(pinhole_param_list):
+            self.logger.error('n_view of mview_corners must be equal to' +
+                              ' len(pinhole_param_list).')
+            raise ValueError
+        ret_list = []
+        if self.calibrate_extrinsic:
+            corner_groups = self.__get_corner_groups__(mview_corners)
+            pinhole_vector = VectorPinholeCameraParameter_cpp(
+                pinhole_param_list)
+            start_time = time.time()
+            n_iterations = \
+                calibrator_cpp.CalibrateMultiPinholeCameraFromCorners(
+                    self.__get_chessboard_config_str__(), corner_groups,
+                    pinhole_vector)
+            if n_iterations < 0:
+                self.logger.warning('Failed to initialize extrinsics of' +
+                                    ' all cameras.')
+            else:
+                self.cold_start_n_iterations = n_iterations
+            self.logger.info(
+                f'Extrinsic calibration on {len(corner_groups)} frames' +
+                f' took {time.time() - start_time:.2f}s,' +
+                f' {n_iterations} iterations.')
+            ret_list = self.__parse_pinhole_vector__(
+                pinhole_vector=pinhole_vector,
+                pinhole_param_list=pinhole_param_list)
+        return ret_list
+
+    def calibrate_incremental(
+        self,
+        frames: Union[List[List[str]], None],
+        pinhole_param_list: List[PinholeCameraParameter],
+        fixed_camera_indexes: Union[List[int], None] = None,
+        mview_corners: Union[List[List[Union[np.ndarray, None]]], None] = None,
+    ) -> List[PinholeCameraParameter]:
+        """Refine calibrated multi-PinholeCameraParameters with new chessboard
+        frames, warm started from their current extrinsics. It is much
+        cheaper than calibrate() when only a few cameras in a rig moved.
+
+        Cameras in fixed_camera_indexes are kept unchanged and frames seen
+        only by them are skipped, so only the other cameras are
+        re-optimized. Pass old frames together with the new ones to
+        keep constraints from the previous calibration.
 
-        if len(frames) <= 0:
-            self.logger.error('Frames are necessary for pinhole extrinsic' +
+        Args:
+            frames (Union[List[List[str]], None]):
+                A nested list of image paths. The shape is
+                [n_frame, n_view], and each element is the path to
+                an image file. '' stands for an empty image.
+                It could be None if mview_corners is given.
+            pinhole_param_list (List[PinholeCameraParameter]):
+                A list of calibrated PinholeCameraParameters, as the
+                initial value of the optimization.
+            fixed_camera_indexes (Union[List[int], None], optional):
+                Indexes of cameras which shall not be changed. If not
+                empty, the fixed cameras define the world coordinate,
+                otherwise the first camera does, like calibrate().
+                Defaults to None, optimize all cameras.
+            mview_corners (Union[List[List[Union[np.ndarray, None]]], None],
+                    optional):
+                Precomputed chessboard corners, see calibrate_corners().
+                Defaults to None, find corners in frames.
+
+        Raises:
+            ValueError: Frames or corners are not given, or do not match
+                pinhole_param_list.
+            ValueError: fixed_camera_indexes is out of range, or all
+                cameras are fixed.
+
+        Returns:
+            List[PinholeCameraParameter]:
+                A list of refined pinhole cameras, name, logger,
+                resolution will be kept.
+        """
+        if mview_corners is None:
+            if frames is None or len(frames) <= 0:
+                self.logger.error('Frames are necessary for pinhole' +
+                                  ' extrinsic calibration.')
+                raise ValueError
+            mview_corners = self.find_mview_corners(frames=frames)
+        if len(mview_corners) <= 0:
+            self.logger.error('Corners are necessary for pinhole extrinsic' +
                               ' calibration.')
             raise ValueError
-        if len(frames[0]) != len(pinhole_param_list):
-            self.logger.error(
-                'n_view of frames must be equal to len(pinhole_param_list).')
+        n_view = len(pinhole_param_list)
+        if len(mview_corners[0]) != n_view:
+            self.logger.error('n_view of mview_corners must be equal to' +
+                              ' len(pinhole_param_list).')
             raise ValueError
+        fixed_camera_indexes = sorted(set(fixed_camera_indexes)) \
+            if fixed_camera_indexes is not None else []
+        for cam_idx in fixed_camera_indexes:
+            if cam_idx < 0 or cam_idx >= n_view:
+                self.logger.error(f'Fixed camera index {cam_idx} is out of' +
+                                  f' range [0, {n_view}).')
+                raise ValueError
+        if len(fixed_camera_indexes) >= n_view:
+            self.logger.error('At least one camera shall not be fixed.')
+            raise ValueError
+        if not self.calibrate_extrinsic:
+            return []
+        # the cpp calibrator projects with opencv world2cam extrinsics
+        init_param_list = []
+        for input_param in pinhole_param_list:
+            init_param = input_param.clone()
+            if not init_param.world2cam:
+                init_param.inverse_extrinsic()
+            if init_param.convention != 'opencv':
+                init_param = convert_camera_parameter(
+                    cam_param=init_param, dst='opencv')
+            init_param_list.append(init_param)
+        corner_groups = self.__get_corner_groups__(mview_corners)
+        pinhole_vector = VectorPinholeCameraParameter_cpp(init_param_list)
+        start_time = time.time()
+        n_iterations = calibrator_cpp.CalibrateMultiPinholeCameraIncremental(
+            self.__get_chessboard_config_str__(), corner_groups,
+            VectorInt_cpp(fixed_camera_indexes), pinhole_vector)
+        if n_iterations < 0:
+            self.logger.error('No valid frame for incremental calibration.')
+            raise ValueError
+        log_str = 'Incremental extrinsic calibration on' + \
+            f' {len(corner_groups)} frames,' + \
+            f' {n_view - len(fixed_camera_indexes)}/{n_view} cameras' + \
+            f' took {time.time() - start_time:.2f}s,' + \
+            f' {n_iterations} iterations'
+        if self.cold_start_n_iterations is not None:
+            log_str += ', saved' + \
+                f' {self.cold_start_n_iterations - n_iterations}' + \
+                ' iterations compared with the last calibration' + \
+                ' from scratch'
+        self.logger.info(log_str + '.')
+        return self.__parse_pinhole_vector__(
+            pinhole_vector=pinhole_vector,
+            pinhole_param_list=pinhole_param_list)
+
+    def __get_corner_groups__(
+        self, mview_corners: List[List[Union[np.ndarray, None]]]
+    ) -> List[List[VectorFloat_cpp]]:
+        if self.max_frames is not None and \
+                len(mview_corners) > self.max_frames:
+            selected_frame_idxs, _ = select_mview_frames(
+                mview_corners=mview_corners,
+                max_frames=self.max_frames,
+                logger=self.logger)
+            mview_corners = [
+                mview_corners[frame_idx] for frame_idx in selected_frame_idxs
+            ]
+        # frames/cameras/[x, y] * points, empty for not found
+        return [[_get_corner_vector(corners) for corners in sframe_corners]
+                for sframe_corners in mview_corners]
+
+    def __get_chessboard_config_str__(self) -> str:
         chessboard_config_dict = dict(
             chessboard_width=self.chessboard_width,
             chessboard_height=self.chessboard_height,
             chessboard_square_size=self.chessboard_square_size)
+        return json.dumps(chessboard_config_dict)
+
+    def __parse_pinhole_vector__(
+        self, pinhole_vector: VectorPinholeCameraParameter_cpp,
+        pinhole_param_list: List[PinholeCameraParameter]
+    ) -> List[PinholeCameraParameter]:
         ret_list = []
-        if self.calibrate_extrinsic:
-            chessboard_config_str = json.dumps(chessboard_config_dict)
-            pinhole_vector = VectorPinholeCameraParameter_cpp(
-                pinhole_param_list)
-            calibrator_cpp.CalibrateMultiPinholeCamera(chessboard_config_str,
-                                                       frames, pinhole_vector)
-            for cam_idx, pinhole_param_cpp in enumerate(pinhole_vector):
-                pinhole_param = PinholeCameraParameter(
-                    name=pinhole_param_list[cam_idx].name,
-                    K=pinhole_param_cpp.intrinsic,
-                    R=pinhole_param_cpp.extrinsic_r,
-                    T=pinhole_param_cpp.extrinsic_t,
-                    height=pinhole_param_list[cam_idx].height,
-                    width=pinhole_param_list[cam_idx].width,
-                    world2cam=False,
-                    convention='opencv',
-                    logger=pinhole_param_list[cam_idx].logger)
-                ret_list.append(pinhole_param)
+        for cam_idx, pinhole_param_cpp in enumerate(pinhole_vector):
+            pinhole_param = PinholeCameraParameter(
+                name=pinhole_param_list[cam_idx].name,
+                K=pinhole_param_cpp.intrinsic,
+                R=pinhole_param_cpp.extrinsic_r,
+                T=pinhole_param_cpp.extrinsic_t,
+                height=pinhole_param_list[cam_idx].height,
+                width=pinhole_param_list[cam_idx].width,
+                world2cam=False,
+                convention='opencv',
+                logger=pinhole_param_list[cam_idx].logger)
+            ret_list.append(pinhole_param)
         return ret_list
+
+
+def _get_corner_vector(corners: Union[np.ndarray, None]) -> VectorFloat_cpp:
+    """Flatten corners to [x0, y0, x1, y1, ...]. std::vector<float> is
+    bound as an opaque type, so a python list is not converted
+    implicitly."""
+    if corners is None:
+        return VectorFloat_cpp()
+    return VectorFloat_cpp(
+        np.asarray(corners, dtype=np.float32).reshape(-1).tolist())
@@ -6,6 +6,7 @@ import numpy as np
 
 from xrprimer.data_structure.camera import FisheyeCameraParameter
 from .base_calibrator import BaseCalibrator
+from .chessboard_utils import batch_find_chessboard_corners
 
 
 class SviewFisheyeDistortionCalibrator(BaseCalibrator):
@@ -17,6 +18,8 @@ class SviewFisheyeDistortionCalibrator(BaseCalibrator):
     def __init__(self,
                  chessboard_width: int,
                  chessboard_height: int,
+                 n_workers: int = 4,
+                 corner_cache_dir: Union[str, None] = None,
                  logger: Union[None, str, logging.Logger] = None) -> None:
         """Initialization for SviewFisheyeDistortionCalibrator class.
 
@@ -27,6 +30,13 @@ class SviewFisheyeDistortionCalibrator(BaseCalibrator):
             chessboard_height (int):
                 How many internal corners along the
                 vertical edge of the chessboard.
+            n_workers (int, optional):
+                Number of threads detecting chessboard corners.
+                Defaults to 4.
+            corner_cache_dir (Union[str, None], optional):
+                Path to the directory caching detected corners,
+                keyed by image hash and pattern size.
+                Defaults to None, do not cache.
             logger (Union[None, str, logging.Logger], optional):
                 Logger for logging. If None, root logger will be selected.
                 Defaults to None.
@@ -34,36 +44,59 @@ class SviewFisheyeDistortionCalibrator(BaseCalibrator):
         BaseCalibrator.__init__(self, logger=logger)
         self.chessboard_width = chessboard_width
         self.chessboard_height = chessboard_height
+        self.n_workers = n_workers
+        self.corner_cache_dir = corner_cache_dir
 
     def calibrate(
         self,
-        frames: List[str],
+        frames: Union[List[str], None],
         fisheye_param: FisheyeCameraParameter,
+        sview_corners: Union[List[Union[np.ndarray, None]], None] = None,
     ) -> FisheyeCameraParameter:
         """Calibrate FisheyeCameraParameter with a chessboard. It takes
         intrinsics from fisheye_param, calibrates only distortion coefficients
-        on undistorted frames.
+        on distorted frames.
 
         Args:
-            frames (List[str]):
+            frames (Union[List[str], None]):
                 A list of distorted image paths.
+                It could be None if sview_corners is given.
             fisheye_param (FisheyeCameraParameter):
                 An instance of FisheyeCameraParameter. Intrinsic matrix
                 is necessary for calibration, and the input instance
                 will not be modified.
+            sview_corners (Union[List[Union[np.ndarray, None]], None],
+                    optional):
+                Precomputed chessboard corners in the distorted frames,
+                each in shape [n_corner, 2] or None for pattern not found.
+                Defaults to None, find corners in frames.
 
         Returns:
             FisheyeCameraParameter:
                 An instance of FisheyeCameraParameter. Distortion coefficients
                 are the only difference from input.
         """
-        if len(frames) <= 0:
-            self.logger.error('Frames are necessary for fisheye distortion' +
-                              ' calibration.')
-            raise ValueError
-        # termination criteria
-        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30,
-                    0.001)
+        if sview_corners is None:
+            if frames is None or len(frames) <= 0:
+                self.logger.error('Frames are necessary for fisheye' +
+                                  ' distortion calibration.')
+                raise ValueError
+            sview_corners = batch_find_chessboard_corners(
+                img_paths=frames,
+                chessboard_width=self.chessboard_width,
+                chessboard_height=self.chessboard_height,
+                n_workers=self.n_workers,
+                cache_dir=self.corner_cache_dir,
+                logger=self.logger)
+        # image size from the first image, or from fisheye_param
+        # if there's no image
+        height, width = fisheye_param.height, fisheye_param.width
+        if frames is not None:
+            for frame_path in frames:
+                img = cv2.imread(frame_path) if len(frame_path) > 0 else None
+                if img is not None:
+                    height, width = img.shape[:2]
+                    break
         # prepare object points in (x, y, 0),
         # like (0,0,0), (1,0,0), (2,0,0), ...
         sframe_obj_points = np.zeros(
@@ -73,20 +106,14 @@ class SviewFisheyeDistortionCalibrator(BaseCalibrator):
             0:self.chessboard_height].T.reshape(-1, 2)
         mframe_obj_points = []  # 3d point in real world space
         mframe_img_points = []  # 2d points in image plane.
-        for _, frame_path in enumerate(frames):
-            img = cv2.imread(frame_path)
-            if len(img.shape) == 3 and img.shape[-1] == 3:
-                img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            height, width = img.shape
-            # Find the chess board corners
-            pattern_found, corners = cv2.findChessboardCorners(
-                img, (self.chessboard_width, self.chessboard_height), None)
-            # If found, add object points, image points (after refining them)
-            if pattern_found:
+        for corners in sview_corners:
+            if corners is not None:
                 mframe_obj_points.append(sframe_obj_points.copy())
-                better_conners = cv2.cornerSubPix(img, corners, (11, 11),
-                                                  (-1, -1), criteria)
-                mframe_img_points.append(better_conners)
+                mframe_img_points.append(
+                    np.asarray(corners, dtype=np.float32).reshape(-1, 1, 2))
+        if len(mframe_img_points) <= 0:
+            self.logger.error('Chessboard is not found in any frame.')
+            raise ValueError
         # use preset-intrinsic and fix fx, fy, cx, cy
         calib_flags = cv2.CALIB_USE_INTRINSIC_GUESS + \
             cv2.CALIB_FIX_PRINCIPAL_POINT + \
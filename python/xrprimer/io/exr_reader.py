@@ -7,7 +7,7 @@ refer to the following link:
 https://github.com/AcademySoftwareFoundation/openexr/blob/main/INSTALL.md
 """
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import Dict, List, Tuple, Union
 
 import numpy as np
 
@@ -42,9 +42,12 @@ class ExrReader:
                   ' in order to read .exr format files.')
             raise ImportError
         file_ = OpenEXR.InputFile(str(exr_path))
-        dw = file_.header()['dataWindow']
+        # header is parsed once, every read below reuses it
+        header = file_.header()
+        dw = header['dataWindow']
         size = (dw.max.x - dw.min.x + 1, dw.max.y - dw.min.y + 1)
         self.file = file_
+        self.header: Dict = header
         self.size: Tuple[int, int] = size
 
     @property
@@ -54,7 +57,7 @@ class ExrReader:
         Returns:
             List[str]: list of channel names
         """
-        return self.file.header()['channels']
+        return self.header['channels']
 
     def read_channel(self, channel: str) -> np.ndarray:
         """Read channel's data.
@@ -65,17 +68,60 @@ class ExrReader:
         Returns:
             np.ndarray: channel's data in np.ndarray format with shape (H, W)
         """
-        ChannelType = self.file.header()['channels'][channel]
-        if ChannelType == Imath.Channel(Imath.PixelType(Imath.PixelType.HALF)):
-            PixType = Imath.PixelType(Imath.PixelType.HALF)
-            dtype = np.float16
-        elif ChannelType == Imath.Channel(
-                Imath.PixelType(Imath.PixelType.FLOAT)):
-            PixType = Imath.PixelType(Imath.PixelType.FLOAT)
-            dtype = np.float32
-        else:
-            raise ValueError('please specify PixelType')
+        return self.read_channels([channel])[..., 0]
+
+    def read_channels(self,
+                      channels: List[str],
+                      dtype: Union[type, np.dtype] = np.float32,
+                      out: Union[np.ndarray, None] = None) -> np.ndarray:
+        """Read data of several channels, decoded by OpenEXR in one pass.
+        Pixels are converted to dtype by OpenEXR, so that half channels can
+        be kept in half precision, or read as float without an extra copy.
+
+        Args:
+            channels (List[str]): channels' names, e.g. ['R', 'G', 'B']
+            dtype (Union[type, np.dtype], optional): np.float32 or
+                np.float16. Defaults to np.float32.
+            out (Union[np.ndarray, None], optional): a preallocated array
+                of shape (H, W, C) and dtype, to be reused among files of
+                the same size. Defaults to None, allocate a new one.
 
-        img = np.frombuffer(self.file.channel(channel, PixType), dtype=dtype)
-        img = np.reshape(img, (self.size[1], self.size[0])).astype(np.float32)
-        return img
+        Raises:
+            ValueError: a channel is not found, or its PixelType is
+                neither HALF nor FLOAT.
+            ValueError: dtype is not supported, or out does not match.
+
+        Returns:
+            np.ndarray: channels' data in np.ndarray format
+                with shape (H, W, C)
+        """
+        dtype = np.dtype(dtype)
+        if dtype == np.float16:
+            pix_type = Imath.PixelType(Imath.PixelType.HALF)
+        elif dtype == np.float32:
+            pix_type = Imath.PixelType(Imath.PixelType.FLOAT)
+        else:
+            raise ValueError(f'dtype should be float16 or float32: {dtype}')
+        channel_types = self.header['channels']
+        supported_types = (
+            Imath.Channel(Imath.PixelType(Imath.PixelType.HALF)),
+            Imath.Channel(Imath.PixelType(Imath.PixelType.FLOAT)),
+        )
+        for channel in channels:
+            if channel not in channel_types:
+                raise ValueError(f'Channel {channel} not found in'
+                                 f' {list(channel_types.keys())}')
+            if channel_types[channel] not in supported_types:
+                raise ValueError('please specify PixelType')
+        width, height = self.size
+        shape = (height, width, len(channels))
+        if out is None:
+            out = np.empty(shape, dtype=dtype)
+        elif out.shape != shape or out.dtype != dtype:
+            raise ValueError(f'out should be of shape {shape} and {dtype},'
+                             f' got {out.shape} and {out.dtype}')
+        buffers = self.file.channels(list(channels), pix_type)
+        for channel_idx, buffer in enumerate(buffers):
+            out[..., channel_idx] = np.frombuffer(
+                buffer, dtype=dtype).reshape(height, width)
+        return out
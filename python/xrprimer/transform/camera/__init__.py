@@ -1,7 +1,13 @@
-from .distortion import undistort_camera, undistort_images, undistort_points
+from .distortion import (
+    undistort_camera,
+    undistort_frames,
+    undistort_images,
+    undistort_points,
+    undistort_video,
+)
 from .extrinsic import rotate_camera, translate_camera
 
 __all__ = [
-    'undistort_camera', 'undistort_images', 'undistort_points',
-    'rotate_camera', 'translate_camera'
+    'undistort_camera', 'undistort_images', 'undistort_frames',
+    'undistort_video', 'undistort_points', 'rotate_camera', 'translate_camera'
 ]
@@ -1,5 +1,10 @@
+import hashlib
 import logging
-from typing import Tuple, Union
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from typing import Generator, Iterable, Tuple, Union
 
 import cv2
 import numpy as np
@@ -9,8 +14,18 @@ from xrprimer.data_structure.camera import (
     PinholeCameraParameter,
 )
 from xrprimer.transform.convention.camera import convert_camera_parameter
+from xrprimer.utils.ffmpeg_utils import (
+    VideoInfoReader,
+    VideoReader,
+    VideoWriter,
+)
 from xrprimer.utils.log_utils import get_logger
 
+# maps of the most recently used cameras, shared in the process
+_UNDISTORT_MAPS_CACHE_SIZE = 8
+_undistort_maps_cache = OrderedDict()
+_undistort_maps_lock = threading.Lock()
+
 
 def undistort_camera(
         distorted_cam: FisheyeCameraParameter) -> PinholeCameraParameter:
@@ -56,10 +71,13 @@ def undistort_camera(
 
 
 def undistort_images(
-        distorted_cam: FisheyeCameraParameter,
-        image_array: np.ndarray) -> Tuple[PinholeCameraParameter, np.ndarray]:
+    distorted_cam: FisheyeCameraParameter,
+    image_array: np.ndarray,
+    interpolation: int = cv2.INTER_LINEAR
+) -> Tuple[PinholeCameraParameter, np.ndarray]:
     """Undistort a FisheyeCameraParameter to PinholeCameraParameter, and
-    undistort an array of images shot on a fisheye camera.
+    undistort an array of images shot on a fisheye camera. Undistortion maps
+    are taken from the process-wide cache, see get_cached_undistort_maps().
 
     Args:
         distorted_cam (FisheyeCameraParameter):
@@ -68,6 +86,9 @@ def undistort_images(
             and distortion coefficients will be used.
         image_array (np.ndarray):
             An array of images, in shape [n_frame, height, width, n_channel].
+        interpolation (int, optional):
+            Interpolation method of cv2.remap.
+            Defaults to cv2.INTER_LINEAR, the same as cv2.undistort.
 
     Raises:
         NotImplementedError: Camera convention not supported.
@@ -79,26 +100,190 @@ def undistort_images(
             np.ndarray:
                 Corrected images in the same shape as input.
     """
-    # prepare input of cv2.undistort
     if distorted_cam.convention != 'opencv':
         distorted_cam = convert_camera_parameter(
             cam_param=distorted_cam, dst='opencv')
-    distorted_intrinsic33 = np.array(distorted_cam.get_intrinsic(k_dim=3))
-    dist_coeff_list = distorted_cam.get_dist_coeff()
-    dist_coeff_np = np.array(dist_coeff_list)
     corrected_cam_param = undistort_camera(distorted_cam=distorted_cam)
-    corrected_intrinsic33 = np.array(
-        corrected_cam_param.get_intrinsic(k_dim=3))
-    corrected_image_array = np.ones_like(image_array)
+    # maps are computed once per camera, instead of once per image
+    # in cv2.undistort
+    map1, map2 = get_cached_undistort_maps(
+        fisheye_param=distorted_cam, interpolation=interpolation)
+    corrected_image_array = np.empty_like(image_array)
     for image_index, image_np in enumerate(image_array):
-        corrected_image_array[image_index] = cv2.undistort(
-            image_np,
-            distorted_intrinsic33,
-            dist_coeff_np,
-            newCameraMatrix=corrected_intrinsic33)
+        corrected_image_array[image_index] = cv2.remap(
+            image_np, map1, map2, interpolation=interpolation)
     return corrected_cam_param, corrected_image_array
 
 
+def undistort_frames(
+    distorted_cam: FisheyeCameraParameter,
+    frames: Union[VideoReader, Iterable[np.ndarray]],
+    interpolation: int = cv2.INTER_LINEAR,
+    n_threads: int = 4,
+    logger: Union[None, str, logging.Logger] = None
+) -> Generator[np.ndarray, None, None]:
+    """Undistort a stream of images shot on a fisheye camera, frame by frame.
+    Frames are remapped by a thread pool with the cached undistortion maps,
+    into n_threads + 1 reusable buffers, so that memory usage does not grow
+    with the number of frames.
+
+    Args:
+        distorted_cam (FisheyeCameraParameter):
+            An instance of FisheyeCameraParameter. Convention will be checked,
+            resolution, intrinsic mat
+            and distortion coefficients will be used.
+        frames (Union[VideoReader, Iterable[np.ndarray]]):
+            A VideoReader, or an iterable of images
+            in shape [height, width, n_channel].
+        interpolation (int, optional):
+            Interpolation method of cv2.remap.
+            Defaults to cv2.INTER_LINEAR, the same as cv2.undistort.
+        n_threads (int, optional):
+            Number of threads remapping frames.
+            Defaults to 4.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        NotImplementedError: Camera convention not supported.
+        ValueError: Resolution of a frame does not match distorted_cam.
+
+    Yields:
+        np.ndarray:
+            A corrected image. It is a reusable buffer, which will be
+            overwritten after the next frame is requested.
+            Copy it if it is needed later.
+    """
+    logger = get_logger(logger)
+    map1, map2 = get_cached_undistort_maps(
+        fisheye_param=distorted_cam, interpolation=interpolation)
+    if isinstance(frames, VideoReader):
+        frames = _read_video_frames(frames)
+    n_threads = max(1, n_threads)
+    n_buffers = n_threads + 1
+    buffers = [None] * n_buffers
+    futures = deque()
+    executor = ThreadPoolExecutor(max_workers=n_threads)
+    try:
+        for frame_idx, frame in enumerate(frames):
+            if frame.shape[:2] != map1.shape[:2]:
+                logger.error(
+                    f'Resolution of frame {frame_idx} is {frame.shape[:2]},' +
+                    f' which does not match distorted_cam {map1.shape[:2]}.')
+                raise ValueError
+            buffer_idx = frame_idx % n_buffers
+            if buffers[buffer_idx] is None or \
+                    buffers[buffer_idx].shape != frame.shape or \
+                    buffers[buffer_idx].dtype != frame.dtype:
+                buffers[buffer_idx] = np.empty_like(frame)
+            futures.append(
+                executor.submit(
+                    cv2.remap,
+                    frame,
+                    map1,
+                    map2,
+                    interpolation=interpolation,
+                    dst=buffers[buffer_idx]))
+            # the buffer of the frame yielded last time
+            # is not reused until now
+            if len(futures) >= n_threads:
+                yield futures.popleft().result()
+        while len(futures) > 0:
+            yield futures.popleft().result()
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _read_video_frames(
+        video_reader: VideoReader) -> Generator[np.ndarray, None, None]:
+    """Yield frames of a VideoReader until it returns None."""
+    while True:
+        frame = video_reader.get_next_frame()
+        if frame is None:
+            break
+        yield frame
+
+
+def undistort_video(
+        distorted_cam: FisheyeCameraParameter,
+        input_path: str,
+        output_path: str,
+        fps: Union[float, None] = None,
+        interpolation: int = cv2.INTER_LINEAR,
+        n_threads: int = 4,
+        disable_log: bool = False,
+        logger: Union[None, str,
+                      logging.Logger] = None) -> PinholeCameraParameter:
+    """Undistort a video shot on a fisheye camera. Frames are decoded,
+    undistorted and encoded in a stream, never held in memory all at once.
+
+    Args:
+        distorted_cam (FisheyeCameraParameter):
+            An instance of FisheyeCameraParameter. Convention will be checked,
+            resolution, intrinsic mat
+            and distortion coefficients will be used.
+        input_path (str):
+            Path to the distorted video.
+        output_path (str):
+            Path to the output video file, which shall end with '.mp4'.
+        fps (Union[float, None], optional):
+            Frame per second of the output video.
+            Defaults to None, the same as the input video.
+        interpolation (int, optional):
+            Interpolation method of cv2.remap.
+            Defaults to cv2.INTER_LINEAR, the same as cv2.undistort.
+        n_threads (int, optional):
+            Number of threads remapping frames.
+            Defaults to 4.
+        disable_log (bool, optional):
+            Whether to disable ffmpeg command info.
+            Defaults to False.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        NotImplementedError: Camera convention not supported.
+        ValueError: Resolution of the video does not match distorted_cam.
+
+    Returns:
+        PinholeCameraParameter:
+            Undistorted camera parameter.
+    """
+    logger = get_logger(logger)
+    corrected_cam_param = undistort_camera(distorted_cam=distorted_cam)
+    video_info = VideoInfoReader(input_path, logger=logger)
+    resolution = (int(video_info['height']), int(video_info['width']))
+    if resolution != (distorted_cam.height, distorted_cam.width):
+        logger.error(f'Resolution of {input_path} is {resolution},' +
+                     ' which does not match distorted_cam' +
+                     f' {(distorted_cam.height, distorted_cam.width)}.')
+        raise ValueError
+    if fps is None:
+        fps = float(Fraction(video_info['r_frame_rate']))
+    video_reader = VideoReader(
+        input_path=input_path, disable_log=disable_log, logger=logger)
+    video_writer = VideoWriter(
+        output_path=output_path,
+        resolution=resolution,
+        fps=fps,
+        disable_log=disable_log,
+        logger=logger)
+    try:
+        for corrected_frame in undistort_frames(
+                distorted_cam=distorted_cam,
+                frames=video_reader,
+                interpolation=interpolation,
+                n_threads=n_threads,
+                logger=logger):
+            video_writer.write(corrected_frame)
+    finally:
+        video_reader.close()
+        video_writer.close()
+    return corrected_cam_param
+
+
 def undistort_points(
         distorted_cam: FisheyeCameraParameter,
         points: np.ndarray) -> Tuple[PinholeCameraParameter, np.ndarray]:
@@ -150,13 +335,16 @@ def undistort_points(
 
 
 def get_undistort_maps(
-        fisheye_param: FisheyeCameraParameter
-) -> Tuple[np.ndarray, np.ndarray]:
+        fisheye_param: FisheyeCameraParameter,
+        m1type: int = cv2.CV_32FC1) -> Tuple[np.ndarray, np.ndarray]:
     """Get Undistortion and rectification maps defined in opencv.
 
     Args:
         fisheye_param (FisheyeCameraParameter):
             FisheyeCameraParameter for the distorted image.
+        m1type (int, optional):
+            Type of the first output map, cv2.CV_32FC1, cv2.CV_32FC2
+            or cv2.CV_16SC2. Defaults to cv2.CV_32FC1.
 
     Returns:
         Tuple[np.ndarray, np.ndarray]:
@@ -173,20 +361,94 @@ def get_undistort_maps(
             pinhole_param.width,
             pinhole_param.height,
         )),
-        m1type=cv2.CV_32FC1)
+        m1type=m1type)
     return map1, map2
 
 
+def get_cached_undistort_maps(
+    fisheye_param: FisheyeCameraParameter,
+    interpolation: int = cv2.INTER_LINEAR
+) -> Tuple[np.ndarray, Union[np.ndarray, None]]:
+    """Get undistortion maps of a fisheye camera from a process-wide cache.
+    Maps are keyed by a hash of intrinsic matrix, distortion coefficients,
+    resolution and whether interpolation is cv2.INTER_NEAREST, and stored in
+    the fixed-point format for fast cv2.remap.
+
+    Args:
+        fisheye_param (FisheyeCameraParameter):
+            FisheyeCameraParameter for the distorted image.
+        interpolation (int, optional):
+            Interpolation method of cv2.remap that the maps are used with.
+            For cv2.INTER_NEAREST, coordinates are rounded into map1,
+            the same as remapping with floating-point maps.
+            Defaults to cv2.INTER_LINEAR.
+
+    Raises:
+        NotImplementedError: Camera convention not supported.
+
+    Returns:
+        Tuple[np.ndarray, Union[np.ndarray, None]]:
+            Read-only undistortion maps, map1 in shape [h, w, 2] and
+            dtype np.int16, map2 in shape [h, w] and dtype np.uint16,
+            or None for cv2.INTER_NEAREST.
+    """
+    if fisheye_param.convention != 'opencv':
+        fisheye_param = convert_camera_parameter(
+            cam_param=fisheye_param, dst='opencv')
+    nearest = interpolation == cv2.INTER_NEAREST
+    intrinsic33 = np.array(fisheye_param.get_intrinsic(k_dim=3), np.float64)
+    dist_coeff_np = np.array(fisheye_param.get_dist_coeff(), np.float64)
+    resolution_hw = np.array([fisheye_param.height, fisheye_param.width],
+                             np.int64)
+    key = hashlib.sha1(intrinsic33.tobytes() + dist_coeff_np.tobytes() +
+                       resolution_hw.tobytes() + bytes([nearest])).hexdigest()
+    with _undistort_maps_lock:
+        maps = _undistort_maps_cache.get(key, None)
+        if maps is not None:
+            _undistort_maps_cache.move_to_end(key)
+            return maps
+    # compute without holding the lock
+    if nearest:
+        # fixed-point maps from initUndistortRectifyMap are floored
+        # for cv2.INTER_NEAREST, while floating-point maps are rounded
+        map1, map2 = get_undistort_maps(
+            fisheye_param=fisheye_param, m1type=cv2.CV_32FC1)
+        map1, map2 = cv2.convertMaps(
+            map1, map2, cv2.CV_16SC2, nninterpolation=True)
+    else:
+        map1, map2 = get_undistort_maps(
+            fisheye_param=fisheye_param, m1type=cv2.CV_16SC2)
+    map1.setflags(write=False)
+    if map2 is not None:
+        map2.setflags(write=False)
+    maps = (map1, map2)
+    with _undistort_maps_lock:
+        _undistort_maps_cache[key] = maps
+        while len(_undistort_maps_cache) > _UNDISTORT_MAPS_CACHE_SIZE:
+            _undistort_maps_cache.popitem(last=False)
+    return maps
+
+
+def clear_undistort_maps_cache() -> None:
+    """Remove all the maps in the process-wide undistortion maps cache."""
+    with _undistort_maps_lock:
+        _undistort_maps_cache.clear()
+
+
 class FastImageUndistortor:
     """A class for fast image undistortion."""
 
     def __init__(self,
                  fisheye_param: FisheyeCameraParameter,
+                 interpolation: int = cv2.INTER_NEAREST,
                  logger: Union[None, str, logging.Logger] = None) -> None:
         """
         Args:
             fisheye_param (FisheyeCameraParameter):
                 FisheyeCameraParameter for the distorted image.
+            interpolation (int, optional):
+                Interpolation method of cv2.remap.
+                Defaults to cv2.INTER_NEAREST.
             logger (Union[None, str, logging.Logger], optional):
                 Logger for logging. If None, root logger will be selected.
                 Defaults to None.
@@ -194,7 +456,9 @@ class FastImageUndistortor:
         self.logger = get_logger(logger)
         self.fisheye_param = fisheye_param
         self.pinhole_param = undistort_camera(fisheye_param)
-        map1, map2 = get_undistort_maps(fisheye_param)
+        self.interpolation = interpolation
+        map1, map2 = get_cached_undistort_maps(
+            fisheye_param, interpolation=interpolation)
         self.map1 = map1
         self.map2 = map2
 
@@ -209,7 +473,7 @@ class FastImageUndistortor:
             np.ndarray: Undistorted image.
         """
         img_arr = cv2.remap(
-            img_arr, self.map1, self.map2, interpolation=cv2.INTER_NEAREST)
+            img_arr, self.map1, self.map2, interpolation=self.interpolation)
         return img_arr
 
     def get_distort_cam(self) -> FisheyeCameraParameter:
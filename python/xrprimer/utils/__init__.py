@@ -1,14 +1,19 @@
 from xrprimer.utils.ffmpeg_utils import (
+    MultiVideoReader,
     VideoInfoReader,
+    VideoReader,
     VideoWriter,
     array_to_images,
     array_to_video,
+    batch_read_video_info,
     images_to_array,
     images_to_array_opencv,
+    images_to_generator_opencv,
     images_to_sorted_images,
     pad_for_libx264,
     video_to_array,
 )
+from xrprimer.utils.image_writer_utils import ImageWriter
 from xrprimer.utils.log_utils import get_logger, setup_logger
 from xrprimer.utils.path_utils import (
     Existence,
@@ -19,9 +24,11 @@ from xrprimer.utils.path_utils import (
 )
 
 __all__ = [
-    'Existence', 'VideoInfoReader', 'VideoWriter', 'array_to_images',
-    'array_to_video', 'check_path', 'check_path_existence',
+    'Existence', 'ImageWriter', 'MultiVideoReader', 'VideoInfoReader',
+    'VideoReader', 'VideoWriter', 'array_to_images', 'array_to_video',
+    'batch_read_video_info', 'check_path', 'check_path_existence',
     'check_path_suffix', 'get_logger', 'images_to_array',
-    'images_to_array_opencv', 'images_to_sorted_images', 'pad_for_libx264',
-    'prepare_output_path', 'setup_logger', 'video_to_array'
+    'images_to_array_opencv', 'images_to_generator_opencv',
+    'images_to_sorted_images', 'pad_for_libx264', 'prepare_output_path',
+    'setup_logger', 'video_to_array'
 ]
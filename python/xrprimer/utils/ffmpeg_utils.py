@@ -1,15 +1,23 @@
 # yapf: disable
 import glob
+import itertools
 import json
 import logging
 import os
+import queue
 import shutil
 import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Tuple, Union
+from typing import Any, Dict, Generator, Iterable, Iterator, List, Tuple, Union
 
 import numpy as np
 
+from .image_writer_utils import ImageWriter
 from .log_utils import get_logger
 from .path_utils import (
     Existence,
@@ -32,9 +40,17 @@ class VideoInfoReader():
         'nb_frames', 'disposition', 'tags'
     ]
 
+    # process-wide cache of video streams,
+    # keyed by (absolute path, file size, modification time)
+    __cache__: Dict[Tuple[str, int, int], dict] = {}
+    __cache_lock__ = threading.Lock()
+    SIDECAR_SUFFIX = '.ffprobe.json'
+
     def __init__(self,
                  input_path: str,
-                 logger: Union[None, str, logging.Logger] = None) -> None:
+                 logger: Union[None, str, logging.Logger] = None,
+                 use_cache: bool = True,
+                 use_sidecar: bool = False) -> None:
         """Get video information from video, mimiced from ffmpeg-python.
         https://github.com/kkroening/ffmpeg-python.
 
@@ -43,6 +59,17 @@ class VideoInfoReader():
             logger (Union[None, str, logging.Logger], optional):
                 Logger for logging. If None, root logger will be selected.
                 Defaults to None.
+            use_cache (bool, optional):
+                Whether to look up and update the process-wide
+                metadata cache, keyed by (path, size, mtime),
+                instead of running ffprobe every time.
+                Defaults to True.
+            use_sidecar (bool, optional):
+                Whether to persist the metadata in a json sidecar file
+                next to the video, named input_path + SIDECAR_SUFFIX.
+                It is ignored when the sidecar file is stale or
+                cannot be written.
+                Defaults to False.
 
         Raises:
             FileNotFoundError: check the input path.
@@ -59,6 +86,31 @@ class VideoInfoReader():
             ],
             path_type='file',
             logger=logger)
+        stat = os.stat(input_path)
+        cache_key = (os.path.abspath(input_path), stat.st_size,
+                     stat.st_mtime_ns)
+        video_stream = None
+        if use_cache:
+            with self.__class__.__cache_lock__:
+                video_stream = self.__class__.__cache__.get(cache_key, None)
+        if video_stream is None and use_sidecar:
+            video_stream = self.__read_sidecar__(input_path, cache_key)
+        if video_stream is None:
+            video_stream = self.__probe__(input_path)
+            if use_sidecar:
+                self.__write_sidecar__(input_path, cache_key, video_stream)
+        if use_cache:
+            with self.__class__.__cache_lock__:
+                self.__class__.__cache__[cache_key] = video_stream
+        self.video_stream = video_stream
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Clear the process-wide metadata cache."""
+        with cls.__cache_lock__:
+            cls.__cache__.clear()
+
+    def __probe__(self, input_path: str) -> dict:
         cmd = [
             'ffprobe', '-show_format', '-show_streams', '-of', 'json',
             input_path
@@ -72,7 +124,37 @@ class VideoInfoReader():
         if video_stream is None:
             self.logger.error('No video stream found')
             raise ValueError
-        self.video_stream = video_stream
+        return video_stream
+
+    def __read_sidecar__(self, input_path: str,
+                         cache_key: Tuple[str, int, int]) -> Union[dict, None]:
+        sidecar_path = input_path + self.__class__.SIDECAR_SUFFIX
+        if not os.path.isfile(sidecar_path):
+            return None
+        try:
+            with open(sidecar_path, 'r') as f_read:
+                sidecar_dict = json.load(f_read)
+        except (OSError, ValueError):
+            self.logger.warning(f'Failed to read {sidecar_path}, ignored.')
+            return None
+        if sidecar_dict.get('size', None) != cache_key[1] or \
+                sidecar_dict.get('mtime_ns', None) != cache_key[2]:
+            return None
+        return sidecar_dict.get('video_stream', None)
+
+    def __write_sidecar__(self, input_path: str, cache_key: Tuple[str, int,
+                                                                  int],
+                          video_stream: dict) -> None:
+        sidecar_path = input_path + self.__class__.SIDECAR_SUFFIX
+        sidecar_dict = dict(
+            size=cache_key[1],
+            mtime_ns=cache_key[2],
+            video_stream=video_stream)
+        try:
+            with open(sidecar_path, 'w') as f_write:
+                json.dump(sidecar_dict, f_write)
+        except OSError:
+            self.logger.warning(f'Failed to write {sidecar_path}, ignored.')
 
     def __getitem__(self, key: str) -> Any:
         """Get the corresponding information according to the key.
@@ -96,6 +178,52 @@ class VideoInfoReader():
         return self.video_stream[key]
 
 
+def batch_read_video_info(
+        input_paths: List[str],
+        n_workers: int = 8,
+        use_cache: bool = True,
+        use_sidecar: bool = False,
+        logger: Union[None, str,
+                      logging.Logger] = None) -> List[VideoInfoReader]:
+    """Read information of many videos, running ffprobe in parallel.
+
+    Args:
+        input_paths (List[str]):
+            Paths to the video files.
+        n_workers (int, optional):
+            Number of ffprobe processes running at the same time.
+            Defaults to 8.
+        use_cache (bool, optional):
+            Whether to use the process-wide metadata cache.
+            Defaults to True.
+        use_sidecar (bool, optional):
+            Whether to persist the metadata in json sidecar files.
+            Defaults to False.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        FileNotFoundError: check the input paths.
+
+    Returns:
+        List[VideoInfoReader]:
+            VideoInfoReaders in the same order as input_paths.
+    """
+    logger = get_logger(logger)
+
+    def read_info(input_path: str) -> VideoInfoReader:
+        return VideoInfoReader(
+            input_path,
+            use_cache=use_cache,
+            use_sidecar=use_sidecar,
+            logger=logger)
+
+    n_workers = max(min(int(n_workers), len(input_paths)), 1)
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(read_info, input_paths))
+
+
 class VideoReader:
     """VideoReader for reading video frames as an image ndarray for OpenCV.
 
@@ -208,6 +336,235 @@ class VideoReader:
         self.__del__()
 
 
+class MultiVideoReader:
+    """MultiVideoReader for reading frame-aligned multi-view frames from
+    several videos, e.g. videos captured by a camera rig.
+
+    Every view is decoded by its own ffmpeg process, and a reader thread per
+    view prefetches decoded frames into a bounded queue. Frames of the same
+    index are returned together, in shape [n_view, H, W, 3], and the view
+    order is the same as input_paths, so that it matches the order of
+    camera_parameters in projectors, triangulators and calibrators.
+    """
+
+    def __init__(self,
+                 input_paths: List[str],
+                 resolution: Union[Tuple[int, int], Tuple[float,
+                                                          float]] = None,
+                 start: int = 0,
+                 end: int = None,
+                 n_prefetch: int = 8,
+                 disable_log: bool = False,
+                 logger: Union[None, str, logging.Logger] = None) -> None:
+        """
+        Args:
+            input_paths (List[str]):
+                A list of paths to the videos, one video for one view.
+            resolution (Union[Tuple[int, int], Tuple[float, float]],
+                    optional):
+                Resolution(height, width) of output for all views.
+                Defaults to None, resolution of the first view.
+            start (int, optional):
+                Start frame index. Inclusive.
+                If < 0, will be converted to frame_index range in [0, n_frame].
+                Defaults to 0.
+            end (int, optional):
+                End frame index. Exclusive.
+                Could be positive int or negative int or None.
+                If None, all frames from start till the last
+                frame are included.
+                Defaults to None.
+            n_prefetch (int, optional):
+                How many frames to decode ahead for each view.
+                Defaults to 8.
+            disable_log (bool, optional):
+                Whether close the ffmepg command info.
+                Defaults to False.
+            logger (Union[None, str, logging.Logger], optional):
+                Logger for logging. If None, root logger will be selected.
+                Defaults to None.
+
+        Raises:
+            ValueError: input_paths is empty.
+        """
+        self.logger = get_logger(logger)
+        if len(input_paths) == 0:
+            self.logger.error('Please offer at least one video path.')
+            raise ValueError
+        if resolution is None:
+            info = VideoInfoReader(input_paths[0], logger=logger)
+            resolution = (int(info['height']), int(info['width']))
+        self.height, self.width = int(resolution[0]), int(resolution[1])
+        self.input_paths = input_paths
+        self.n_view = len(input_paths)
+        self.video_readers = []
+        for input_path in input_paths:
+            video_reader = VideoReader(
+                input_path=input_path,
+                resolution=(self.height, self.width),
+                start=start,
+                end=end,
+                disable_log=disable_log,
+                logger=logger)
+            self.video_readers.append(video_reader)
+        self.n_frames = min([
+            video_reader.end - video_reader.start
+            for video_reader in self.video_readers
+        ])
+        # decoding time and waiting time in seconds, for each view
+        self.decode_time = np.zeros(shape=(self.n_view, ))
+        self.wait_time = np.zeros(shape=(self.n_view, ))
+        self.n_decoded = np.zeros(shape=(self.n_view, ), dtype=np.int64)
+        self.frame_idx = 0
+        self.stop_event = threading.Event()
+        self.frame_queues = []
+        self.threads = []
+        for view_idx in range(self.n_view):
+            frame_queue = queue.Queue(maxsize=max(int(n_prefetch), 1))
+            thread = threading.Thread(
+                target=self.__decode_view__,
+                args=(view_idx, frame_queue),
+                daemon=True)
+            self.frame_queues.append(frame_queue)
+            self.threads.append(thread)
+            thread.start()
+
+    def __decode_view__(self, view_idx: int, frame_queue: queue.Queue) -> None:
+        """Decode frames of one view and put them into frame_queue, until the
+        video ends or this reader is closed. None is put at the end."""
+        video_reader = self.video_readers[view_idx]
+        while not self.stop_event.is_set():
+            start_time = time.perf_counter()
+            frame = video_reader.get_next_frame()
+            self.decode_time[view_idx] += time.perf_counter() - start_time
+            if frame is not None:
+                self.n_decoded[view_idx] += 1
+            while not self.stop_event.is_set():
+                try:
+                    frame_queue.put(frame, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if frame is None:
+                break
+
+    def __len__(self) -> int:
+        return self.n_frames
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> np.ndarray:
+        mview_frame = self.get_next_frame()
+        if mview_frame is None:
+            raise StopIteration
+        return mview_frame
+
+    def get_next_frame(self) -> Union[np.ndarray, None]:
+        """Read the next multi-view frame, from the opened video files.
+
+        Returns:
+            Union[np.ndarray, None]:
+                An array of multi-view images, in shape
+                [n_view, H, W, 3]. If any of the videos ends,
+                return None.
+        """
+        if self.frame_idx >= self.n_frames:
+            return None
+        mview_frame = np.empty(
+            shape=(self.n_view, self.height, self.width, 3), dtype=np.uint8)
+        for view_idx, frame_queue in enumerate(self.frame_queues):
+            start_time = time.perf_counter()
+            frame = frame_queue.get()
+            self.wait_time[view_idx] += time.perf_counter() - start_time
+            if frame is None:
+                self.n_frames = self.frame_idx
+                return None
+            mview_frame[view_idx] = frame
+        self.frame_idx += 1
+        return mview_frame
+
+    def get_latency(self) -> Dict[str, np.ndarray]:
+        """Get per-view latency metrics, in seconds per frame.
+
+        Returns:
+            Dict[str, np.ndarray]:
+                decode: Mean time ffmpeg takes to offer a frame,
+                    in shape [n_view, ].
+                wait: Mean time get_next_frame() is blocked by
+                    a view, in shape [n_view, ].
+        """
+        n_decoded = np.maximum(self.n_decoded, 1)
+        n_read = max(self.frame_idx, 1)
+        return dict(
+            decode=self.decode_time / n_decoded, wait=self.wait_time / n_read)
+
+    def dump_frames(self,
+                    output_dir: str,
+                    interval: int = 1,
+                    img_format: str = 'frame_%06d_view_%03d.png') -> list:
+        """Write the remaining multi-view frames into output_dir, and return
+        a nested list of image paths, which is the `frames` format taken by
+        calibrators. Frames are numbered by self.frame_idx, counting from
+        `start`, including frames already read before this call.
+
+        Args:
+            output_dir (str):
+                Path to the output image directory.
+            interval (int, optional):
+                Write one multi-view frame every interval frames,
+                whose frame_idx is a multiple of interval.
+                Defaults to 1.
+            img_format (str, optional):
+                Name format for the image file, formatted by
+                (frame_idx, view_idx).
+                Defaults to 'frame_%06d_view_%03d.png'.
+
+        Returns:
+            list:
+                A nested list of image paths. The shape is
+                [n_frame, n_view].
+        """
+        prepare_output_path(
+            output_dir,
+            allowed_suffix=[],
+            tag='output image folder',
+            path_type='dir',
+            overwrite=True,
+            logger=self.logger)
+        frames = []
+        with ImageWriter(logger=self.logger) as image_writer:
+            while True:
+                frame_idx = self.frame_idx
+                mview_frame = self.get_next_frame()
+                if mview_frame is None:
+                    break
+                if frame_idx % interval != 0:
+                    continue
+                mview_paths = []
+                for view_idx in range(self.n_view):
+                    img_path = os.path.join(output_dir,
+                                            img_format % (frame_idx, view_idx))
+                    image_writer.write(img_path, mview_frame[view_idx])
+                    mview_paths.append(img_path)
+                frames.append(mview_paths)
+        return frames
+
+    def close(self) -> None:
+        """Manually close this multi-video reader."""
+        if self.stop_event.is_set():
+            return
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join()
+        for video_reader in self.video_readers:
+            video_reader.close()
+
+    def __del__(self) -> None:
+        if hasattr(self, 'stop_event'):
+            self.close()
+
+
 class VideoWriter:
     """VideoWriter for writing OpenCV image array to a video file.
 
@@ -457,13 +814,17 @@ def images_to_array_opencv(
         img_format: Union[str, None] = None,
         start: int = 0,
         end: int = None,
+        stride: int = 1,
+        n_workers: int = 8,
         logger: Union[None, str, logging.Logger] = None) -> np.ndarray:
-    """Read a folder of images as an array of (f * h * w * 3).
+    """Read a folder of images as an array of (f * h * w * 3). Images are
+    decoded by a pool of threads and written into a preallocated array.
 
     Args:
         input_folder (str): folder of input images.
         resolution (Union[Tuple[int, int], Tuple[float, float]]):
-            resolution(height, width) of output. Defaults to None.
+            resolution(height, width) of output. Defaults to None,
+            resolution of the first image.
         img_format (str, optional):
             Format of images to be read, 'jpg' or 'png'.
             Defaults to None.
@@ -474,6 +835,10 @@ def images_to_array_opencv(
             Could be positive int or negative int or None.
             If None, all frames from start till the last frame are included.
             Defaults to None.
+        stride (int, optional): read one image every stride images.
+            Defaults to 1.
+        n_workers (int, optional): number of decoding threads.
+            Defaults to 8.
         logger (Union[None, str, logging.Logger], optional):
             Logger for logging. If None, root logger will be selected.
             Defaults to None.
@@ -483,8 +848,103 @@ def images_to_array_opencv(
     Returns:
         np.ndarray: shape will be (f * h * w * 3).
     """
-    import cv2
+    frame_list = _get_sorted_image_paths(
+        input_folder=input_folder,
+        img_format=img_format,
+        start=start,
+        end=end,
+        stride=stride,
+        logger=logger)
+    if len(frame_list) == 0:
+        return np.zeros(shape=(0, 0, 0, 3), dtype=np.uint8)
+    first_img = _read_image_opencv(frame_list[0], resolution)
+    height, width = first_img.shape[:2]
+    array = np.empty(shape=(len(frame_list), height, width, 3), dtype=np.uint8)
+    array[0] = first_img
+
+    def read_into_array(index: int) -> None:
+        array[index] = _read_image_opencv(frame_list[index], (height, width))
+
+    with ThreadPoolExecutor(max_workers=max(int(n_workers), 1)) as executor:
+        # consume the iterator to raise exceptions from workers
+        for _ in executor.map(read_into_array, range(1, len(frame_list))):
+            pass
+    return array
+
+
+def images_to_generator_opencv(
+    input_folder: str,
+    resolution: Union[Tuple[int, int], Tuple[float, float]] = None,
+    img_format: Union[str, None] = None,
+    start: int = 0,
+    end: int = None,
+    stride: int = 1,
+    n_workers: int = 8,
+    logger: Union[None, str, logging.Logger] = None
+) -> Generator[np.ndarray, None, None]:
+    """Read a folder of images and yield them one by one, in shape (h * w *
+    3). Images are decoded ahead by a pool of threads, and at most 2 *
+    n_workers images are kept in memory.
 
+    Args:
+        input_folder (str): folder of input images.
+        resolution (Union[Tuple[int, int], Tuple[float, float]]):
+            resolution(height, width) of output. Defaults to None,
+            resolution of the first image.
+        img_format (str, optional):
+            Format of images to be read, 'jpg' or 'png'.
+            Defaults to None.
+        start (int, optional): start frame index. Inclusive.
+            Defaults to 0.
+        end (int, optional): end frame index. Exclusive.
+            If None, all frames from start till the last frame are included.
+            Defaults to None.
+        stride (int, optional): read one image every stride images.
+            Defaults to 1.
+        n_workers (int, optional): number of decoding threads.
+            Defaults to 8.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Yields:
+        np.ndarray: an image array in shape (h * w * 3).
+    """
+    frame_list = _get_sorted_image_paths(
+        input_folder=input_folder,
+        img_format=img_format,
+        start=start,
+        end=end,
+        stride=stride,
+        logger=logger)
+    if len(frame_list) == 0:
+        return
+    first_img = _read_image_opencv(frame_list[0], resolution)
+    resolution = first_img.shape[:2]
+    yield first_img
+    n_workers = max(int(n_workers), 1)
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        futures = deque()
+        next_index = 1
+        while next_index < len(frame_list) or len(futures) > 0:
+            while next_index < len(frame_list) and \
+                    len(futures) < 2 * n_workers:
+                futures.append(
+                    executor.submit(_read_image_opencv, frame_list[next_index],
+                                    resolution))
+                next_index += 1
+            yield futures.popleft().result()
+
+
+def _get_sorted_image_paths(
+        input_folder: str,
+        img_format: Union[str, None] = None,
+        start: int = 0,
+        end: int = None,
+        stride: int = 1,
+        logger: Union[None, str, logging.Logger] = None) -> List[str]:
+    """Get sorted paths to the images in input_folder, sliced by [start:end:
+    stride]."""
     check_path(
         input_path=input_folder,
         allowed_existence=[Existence.DirectoryExistNotEmpty],
@@ -501,19 +961,24 @@ def images_to_array_opencv(
     else:
         frame_list = sorted(
             glob.glob(os.path.join(input_folder, f'*.{img_format}')))
-    if end is None:
-        frame_list = frame_list[start:]
-    else:
-        frame_list = frame_list[start:end]
-    array_list = []
-    for index, frame_path in enumerate(frame_list):
-        img = cv2.imread(frame_path)
-        if index == 0 and resolution is None:
-            resolution = img.shape[0:2]
-        else:
-            img = cv2.resize(img, (resolution[1], resolution[0]))
-        array_list.append(img)
-    return np.asarray(array_list)
+    return frame_list[start:end:stride]
+
+
+def _read_image_opencv(
+    img_path: str,
+    resolution: Union[Tuple[int, int], Tuple[float, float], None] = None
+) -> np.ndarray:
+    """Read an image by cv2.imread, and resize it only when its resolution
+    differs from the expected one."""
+    import cv2
+    img = cv2.imread(img_path)
+    if img is None:
+        raise FileNotFoundError(f'Failed to read image from {img_path}.')
+    if resolution is not None:
+        height, width = int(resolution[0]), int(resolution[1])
+        if img.shape[0] != height or img.shape[1] != width:
+            img = cv2.resize(img, (width, height))
+    return img
 
 
 def images_to_array(
@@ -532,6 +997,9 @@ def images_to_array(
         resolution (Union[Tuple[int, int], Tuple[float, float]]):
             resolution(height, width) of output. Defaults to None.
         img_format (str, optional): format of images to be read.
+            If None, all png and jpg images in input_folder are read
+            in sorted order, through a concat list file for ffmpeg
+            and without copying any image.
             Defaults to '%06d.png'.
         start (int, optional): start frame index. Inclusive.
             If < 0, will be converted to frame_index range in [0, n_frame].
@@ -541,6 +1009,9 @@ def images_to_array(
             If None, all frames from start till the last frame are included.
             Defaults to None.
         remove_raw_files (bool, optional): whether remove raw images.
+            Only input_folder of an explicit img_format is removed.
+            If img_format is None, input_folder is never removed, and
+            the temporary concat list or symlinks are always removed.
             Defaults to False.
         disable_log (bool, optional): whether close the ffmepg command info.
             Defaults to False.
@@ -550,43 +1021,30 @@ def images_to_array(
     Returns:
         np.ndarray: shape will be (f * h * w * 3).
     """
+    logger = get_logger(logger)
     check_path(
         input_path=input_folder,
         allowed_existence=[Existence.DirectoryExistNotEmpty],
         allowed_suffix=[''],
         path_type='dir',
         logger=logger)
-
-    input_folder_info = Path(input_folder)
-
-    temp_input_folder = None
     if img_format is None:
-        temp_input_folder = os.path.join(input_folder_info.parent,
-                                         input_folder_info.name + '_temp')
-        img_format = images_to_sorted_images(
-            input_folder=input_folder, output_folder=temp_input_folder)
-        input_folder = temp_input_folder
-
-    info = VideoInfoReader(f'{input_folder}/{img_format}' % start)
-    width, height = int(info['width']), int(info['height'])
-    if resolution:
-        height, width = resolution
+        image_paths = _get_sorted_image_paths(
+            input_folder=input_folder, img_format=None, logger=logger)
+        n_frames = len(image_paths)
+        probe_path = image_paths[0]
     else:
-        width, height = int(info['width']), int(info['height'])
-
-    n_frames = len(os.listdir(input_folder))
+        n_frames = len(os.listdir(input_folder))
+        probe_path = f'{input_folder}/{img_format}' % start
     start = max(start, 0) % (n_frames + 1)
     end = min(end, n_frames) % (n_frames + 1) \
         if end is not None else n_frames
-    command = [
-        'ffmpeg',
-        '-y',
-        '-threads',
-        '1',
-        '-start_number',
-        f'{start}',
-        '-i',
-        f'{input_folder}/{img_format}',
+    if resolution:
+        height, width = resolution
+    else:
+        info = VideoInfoReader(probe_path, logger=logger)
+        width, height = int(info['width']), int(info['height'])
+    output_args = [
         '-frames:v',
         f'{end - start}',
         '-f',
@@ -599,10 +1057,80 @@ def images_to_array(
         'error',
         '-'
     ]
+    if img_format is None:
+        # try reading without copying images, from the fastest way
+        # until the expected number of frames are read
+        strategies = ['concat', 'symlink']
+        suffixes = set([Path(path).suffix for path in image_paths])
+        if start == 0 and len(suffixes) == 1 and os.name != 'nt' and \
+                not any(char in input_folder for char in '*?[]{}'):
+            strategies.insert(0, 'glob')
+        for strategy in strategies:
+            temp_path = None
+            if strategy == 'glob':
+                input_args = [
+                    '-pattern_type', 'glob', '-i',
+                    os.path.join(input_folder, f'*{suffixes.pop()}')
+                ]
+            elif strategy == 'concat':
+                temp_path = _write_concat_list(image_paths[start:end])
+                input_args = ['-f', 'concat', '-safe', '0', '-i', temp_path]
+            else:
+                temp_path = tempfile.mkdtemp()
+                link_format = images_to_sorted_images(
+                    input_folder=input_folder,
+                    output_folder=temp_path,
+                    use_symlink=True)
+                input_args = [
+                    '-start_number', f'{start}', '-i',
+                    f'{temp_path}/{link_format}'
+                ]
+            array = _read_images_by_ffmpeg(
+                # one output frame for one input image
+                input_args=input_args + ['-vsync', '0'],
+                output_args=output_args,
+                width=width,
+                height=height,
+                disable_log=disable_log,
+                logger=logger)
+            if temp_path is not None and os.path.isdir(temp_path):
+                shutil.rmtree(temp_path)
+            elif temp_path is not None:
+                os.remove(temp_path)
+            if len(array) == end - start:
+                break
+            logger.warning(f'Failed to read images by {strategy},' +
+                           f' {len(array)}/{end - start} frames read.')
+    else:
+        input_args = [
+            '-start_number', f'{start}', '-i', f'{input_folder}/{img_format}'
+        ]
+        array = _read_images_by_ffmpeg(
+            input_args=input_args,
+            output_args=output_args,
+            width=width,
+            height=height,
+            disable_log=disable_log,
+            logger=logger)
+    if remove_raw_files and img_format is not None and\
+            os.path.isdir(input_folder):
+        shutil.rmtree(input_folder)
+
+    return np.concatenate(array)
+
+
+def _read_images_by_ffmpeg(input_args: List[str], output_args: List[str],
+                           width: int, height: int, disable_log: bool,
+                           logger: logging.Logger) -> List[np.ndarray]:
+    """Run ffmpeg with the given input and output args, read raw bgr24 frames
+    from its stdout and return them in a list of (1 * h * w * 3) arrays."""
+    command = ['ffmpeg', '-y', '-threads', '1'] + input_args + output_args
     if not disable_log:
-        logger = get_logger(logger)
         logger.info(f'Running \"{" ".join(command)}\"')
-    process = subprocess.Popen(command, stdout=subprocess.PIPE, bufsize=10**8)
+    # C locale makes glob patterns sorted in the same order as sorted()
+    env = dict(os.environ, LC_ALL='C')
+    process = subprocess.Popen(
+        command, stdout=subprocess.PIPE, bufsize=10**8, env=env)
     if process.stdout is None:
         raise BrokenPipeError('No buffer received.')
     # Read decoded video frames from the PIPE until no more frames to read
@@ -620,17 +1148,26 @@ def images_to_array(
     process.stdout.flush()
     process.stdout.close()
     process.wait()
-    if temp_input_folder is not None and\
-            os.path.isdir(temp_input_folder):
-        shutil.rmtree(temp_input_folder)
-    if remove_raw_files and\
-            os.path.isdir(input_folder):
-        shutil.rmtree(input_folder)
-
-    return np.concatenate(array)
-
-
-def images_to_sorted_images(input_folder, output_folder, img_format='%06d'):
+    return array
+
+
+def _write_concat_list(image_paths: List[str]) -> str:
+    """Write a list file of images for ffmpeg concat demuxer, each image lasts
+    for one second. Return path to the temporary list file."""
+    file_desc, list_path = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(file_desc, 'w') as f_write:
+        f_write.write('ffconcat version 1.0\n')
+        for image_path in image_paths:
+            # escape single quotes for the concat demuxer
+            escaped_path = os.path.abspath(image_path).replace("'", "'\\''")
+            f_write.write(f"file '{escaped_path}'\nduration 1\n")
+    return list_path
+
+
+def images_to_sorted_images(input_folder,
+                            output_folder,
+                            img_format='%06d',
+                            use_symlink=False):
     """Copy and rename a folder of images into a new folder following the
     `img_format`.
 
@@ -639,6 +1176,10 @@ def images_to_sorted_images(input_folder, output_folder, img_format='%06d'):
         output_folder (str): output folder.
         img_format (str, optional): image format name, do not need extension.
             Defaults to '%06d'.
+        use_symlink (bool, optional): whether to create symbolic links
+            instead of copying images. If symbolic links are not supported,
+            images will be copied.
+            Defaults to False.
 
     Returns:
         str: image format of the rename images.
@@ -656,41 +1197,54 @@ def images_to_sorted_images(input_folder, output_folder, img_format='%06d'):
     file_list.extend(jpgs)
     file_list.sort()
     for index, file_name in enumerate(file_list):
-        shutil.copy(
-            file_name,
-            os.path.join(output_folder, (img_format + '.%s') % (index, ext)))
+        dst_path = os.path.join(output_folder,
+                                (img_format + '.%s') % (index, ext))
+        if use_symlink:
+            try:
+                os.symlink(os.path.abspath(file_name), dst_path)
+                continue
+            except (OSError, NotImplementedError):
+                use_symlink = False
+        shutil.copy(file_name, dst_path)
     return img_format + '.%s' % ext
 
 
-def array_to_video(image_array: np.ndarray,
+def array_to_video(image_array: Union[np.ndarray, Iterable[np.ndarray]],
                    output_path: str,
                    fps: Union[int, float] = 30,
                    resolution: Union[Tuple[int, int], Tuple[float,
                                                             float]] = None,
+                   n_frames: Union[int, None] = None,
                    disable_log: bool = False,
                    logger: Union[None, str, logging.Logger] = None) -> None:
     """Convert an array to a video directly, gif not supported.
 
     Args:
-        image_array (np.ndarray): shape should be (f * h * w * 3).
+        image_array (Union[np.ndarray, Iterable[np.ndarray]]):
+            An array in shape (f * h * w * 3), or an iterable
+            (list, generator, etc.) of frames in shape (h * w * 3).
+            Frames are streamed into ffmpeg one by one,
+            so a generator never has to be materialized.
         output_path (str): output video file path.
         fps (Union[int, float, optional): fps. Defaults to 30.
         resolution (Optional[Union[Tuple[int, int], Tuple[float, float]]], \
             optional): (height, width) of the output video. Defaults to None.
+        n_frames (Union[int, None], optional):
+            Max number of frames to take from image_array.
+            Defaults to None, taking all frames.
         disable_log (bool, optional): whether close the ffmepg command info.
             Defaults to False.
 
     Raises:
         FileNotFoundError: check output path.
         TypeError: check input array.
+        ValueError: no frame in input, or frames in wrong shape.
 
     Returns:
         None.
     """
-    if not isinstance(image_array, np.ndarray):
-        raise TypeError('Input should be np.ndarray.')
-    assert image_array.ndim == 4
-    assert image_array.shape[-1] == 3
+    first_frame, frames = _get_frame_iterator(
+        image_array, n_frames=n_frames, logger=logger)
     prepare_output_path(
         output_path,
         allowed_suffix=['.mp4'],
@@ -703,8 +1257,9 @@ def array_to_video(image_array: np.ndarray,
         width += width % 2
         height += height % 2
     else:
-        image_array = pad_for_libx264(image_array)
-        height, width = image_array.shape[1], image_array.shape[2]
+        height, width = first_frame.shape[0], first_frame.shape[1]
+        height += height % 2
+        width += width % 2
     command = [
         'ffmpeg',
         '-y',  # (optional) overwrite output file if it exists
@@ -737,39 +1292,55 @@ def array_to_video(image_array: np.ndarray,
     )
     if process.stdin is None or process.stderr is None:
         raise BrokenPipeError('No buffer received.')
-    index = 0
-    while True:
-        if index >= image_array.shape[0]:
-            break
-        process.stdin.write(image_array[index].tobytes())
-        index += 1
-    process.stdin.close()
-    process.stderr.close()
-    process.wait()
+    _write_frames_to_pipe(
+        process=process,
+        frames=frames,
+        frame_shape=first_frame.shape,
+        pad_frame=not resolution,
+        logger=logger)
 
 
-def array_to_images(image_array: np.ndarray,
+def array_to_images(image_array: Union[np.ndarray, Iterable[np.ndarray]],
                     output_folder: str,
                     img_format: str = '%06d.png',
                     resolution: Union[Tuple[int, int], Tuple[float,
                                                              float]] = None,
+                    n_frames: Union[int, None] = None,
+                    n_workers: int = 4,
+                    png_compression: int = 1,
+                    jpeg_quality: int = 95,
                     disable_log: bool = False,
                     logger: Union[None, str, logging.Logger] = None) -> None:
     """Convert an array to images directly.
 
     Args:
-        image_array (np.ndarray): shape should be (f * h * w * 3).
+        image_array (Union[np.ndarray, Iterable[np.ndarray]]):
+            An array in shape (f * h * w * 3), or an iterable
+            (list, generator, etc.) of frames in shape (h * w * 3).
+            Frames are written one by one,
+            so a generator never has to be materialized.
         output_folder (str): output folder for the images.
         img_format (str, optional): format of the images.
             Defaults to '%06d.png'.
         resolution (Optional[Union[Tuple[int, int], Tuple[float, float]]], \
             optional): (height, width) of the output images. Defaults to None.
-        disable_log (bool, optional): whether close the ffmepg command info.
+        n_frames (Union[int, None], optional):
+            Max number of frames to take from image_array.
+            Defaults to None, taking all frames.
+        n_workers (int, optional):
+            Number of threads encoding and writing images.
+            Defaults to 4.
+        png_compression (int, optional):
+            PNG compression level, from 0 to 9. Defaults to 1.
+        jpeg_quality (int, optional):
+            JPEG quality, from 0 to 100. Defaults to 95.
+        disable_log (bool, optional): whether close the image writing info.
             Defaults to False.
 
     Raises:
         FileNotFoundError: check output folder.
         TypeError: check input array.
+        ValueError: no frame in input, or frames in wrong shape.
 
     Returns:
         None
@@ -781,58 +1352,131 @@ def array_to_images(image_array: np.ndarray,
         tag='output image folder',
         path_type='dir',
         overwrite=True)
-
-    if not isinstance(image_array, np.ndarray):
-        raise TypeError('Input should be np.ndarray.')
-    assert image_array.ndim == 4
-    assert image_array.shape[-1] == 3
     if resolution:
         height, width = resolution
         logger.error('Resolution not correctly implemented.')
         raise NotImplementedError
-    else:
-        height, width = image_array.shape[1], image_array.shape[2]
-    command = [
-        'ffmpeg',
-        '-y',  # (optional) overwrite output file if it exists
-        '-f',
-        'rawvideo',
-        '-s',
-        f'{int(width)}x{int(height)}',  # size of one frame
-        '-pix_fmt',
-        'bgr24',  # bgr24 for matching OpenCV
-        '-loglevel',
-        'error',
-        '-threads',
-        '4',
-        '-i',
-        '-',  # The input comes from a pipe
-        '-f',
-        'image2',
-        '-start_number',
-        '0',
-        os.path.join(output_folder, img_format),
-    ]
+    first_frame, frames = _get_frame_iterator(
+        image_array, n_frames=n_frames, logger=logger)
     if not disable_log:
+        logger.info(f'Writing images to {output_folder}' +
+                    f' with {n_workers} workers.')
+    with ImageWriter(
+            n_workers=n_workers,
+            queue_size=2 * n_workers,
+            png_compression=png_compression,
+            jpeg_quality=jpeg_quality,
+            logger=logger) as image_writer:
+        for frame_index, frame in enumerate(frames):
+            _check_frame_shape(
+                frame=frame,
+                frame_index=frame_index,
+                frame_shape=first_frame.shape,
+                logger=logger)
+            image_writer.write(
+                os.path.join(output_folder, img_format % frame_index), frame)
+
+
+def _get_frame_iterator(
+    image_array: Union[np.ndarray, Iterable[np.ndarray]],
+    n_frames: Union[int, None] = None,
+    logger: Union[None, str, logging.Logger] = None
+) -> Tuple[np.ndarray, Iterator[np.ndarray]]:
+    """Peek the first frame of image_array and get an iterator over all the
+    frames, including the first one.
+
+    Args:
+        image_array (Union[np.ndarray, Iterable[np.ndarray]]):
+            An array in shape (f * h * w * 3), or an iterable of frames.
+        n_frames (Union[int, None], optional):
+            Max number of frames to iterate. Defaults to None.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        TypeError: image_array is neither an array nor an iterable.
+        ValueError: no frame in image_array.
+
+    Returns:
+        Tuple[np.ndarray, Iterator[np.ndarray]]:
+            The first frame and an iterator over all frames.
+    """
+    if isinstance(image_array, np.ndarray):
+        assert image_array.ndim == 4
+        assert image_array.shape[-1] == 3
+    elif not isinstance(image_array, Iterable):
+        raise TypeError('Input should be np.ndarray or'
+                        ' an iterable of np.ndarray.')
+    frames = iter(image_array)
+    if n_frames is not None:
+        frames = itertools.islice(frames, n_frames)
+    first_frame = next(frames, None)
+    if first_frame is None:
         logger = get_logger(logger)
-        logger.info(f'Running \"{" ".join(command)}\"')
-    process = subprocess.Popen(
-        command,
-        stdin=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        bufsize=10**8,
-        close_fds=True)
-    if process.stdin is None or process.stderr is None:
-        raise BrokenPipeError('No buffer received.')
-    index = 0
-    while True:
-        if index >= image_array.shape[0]:
-            break
-        process.stdin.write(image_array[index].tobytes())
-        index += 1
-    process.stdin.close()
-    process.stderr.close()
-    process.wait()
+        logger.error('No frame found in the input.')
+        raise ValueError
+    return first_frame, itertools.chain([first_frame], frames)
+
+
+def _write_frames_to_pipe(
+        process: subprocess.Popen,
+        frames: Iterator[np.ndarray],
+        frame_shape: Tuple[int, ...],
+        pad_frame: bool = False,
+        logger: Union[None, str, logging.Logger] = None) -> None:
+    """Write frames into the stdin of an ffmpeg process one by one, and wait
+    for the process to finish.
+
+    Args:
+        process (subprocess.Popen):
+            The ffmpeg process reading rawvideo from stdin.
+        frames (Iterator[np.ndarray]):
+            Frames in shape (h * w * 3).
+        frame_shape (Tuple[int, ...]):
+            Expected shape of every frame.
+        pad_frame (bool, optional):
+            Whether to pad each frame by pad_for_libx264.
+            Defaults to False.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        ValueError: a frame has a different shape from frame_shape.
+    """
+    try:
+        for frame_index, frame in enumerate(frames):
+            _check_frame_shape(
+                frame=frame,
+                frame_index=frame_index,
+                frame_shape=frame_shape,
+                logger=logger)
+            if pad_frame:
+                frame = pad_for_libx264(frame)
+            process.stdin.write(np.ascontiguousarray(frame).tobytes())
+    finally:
+        process.stdin.close()
+        process.stderr.close()
+        process.wait()
+
+
+def _check_frame_shape(
+        frame: np.ndarray,
+        frame_index: int,
+        frame_shape: Tuple[int, ...],
+        logger: Union[None, str, logging.Logger] = None) -> None:
+    """Check whether a frame is in the expected (h * w * 3) shape.
+
+    Raises:
+        ValueError: frame has a different shape from frame_shape.
+    """
+    if len(frame_shape) != 3 or frame_shape[-1] != 3 or \
+            frame.shape != frame_shape:
+        logger = get_logger(logger)
+        logger.error(f'Shape of frame {frame_index} is {frame.shape},'
+                     f' expecting {frame_shape} in (h * w * 3).')
+        raise ValueError
 
 
 def images_to_video(input_folder: str,
@@ -0,0 +1,170 @@
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Union
+
+import cv2
+import numpy as np
+
+from .log_utils import get_logger
+
+
+class ImageWriter():
+    """An asynchronous image writer. Images are encoded and written by a pool
+    of worker threads, while the caller keeps rendering the next frame.
+    cv2.imwrite releases the GIL, so PNG compression runs in parallel.
+
+    The number of pending images is bounded by queue_size, write() blocks when
+    the queue is full, so that memory stays bounded when the caller produces
+    images faster than the workers write them.
+    """
+
+    def __init__(self,
+                 n_workers: int = 4,
+                 queue_size: int = 16,
+                 png_compression: int = 1,
+                 jpeg_quality: int = 95,
+                 logger: Union[None, str, logging.Logger] = None) -> None:
+        """
+        Args:
+            n_workers (int, optional):
+                Number of threads writing images. Defaults to 4.
+            queue_size (int, optional):
+                Max number of images submitted but not yet written.
+                Defaults to 16.
+            png_compression (int, optional):
+                PNG compression level, from 0 to 9. A higher value means a
+                smaller file and a longer time.
+                Defaults to 1, the same as cv2.imwrite.
+            jpeg_quality (int, optional):
+                JPEG quality, from 0 to 100.
+                Defaults to 95, the same as cv2.imwrite.
+            logger (Union[None, str, logging.Logger], optional):
+                Logger for logging. If None, root logger will be selected.
+                Defaults to None.
+
+        Raises:
+            ValueError: png_compression or jpeg_quality out of range.
+        """
+        self.logger = get_logger(logger)
+        if png_compression < 0 or png_compression > 9:
+            self.logger.error('png_compression should be in [0, 9],' +
+                              f' but got {png_compression}.')
+            raise ValueError
+        if jpeg_quality < 0 or jpeg_quality > 100:
+            self.logger.error('jpeg_quality should be in [0, 100],' +
+                              f' but got {jpeg_quality}.')
+            raise ValueError
+        self.n_workers = max(int(n_workers), 1)
+        self.png_compression = png_compression
+        self.jpeg_quality = jpeg_quality
+        self.executor = ThreadPoolExecutor(max_workers=self.n_workers)
+        self.semaphore = threading.BoundedSemaphore(max(int(queue_size), 1))
+        self.futures = deque()
+        self.closed = False
+
+    def write(self,
+              img_path: str,
+              img: np.ndarray,
+              copy: bool = False) -> None:
+        """Submit an image to write. Blocks when too many images are pending.
+
+        Args:
+            img_path (str):
+                Path to the output image file. The format is
+                decided by its extension name.
+            img (np.ndarray):
+                Image array in BGR, shape [h, w, 3] or [h, w].
+            copy (bool, optional):
+                Whether to copy img before submitting it.
+                Set it to True if img will be modified before
+                it is written. Defaults to False.
+
+        Raises:
+            ValueError: the writer has been closed.
+        """
+        if self.closed:
+            self.logger.error('Cannot write images with a closed writer.')
+            raise ValueError
+        # surface errors of finished tasks as early as possible
+        while len(self.futures) > 0 and self.futures[0].done():
+            self.futures.popleft().result()
+        if copy:
+            img = img.copy()
+        self.semaphore.acquire()
+        try:
+            future = self.executor.submit(self.__write_image__, img_path, img)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        future.add_done_callback(self.__release_slot__)
+        self.futures.append(future)
+
+    def flush(self) -> None:
+        """Block until all the submitted images are written.
+
+        Raises:
+            OSError: an image failed to be written.
+        """
+        first_error = None
+        while len(self.futures) > 0:
+            future = self.futures.popleft()
+            error = future.exception()
+            if error is not None and first_error is None:
+                first_error = error
+        if first_error is not None:
+            raise first_error
+
+    def close(self) -> None:
+        """Write all the pending images and stop the worker threads.
+
+        Raises:
+            OSError: an image failed to be written.
+        """
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.closed = True
+            self.executor.shutdown(wait=True)
+
+    def get_imwrite_params(self, img_path: str) -> List[int]:
+        """Get cv2.imwrite params according to the extension name.
+
+        Args:
+            img_path (str):
+                Path to the output image file.
+
+        Returns:
+            List[int]: params for cv2.imwrite.
+        """
+        ext = os.path.splitext(img_path)[1].lower()
+        if ext == '.png':
+            return [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        elif ext in ('.jpg', '.jpeg'):
+            return [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        else:
+            return []
+
+    def __write_image__(self, img_path: str, img: np.ndarray) -> None:
+        ret_val = cv2.imwrite(img_path, img, self.get_imwrite_params(img_path))
+        if not ret_val:
+            self.logger.error(f'Failed to write image to {img_path}.')
+            raise OSError(f'Failed to write image to {img_path}.')
+
+    def __release_slot__(self, future: Future) -> None:
+        self.semaphore.release()
+
+    def __enter__(self) -> 'ImageWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        if not getattr(self, 'closed', True):
+            self.closed = True
+            self.executor.shutdown(wait=True)
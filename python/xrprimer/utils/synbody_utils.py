@@ -10,9 +10,13 @@ If you encounter any problems with openexr installation,
 refer to the following link:
 https://github.com/AcademySoftwareFoundation/openexr/blob/main/INSTALL.md
 """
+import hashlib
 import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Callable, Dict, Generator, List, Set, Tuple, Union
 
 import cv2
 import numpy as np
@@ -43,14 +47,48 @@ class SynbodyReader:
     SMPLX = 'smplx'
     NORMAL = 'normal'
 
-    def __init__(self, seq_data_path: PathLike) -> None:
+    def __init__(self,
+                 seq_data_path: PathLike,
+                 seq_data: Union[Dict, None] = None) -> None:
         """Load seq_data.json in SynBody dataset.
 
         Args:
             seq_data_path (PathLike): Files are named: 'seq_data.json'
+            seq_data (Union[Dict, None], optional): content of
+                seq_data_path, already loaded e.g. from an index.
+                Defaults to None, load it from seq_data_path.
         """
-        self.seq_data_reader = SeqDataReader(seq_data_path)
+        self.seq_data_reader = SeqDataReader(seq_data_path, seq_data=seq_data)
         self.sequence_dir = Path(seq_data_path).parent
+        # file names in the folder of each data modal, listed once
+        self._modal_files: Dict[str, Set[str]] = {}
+        # raw smplx annotations of each npz file, loaded once
+        self._smplx_cache: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_index_entry(cls, index_entry: Dict[str, Any],
+                         dataset_dir: PathLike) -> 'SynbodyReader':
+        """Open a sequence from an entry of the index built by
+        build_synbody_index(), without reading seq_data.json or listing
+        folders of the sequence.
+
+        Args:
+            index_entry (Dict[str, Any]): an entry returned by
+                build_synbody_index() or load_synbody_index().
+            dataset_dir (PathLike): the dataset directory, where
+                sequence_dir of the entry is relative to.
+
+        Returns:
+            SynbodyReader: the reader of the sequence.
+        """
+        sequence_dir = Path(dataset_dir) / index_entry['sequence_dir']
+        reader = cls(
+            sequence_dir / 'seq_data.json', seq_data=index_entry['seq_data'])
+        reader._modal_files = {
+            modal: _decode_file_names(encoded_names)
+            for modal, encoded_names in index_entry['modal_files'].items()
+        }
+        return reader
 
     def get_mask_colors(self) -> List[Tuple[int, int, int]]:
         """Get all actor models' segmentation mask colors (rgb) from the
@@ -70,15 +108,7 @@ class SynbodyReader:
         Returns:
             np.ndarray: image of shape (H, W, 3)
         """
-        folder = self.sequence_dir / self.RGB
-        if not folder.exists():
-            raise ValueError(f'Folder of rgb images not found: {folder}')
-        file_path = folder / f'{frame:04d}.jpeg'
-        if not file_path.exists():
-            raise ValueError(f'Image of {frame}-frame not found: {file_path}')
-        img = cv2.imread(str(file_path))
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        return img
+        return self._read_rgb(self._get_frame_path(self.RGB, frame, '.jpeg'))
 
     def get_mask(self, frame: int) -> np.ndarray:
         """Get mask of the given frame ('mask/{frame:04d}.exr')
@@ -89,13 +119,7 @@ class SynbodyReader:
         Returns:
             np.ndarray: masks of shape (H, W, 3)
         """
-        folder = self.sequence_dir / self.MASK
-        if not folder.exists():
-            raise ValueError(f'Folder of masks not found: {folder}')
-        file_path = folder / f'{frame:04d}.exr'
-        if not file_path.exists():
-            raise ValueError(f'Mask of {frame}-frame not found: {file_path}')
-        return SynbodyExrReader(file_path).get_mask()
+        return self._read_mask(self._get_frame_path(self.MASK, frame, '.exr'))
 
     def get_depth(self, frame: int, depth_rescale=1.0) -> np.ndarray:
         """Get depth of the given frame ('depth/{frame:04d}.exr')
@@ -106,12 +130,7 @@ class SynbodyReader:
         Returns:
             np.ndarray: depth of shape (H, W, 3)
         """
-        folder = self.sequence_dir / self.DEPTH
-        if not folder.exists():
-            raise ValueError(f'Folder of depth not found: {folder}')
-        file_path = folder / f'{frame:04d}.exr'
-        if not file_path.exists():
-            raise ValueError(f'Depth of {frame}-frame not found: {file_path}')
+        file_path = self._get_frame_path(self.DEPTH, frame, '.exr')
         return SynbodyExrReader(file_path).get_depth(
             depth_rescale=depth_rescale)
 
@@ -127,13 +146,8 @@ class SynbodyReader:
         Returns:
             np.ndarray: optical flow of shape (H, W, 3)
         """
-        folder = self.sequence_dir / self.OPTICAL_FLOW
-        if not folder.exists():
-            raise ValueError(f'Folder of depth not found: {folder}')
-        file_path = folder / f'{frame:04d}.exr'
-        if not file_path.exists():
-            raise ValueError(f'Depth of {frame}-frame not found: {file_path}')
-        return SynbodyExrReader(file_path).get_flow()
+        return self._read_flow(
+            self._get_frame_path(self.OPTICAL_FLOW, frame, '.exr'))
 
     def get_normal(self, frame: int) -> np.ndarray:
         """Get normal map of the given frame ('normal/{frame:04d}.png')
@@ -144,20 +158,213 @@ class SynbodyReader:
         Returns:
             np.ndarray: normal map of shape (H, W, 3)
         """
-        folder = self.sequence_dir / self.NORMAL
-        if not folder.exists():
-            raise ValueError(f'Folder of normal mpa not found: {folder}')
-        file_path = folder / f'{frame:04d}.png'
-        if not file_path.exists():
+        return self._read_rgb(self._get_frame_path(self.NORMAL, frame, '.png'))
+
+    def get_rgb_range(
+        self,
+        start: int = 1,
+        end: Union[int, None] = None,
+        stride: int = 1,
+        n_workers: int = 8,
+        return_generator: bool = False
+    ) -> Union[np.ndarray, Generator[np.ndarray, None, None]]:
+        """Get rgb images of frames in [start, end), see
+        get_modal_range()."""
+        return self.get_modal_range(
+            self.RGB,
+            start=start,
+            end=end,
+            stride=stride,
+            n_workers=n_workers,
+            return_generator=return_generator)
+
+    def get_mask_range(
+        self,
+        start: int = 1,
+        end: Union[int, None] = None,
+        stride: int = 1,
+        n_workers: int = 8,
+        return_generator: bool = False
+    ) -> Union[np.ndarray, Generator[np.ndarray, None, None]]:
+        """Get masks of frames in [start, end), see get_modal_range()."""
+        return self.get_modal_range(
+            self.MASK,
+            start=start,
+            end=end,
+            stride=stride,
+            n_workers=n_workers,
+            return_generator=return_generator)
+
+    def get_depth_range(
+        self,
+        start: int = 1,
+        end: Union[int, None] = None,
+        stride: int = 1,
+        depth_rescale: float = 1.0,
+        n_workers: int = 8,
+        return_generator: bool = False
+    ) -> Union[np.ndarray, Generator[np.ndarray, None, None]]:
+        """Get depth of frames in [start, end), see get_modal_range()."""
+        return self.get_modal_range(
+            self.DEPTH,
+            start=start,
+            end=end,
+            stride=stride,
+            n_workers=n_workers,
+            return_generator=return_generator,
+            depth_rescale=depth_rescale)
+
+    def get_flow_range(
+        self,
+        start: int = 1,
+        end: Union[int, None] = None,
+        stride: int = 1,
+        n_workers: int = 8,
+        return_generator: bool = False
+    ) -> Union[np.ndarray, Generator[np.ndarray, None, None]]:
+        """Get optical flows of frames in [start, end), see
+        get_modal_range()."""
+        return self.get_modal_range(
+            self.OPTICAL_FLOW,
+            start=start,
+            end=end,
+            stride=stride,
+            n_workers=n_workers,
+            return_generator=return_generator)
+
+    def get_normal_range(
+        self,
+        start: int = 1,
+        end: Union[int, None] = None,
+        stride: int = 1,
+        n_workers: int = 8,
+        return_generator: bool = False
+    ) -> Union[np.ndarray, Generator[np.ndarray, None, None]]:
+        """Get normal maps of frames in [start, end), see
+        get_modal_range()."""
+        return self.get_modal_range(
+            self.NORMAL,
+            start=start,
+            end=end,
+            stride=stride,
+            n_workers=n_workers,
+            return_generator=return_generator)
+
+    def get_modal_range(
+        self,
+        modal: str,
+        start: int = 1,
+        end: Union[int, None] = None,
+        stride: int = 1,
+        n_workers: int = 8,
+        return_generator: bool = False,
+        depth_rescale: float = 1.0
+    ) -> Union[np.ndarray, Generator[np.ndarray, None, None]]:
+        """Get data of one modal for frames in [start, end). The folder is
+        listed once and all files are resolved before loading, then frames
+        are loaded by a pool of threads.
+
+        Args:
+            modal (str): one of RGB, MASK, DEPTH, OPTICAL_FLOW and NORMAL
+            start (int, optional): the first frame number. Inclusive.
+                Defaults to 1.
+            end (Union[int, None], optional): the last frame number.
+                Exclusive. Defaults to None, till the last frame
+                in the folder.
+            stride (int, optional): load one frame every stride frames.
+                Defaults to 1.
+            n_workers (int, optional): number of loading threads.
+                Defaults to 8.
+            return_generator (bool, optional): whether to yield frames one
+                by one instead of returning an array. At most
+                2 * n_workers frames are loaded ahead.
+                Defaults to False.
+            depth_rescale (float, optional): scaling the depth, only used
+                by DEPTH, see get_depth(). Defaults to 1.0.
+
+        Raises:
+            ValueError: modal is not supported, or its folder or
+                some frame's file is not found.
+
+        Returns:
+            Union[np.ndarray, Generator[np.ndarray, None, None]]:
+                An array of shape (N, H, W, 3) filled in place,
+                or a generator of arrays of shape (H, W, 3).
+        """
+        modal_readers = {
+            self.RGB: ('.jpeg', self._read_rgb),
+            self.MASK: ('.exr', self._read_mask),
+            self.DEPTH: ('.exr', lambda file_path: SynbodyExrReader(file_path).
+                         get_depth(depth_rescale=depth_rescale)),
+            self.OPTICAL_FLOW: ('.exr', self._read_flow),
+            self.NORMAL: ('.png', self._read_rgb),
+        }
+        if modal not in modal_readers:
+            raise ValueError(f'Modal should be one of'
+                             f' {list(modal_readers.keys())}: {modal}')
+        suffix, reader = modal_readers[modal]
+        if end is None:
+            frames = [
+                int(file_name[:-len(suffix)])
+                for file_name in self._list_modal_files(modal)
+                if file_name.endswith(suffix)
+                and file_name[:-len(suffix)].isdigit()
+            ]
+            end = max(frames) + 1 if len(frames) > 0 else start
+        file_paths = [
+            self._get_frame_path(modal, frame, suffix)
+            for frame in range(start, end, stride)
+        ]
+        if return_generator:
+            return _generate_frames(file_paths, reader, n_workers)
+        else:
+            return _load_frames(file_paths, reader, n_workers)
+
+    def _list_modal_files(self, modal: str) -> Set[str]:
+        if modal not in self._modal_files:
+            folder = self.sequence_dir / modal
+            if not folder.exists():
+                raise ValueError(f'Folder of {modal} not found: {folder}')
+            self._modal_files[modal] = set(os.listdir(folder))
+        return self._modal_files[modal]
+
+    def _get_frame_path(self, modal: str, frame: int, suffix: str) -> Path:
+        file_name = f'{frame:04d}{suffix}'
+        file_path = self.sequence_dir / modal / file_name
+        # files written after listing are checked on disk
+        if file_name not in self._list_modal_files(modal) and \
+                not file_path.exists():
             raise ValueError(
-                f'Normal map of {frame}-frame not found: {file_path}')
+                f'{modal} of {frame}-frame not found: {file_path}')
+        return file_path
+
+    @staticmethod
+    def _read_rgb(file_path: Path) -> np.ndarray:
         img = cv2.imread(str(file_path))
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        return img
+        if img is None:
+            raise ValueError(f'Failed to read image: {file_path}')
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+    @staticmethod
+    def _read_mask(file_path: Path) -> np.ndarray:
+        return SynbodyExrReader(file_path).get_mask()
+
+    @staticmethod
+    def _read_flow(file_path: Path) -> np.ndarray:
+        return SynbodyExrReader(file_path).get_flow()
 
-    def get_smplx(self) -> List[Dict[str, np.ndarray]]:
+    def get_smplx(
+            self,
+            mmap_dir: Union[PathLike,
+                            None] = None) -> List[Dict[str, np.ndarray]]:
         """Get smplx of actors in the sequence ('smplx/*.npz')
 
+        Args:
+            mmap_dir (Union[PathLike, None], optional): a directory to
+                cache annotations as `.npy` files, which are memory-mapped
+                instead of unpickling the npz files. See
+                get_smplx_batch(). Defaults to None.
+
         Returns:
             List[Dict[str, np.ndarray]]: list of all actors' SMPL-X
                 annotations. Keys included:
@@ -175,27 +382,103 @@ class SynbodyReader:
 
                 (N is the number of frames + 1,
                     where the 0-th frame is rest pose at T for calibration.)
+                With mmap_dir, arrays except transl and global_orient
+                are read-only memory maps shared with the cache of
+                this reader.
         """
         smplx = []
         for actor_data in self.seq_data_reader.get_actors():
-            actor_transl = actor_data['transl']
-            actor_rot = spRotation.from_rotvec(actor_data['global_orient'])
-            humandata_smplx = np.load(actor_data['smplx'], allow_pickle=True)
-            humandata_smplx = humandata_smplx['smplx'].item()
+            humandata_smplx = dict(
+                self._load_smplx(actor_data['smplx'], mmap_dir=mmap_dir))
+            if mmap_dir is None:
+                # copies of the cache, which can be edited in place
+                for key, value in humandata_smplx.items():
+                    if isinstance(value, np.ndarray):
+                        humandata_smplx[key] = value.copy()
             # transform according to placement of the actor
-            global_rot = spRotation.from_rotvec(
-                humandata_smplx['global_orient'])
-            global_rot = actor_rot * global_rot
-            humandata_smplx['global_orient'] = global_rot.as_rotvec().astype(
-                np.float32)
-            transl = humandata_smplx['transl']
-            transl = actor_rot.apply(transl - transl[0, :]) + transl[
-                0, :] + actor_transl
-            humandata_smplx['transl'] = transl
-
+            global_orient, transl = _place_actors(
+                actor_global_orient=actor_data['global_orient'][None],
+                actor_transl=actor_data['transl'][None],
+                global_orient=humandata_smplx['global_orient'][None],
+                transl=humandata_smplx['transl'][None])
+            humandata_smplx['global_orient'] = global_orient[0]
+            humandata_smplx['transl'] = transl[0]
             smplx.append(humandata_smplx)
         return smplx
 
+    def get_smplx_batch(
+            self,
+            mmap_dir: Union[PathLike, None] = None) -> Dict[str, np.ndarray]:
+        """Get smplx of all actors in the sequence, stacked in arrays of
+        shape (n_actor, ...). Placements of all actors are applied in one
+        vectorized pass.
+
+        Args:
+            mmap_dir (Union[PathLike, None], optional): a directory to
+                cache annotations as `.npy` files. The first call converts
+                each npz file once, later calls memory-map the `.npy`
+                files instead of unpickling the npz files.
+                Defaults to None, do not cache on disk.
+
+        Raises:
+            ValueError: actors have different keys or shapes, e.g.
+                different number of frames.
+
+        Returns:
+            Dict[str, np.ndarray]: SMPL-X annotations of the same keys as
+                get_smplx(), while the shape of each array is
+                (n_actor, N, ...), e.g. transl of shape (n_actor, N, 3)
+                and betas of shape (n_actor, 10).
+        """
+        actors = self.seq_data_reader.get_actors()
+        if len(actors) == 0:
+            return {}
+        actor_smplx_list = [
+            self._load_smplx(actor_data['smplx'], mmap_dir=mmap_dir)
+            for actor_data in actors
+        ]
+        smplx = {}
+        for key, value in actor_smplx_list[0].items():
+            if not isinstance(value, np.ndarray):
+                continue
+            for actor_data, actor_smplx in zip(actors, actor_smplx_list):
+                if key not in actor_smplx or \
+                        np.shape(actor_smplx[key]) != value.shape:
+                    raise ValueError(
+                        f'smplx of actor {actor_data["name"]} does not match'
+                        f' the first actor, key: {key}, shape:'
+                        f' {np.shape(actor_smplx.get(key))} != {value.shape}')
+            smplx[key] = np.stack(
+                [actor_smplx[key] for actor_smplx in actor_smplx_list])
+        smplx['global_orient'], smplx['transl'] = _place_actors(
+            actor_global_orient=np.stack(
+                [actor_data['global_orient'] for actor_data in actors]),
+            actor_transl=np.stack(
+                [actor_data['transl'] for actor_data in actors]),
+            global_orient=smplx['global_orient'],
+            transl=smplx['transl'])
+        return smplx
+
+    def _load_smplx(self,
+                    smplx_name: PathLike,
+                    mmap_dir: Union[PathLike, None] = None) -> Dict[str, Any]:
+        """Load raw smplx annotation of an actor, cached by this reader."""
+        smplx_path = Path(smplx_name)
+        if not smplx_path.is_absolute() and not smplx_path.exists():
+            smplx_path = self.sequence_dir / self.SMPLX / smplx_name
+        cache_key = f'{smplx_path}@{mmap_dir}'
+        if cache_key not in self._smplx_cache:
+            if mmap_dir is None:
+                humandata_smplx = np.load(
+                    smplx_path, allow_pickle=True)['smplx'].item()
+            else:
+                humandata_smplx = _load_smplx_mmap(smplx_path, Path(mmap_dir))
+            for value in humandata_smplx.values():
+                if isinstance(value, np.ndarray):
+                    value.setflags(write=False)
+            self._smplx_cache[cache_key] = humandata_smplx
+        return self._smplx_cache[cache_key]
+
     def get_camera(self) -> PinholeCameraParameter:
         """Get camera parameter used in the sequence.
 
@@ -223,18 +506,23 @@ class SynbodyExrReader(ExrReader):
         array = np.clip(array, 0, 255)
         return array.astype(np.uint8)
 
+    @staticmethod
+    def _float2int_inplace(array: np.ndarray) -> np.ndarray:
+        """Same as float2int, but array is used as the buffer of
+        intermediate results."""
+        array *= 255
+        np.round(array, out=array)
+        np.clip(array, 0, 255, out=array)
+        return array.astype(np.uint8)
+
     def get_mask(self) -> np.ndarray:
         """Get mask in `.exr` format.
 
         Returns:
             np.ndarray: masks of shape (H, W, 3)
         """
-        r = self.read_channel('R')
-        g = self.read_channel('G')
-        b = self.read_channel('B')
-        img = np.stack((r, g, b), axis=2)
-        img = self.float2int(img)
-        return img
+        img = self.read_channels(['R', 'G', 'B'])
+        return self._float2int_inplace(img)
 
     def get_flow(self) -> np.ndarray:
         """Get optical flow in `.exr` format.
@@ -242,9 +530,7 @@ class SynbodyExrReader(ExrReader):
         Returns:
             np.ndarray: optical flow data of (H, W, 3) converted to colors
         """
-        flow_r = self.read_channel('R')
-        flow_g = self.read_channel('G')
-        flow = np.stack((flow_r, flow_g), axis=2)
+        flow = self.read_channels(['R', 'G'])
         img = flow_vis.flow_to_color(flow, convert_to_bgr=False)
         return img
 
@@ -259,28 +545,129 @@ class SynbodyExrReader(ExrReader):
         Returns:
             np.ndarray: depth data of shape (H, W, 3)
         """
-        r = self.read_channel('R')
-        g = self.read_channel('G')
-        b = self.read_channel('B')
-        depth = np.stack((r, g, b), axis=2)
-
-        img = self.float2int(depth / depth_rescale)
+        depth = self.read_channels(['R', 'G', 'B'])
+        depth /= depth_rescale
+        img = self._float2int_inplace(depth)
         img[img == 0] = 255
         return img
 
 
+def _place_actors(actor_global_orient: np.ndarray, actor_transl: np.ndarray,
+                  global_orient: np.ndarray,
+                  transl: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Transform smplx global_orient and transl of shape (n_actor, N, 3) by
+    placements of actors, of shape (n_actor, 3), in one batch of rotations.
+
+    Returns global_orient in float32 and transl.
+    """
+    n_actor, n_frame = np.shape(global_orient)[:2]
+    actor_rot = spRotation.from_rotvec(actor_global_orient)
+    global_rot = spRotation.from_rotvec(
+        np.repeat(actor_global_orient, n_frame, axis=0)) * \
+        spRotation.from_rotvec(np.reshape(global_orient, (-1, 3)))
+    global_orient = global_rot.as_rotvec().astype(np.float32)
+    global_orient = global_orient.reshape(n_actor, n_frame, 3)
+    # rotate around the first frame's location
+    transl_0 = transl[:, :1, :]
+    transl = np.einsum('aij,afj->afi', actor_rot.as_matrix(),
+                       transl - transl_0) + transl_0 + actor_transl[:, None]
+    return global_orient, transl
+
+
+def _load_smplx_mmap(smplx_path: Path, mmap_dir: Path) -> Dict[str, Any]:
+    """Load a smplx npz file through a cache of `.npy` files, which are
+    memory-mapped. The cache is keyed by path, size and mtime of the npz
+    file."""
+    stat = smplx_path.stat()
+    file_key = f'{smplx_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}'
+    digest = hashlib.sha1(file_key.encode()).hexdigest()[:16]
+    cache_dir = mmap_dir / f'{smplx_path.stem}_{digest}'
+    if not cache_dir.is_dir():
+        humandata_smplx = np.load(
+            smplx_path, allow_pickle=True)['smplx'].item()
+        tmp_dir = mmap_dir / f'{cache_dir.name}.{os.getpid()}.tmp'
+        os.makedirs(tmp_dir, exist_ok=True)
+        extra = {}
+        for key, value in humandata_smplx.items():
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                np.save(tmp_dir / f'{key}.npy', value)
+            else:
+                extra[key] = value
+        np.save(tmp_dir / '_extra.npy', np.array(extra, dtype=object))
+        try:
+            os.replace(tmp_dir, cache_dir)
+        except OSError:
+            # written by another process meanwhile
+            for file_name in os.listdir(tmp_dir):
+                os.remove(tmp_dir / file_name)
+            os.rmdir(tmp_dir)
+    humandata_smplx = {}
+    for file_name in sorted(os.listdir(cache_dir)):
+        key = file_name[:-len('.npy')]
+        if key == '_extra':
+            humandata_smplx.update(
+                np.load(cache_dir / file_name, allow_pickle=True).item())
+        else:
+            humandata_smplx[key] = np.load(
+                cache_dir / file_name, mmap_mode='r')
+    return humandata_smplx
+
+
+def _load_frames(file_paths: List[Path], reader: Callable[[Path], np.ndarray],
+                 n_workers: int) -> np.ndarray:
+    """Load frames by a pool of threads into a preallocated array."""
+    if len(file_paths) == 0:
+        return np.zeros(shape=(0, 0, 0, 3), dtype=np.uint8)
+    first_frame = reader(file_paths[0])
+    array = np.empty(
+        shape=(len(file_paths), ) + first_frame.shape, dtype=first_frame.dtype)
+    array[0] = first_frame
+
+    def read_into_array(index: int) -> None:
+        array[index] = reader(file_paths[index])
+
+    with ThreadPoolExecutor(max_workers=max(int(n_workers), 1)) as executor:
+        # consume the iterator to raise exceptions from workers
+        for _ in executor.map(read_into_array, range(1, len(file_paths))):
+            pass
+    return array
+
+
+def _generate_frames(file_paths: List[Path], reader: Callable[[Path],
+                                                              np.ndarray],
+                     n_workers: int) -> Generator[np.ndarray, None, None]:
+    """Yield frames loaded ahead by a pool of threads, at most 2 *
+    n_workers frames are kept in memory."""
+    n_workers = max(int(n_workers), 1)
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        futures = deque()
+        next_index = 0
+        while next_index < len(file_paths) or len(futures) > 0:
+            while next_index < len(file_paths) and \
+                    len(futures) < 2 * n_workers:
+                futures.append(executor.submit(reader, file_paths[next_index]))
+                next_index += 1
+            yield futures.popleft().result()
+
+
 class SeqDataReader:
     """Load 'seq_data.json' files, which contain sequences composition
     information."""
 
-    def __init__(self, seq_data_path: PathLike) -> None:
+    def __init__(self,
+                 seq_data_path: PathLike,
+                 seq_data: Union[Dict, None] = None) -> None:
         """Load seq_data.json in SynBody dataset.
 
         Args:
             seq_data_path (PathLike): Files are named: 'seq_data.json'
+            seq_data (Union[Dict, None], optional): content of
+                seq_data_path, already loaded. Defaults to None,
+                load it from seq_data_path.
         """
-        with open(seq_data_path, 'r') as f:
-            seq_data = json.load(f)
+        if seq_data is None:
+            with open(seq_data_path, 'r') as f:
+                seq_data = json.load(f)
         self._seq_data: Dict = seq_data
         self._actors_data: Dict = seq_data['Actors']['CharacterActors']
         self._actors = None
@@ -415,3 +802,135 @@ class SeqDataReader:
             List[str]: filenames of actors' smplx annotations.
         """
         return [value['smplx'] for value in self.get_actors()]
+
+
+def build_synbody_index(dataset_dir: PathLike,
+                        index_path: Union[PathLike, None] = None,
+                        n_workers: int = 8) -> List[Dict[str, Any]]:
+    """Index all sequences of a SynBody dataset, i.e. every folder with a
+    'seq_data.json' under dataset_dir. Sequences are indexed by a pool of
+    threads, and the index can be saved as a JSON lines file, one sequence
+    per line. Use SynbodyReader.from_index_entry() to open a sequence from
+    the index without rescanning its folders.
+
+    Args:
+        dataset_dir (PathLike): the dataset directory.
+        index_path (Union[PathLike, None], optional): path to the JSON lines
+            file to write. Defaults to None, do not save.
+        n_workers (int, optional): number of indexing threads.
+            Defaults to 8.
+
+    Returns:
+        List[Dict[str, Any]]: entries of sequences sorted by sequence_dir.
+            Keys included:
+                - sequence_dir (str): posix path relative to dataset_dir
+                - modal_files (Dict[str, Dict]): file names in the folder
+                    of each data modal found. Frame files are kept as
+                    runs of frame numbers, e.g.
+                    {'frames': {'.jpeg': [[1, 101]]}, 'others': []}
+                    for '0001.jpeg' to '0100.jpeg'.
+                - n_frames (Dict[str, int]): number of frame files of
+                    each data modal except SMPLX
+                - actor_names (List[str]): names of actors
+                - camera (Dict[str, List]): K, R and T of the camera
+                    at resolution (1280, 720), see
+                    SeqDataReader.get_camera_KRT()
+                - seq_data (Dict): content of 'seq_data.json'
+    """
+    dataset_dir = Path(dataset_dir)
+    seq_data_paths = []
+    for root, _, file_names in os.walk(dataset_dir):
+        if 'seq_data.json' in file_names:
+            seq_data_paths.append(Path(root) / 'seq_data.json')
+    seq_data_paths.sort()
+
+    def index_sequence(seq_data_path: Path) -> Dict[str, Any]:
+        return _index_synbody_sequence(seq_data_path, dataset_dir)
+
+    with ThreadPoolExecutor(max_workers=max(int(n_workers), 1)) as executor:
+        index = list(executor.map(index_sequence, seq_data_paths))
+    if index_path is not None:
+        index_path = Path(index_path)
+        tmp_path = index_path.with_name(f'{index_path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f_write:
+            for entry in index:
+                f_write.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        os.replace(tmp_path, index_path)
+    return index
+
+
+def load_synbody_index(index_path: PathLike) -> List[Dict[str, Any]]:
+    """Load the index of a SynBody dataset saved by build_synbody_index().
+
+    Args:
+        index_path (PathLike): path to the JSON lines file.
+
+    Returns:
+        List[Dict[str, Any]]: entries of sequences,
+            see build_synbody_index().
+    """
+    with open(index_path, 'r') as f_read:
+        return [json.loads(line) for line in f_read if line.strip()]
+
+
+def _index_synbody_sequence(seq_data_path: Path,
+                            dataset_dir: Path) -> Dict[str, Any]:
+    """Index one sequence by listing folders of its data modals once."""
+    with open(seq_data_path, 'r') as f_read:
+        seq_data = json.load(f_read)
+    seq_data_reader = SeqDataReader(seq_data_path, seq_data=seq_data)
+    sequence_dir = seq_data_path.parent
+    modal_files = {}
+    n_frames = {}
+    for modal in (SynbodyReader.RGB, SynbodyReader.MASK, SynbodyReader.DEPTH,
+                  SynbodyReader.OPTICAL_FLOW, SynbodyReader.NORMAL,
+                  SynbodyReader.SMPLX):
+        folder = sequence_dir / modal
+        if not folder.is_dir():
+            continue
+        modal_files[modal] = _encode_file_names(os.listdir(folder))
+        if modal != SynbodyReader.SMPLX:
+            n_frames[modal] = sum(
+                end - start for runs in modal_files[modal]['frames'].values()
+                for start, end in runs)
+    K, R, T = seq_data_reader.get_camera_KRT()
+    return dict(
+        sequence_dir=sequence_dir.relative_to(dataset_dir).as_posix(),
+        modal_files=modal_files,
+        n_frames=n_frames,
+        actor_names=seq_data_reader.get_actor_names(),
+        camera=dict(K=K.tolist(), R=R.tolist(), T=T.tolist()),
+        seq_data=seq_data)
+
+
+def _encode_file_names(file_names: List[str]) -> Dict[str, Any]:
+    """Encode names of frame files like '0001.jpeg' as runs [start, end) of
+    frame numbers of each suffix, and keep other names as they are."""
+    frames = {}
+    others = []
+    for file_name in file_names:
+        stem, suffix = os.path.splitext(file_name)
+        if stem.isdigit() and f'{int(stem):04d}' == stem:
+            frames.setdefault(suffix, []).append(int(stem))
+        else:
+            others.append(file_name)
+    frame_runs = {}
+    for suffix, frame_list in sorted(frames.items()):
+        runs = []
+        for frame in sorted(frame_list):
+            if len(runs) > 0 and runs[-1][1] == frame:
+                runs[-1][1] = frame + 1
+            else:
+                runs.append([frame, frame + 1])
+        frame_runs[suffix] = runs
+    return dict(frames=frame_runs, others=sorted(others))
+
+
+def _decode_file_names(encoded_names: Dict[str, Any]) -> Set[str]:
+    """Decode file names encoded by _encode_file_names()."""
+    file_names = set(encoded_names['others'])
+    for suffix, runs in encoded_names['frames'].items():
+        for start, end in runs:
+            file_names.update(f'{frame:04d}{suffix}'
+                              for frame in range(start, end))
+    return file_names
@@ -1,11 +1,15 @@
 # yapf: disable
 import logging
+import math
 import os
-from typing import Union
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Generator, Iterable, Union
 
 import numpy as np
 
-from .ffmpeg_utils import VideoInfoReader
+from .ffmpeg_utils import VideoInfoReader, VideoWriter
+from .image_writer_utils import ImageWriter
 from .log_utils import get_logger
 from .path_utils import Existence, check_path_existence, check_path_suffix
 
@@ -205,3 +209,173 @@ def check_output_path(output_path: str, overwrite: bool,
         raise FileExistsError
     if not check_path_suffix(output_path, '.mp4'):
         os.makedirs(output_path, exist_ok=True)
+
+
+def render_frames_in_order(
+    render_func: Callable[..., np.ndarray],
+    get_chunk_kwargs: Callable[[int, int], dict],
+    data_len: int,
+    n_workers: int,
+    chunk_size: Union[int, None] = None,
+) -> Generator[np.ndarray, None, None]:
+    """Render frame chunks in a process pool, and yield the frames in order.
+    Every worker receives its own pickled copy of the arguments, so mutable
+    objects like palettes are never shared between workers.
+
+    Args:
+        render_func (Callable[..., np.ndarray]):
+            A picklable(module-level) function, which renders
+            a chunk of frames and returns them in shape
+            [n_chunk_frame, h, w, 3].
+        get_chunk_kwargs (Callable[[int, int], dict]):
+            A function mapping (chunk_start, chunk_end) to
+            kwargs of render_func. Called in the main process.
+        data_len (int):
+            Number of frames in total.
+        n_workers (int):
+            Number of worker processes.
+        chunk_size (Union[int, None], optional):
+            Number of frames in a chunk. Defaults to None,
+            splitting frames into about 4 chunks per worker,
+            at most 32 frames in a chunk.
+
+    Yields:
+        np.ndarray: A rendered frame in shape [h, w, 3].
+    """
+    n_workers = max(int(n_workers), 1)
+    if chunk_size is None:
+        chunk_size = min(math.ceil(data_len / (n_workers * 4)), 32)
+    chunk_size = max(int(chunk_size), 1)
+    pending_futures = deque()
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        for chunk_start in range(0, data_len, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, data_len)
+            pending_futures.append(
+                executor.submit(render_func,
+                                **get_chunk_kwargs(chunk_start, chunk_end)))
+            # bound the number of rendered but not consumed chunks
+            if len(pending_futures) >= 2 * n_workers:
+                yield from pending_futures.popleft().result()
+        while len(pending_futures) > 0:
+            yield from pending_futures.popleft().result()
+
+
+def write_frames(
+    sframe_iter: Iterable[np.ndarray],
+    output_path: str,
+    data_len: int,
+    fps: Union[float, None] = None,
+    img_format: Union[str, None] = None,
+    logger: Union[None, str, logging.Logger] = None
+) -> Generator[np.ndarray, None, None]:
+    """Write frames to a video or an image directory, and yield each frame
+    after it has been submitted to the writer. Writers are closed when the
+    generator is exhausted or closed.
+
+    Args:
+        sframe_iter (Iterable[np.ndarray]):
+            Frames in shape [h, w, 3].
+        output_path (str):
+            Path to the output mp4 video file or image directory.
+        data_len (int):
+            Number of frames in total.
+        fps (Union[float, None], optional):
+            Frames per second for the output video.
+            Defaults to None, 30 fps when writing a video.
+        img_format (Union[str, None], optional):
+            Name format for the output image file.
+            Defaults to None, `%06d.png` when writing images.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Yields:
+        np.ndarray: A frame in shape [h, w, 3].
+    """
+    logger = get_logger(logger)
+    write_video = check_path_suffix(output_path, '.mp4')
+    fps = fps if fps is not None else 30.0
+    img_format = img_format if img_format is not None else '%06d.png'
+    video_writer = None
+    image_writer = None
+    try:
+        for frame_idx, sframe in enumerate(sframe_iter):
+            if write_video:
+                video_writer = video_writer \
+                    if video_writer is not None \
+                    else VideoWriter(
+                        output_path=output_path,
+                        resolution=sframe.shape[:2],
+                        fps=fps,
+                        n_frames=data_len,
+                        disable_log=False,
+                        logger=logger
+                    )
+                video_writer.write(sframe)
+            else:
+                image_writer = image_writer \
+                    if image_writer is not None \
+                    else ImageWriter(logger=logger)
+                image_writer.write(
+                    img_path=os.path.join(output_path,
+                                          f'{img_format}' % frame_idx),
+                    img=sframe)
+            yield sframe
+    finally:
+        if video_writer is not None:
+            video_writer.close()
+        if image_writer is not None:
+            image_writer.close()
+
+
+def collect_frames(
+    sframe_iter: Iterable[np.ndarray],
+    data_len: int,
+    return_array: bool = False,
+    array_buffer: Union[np.ndarray, None] = None,
+    logger: Union[None, str,
+                  logging.Logger] = None) -> Union[np.ndarray, None]:
+    """Consume frames, and fill them into a preallocated array or
+    array_buffer.
+
+    Args:
+        sframe_iter (Iterable[np.ndarray]):
+            Frames in shape [h, w, 3].
+        data_len (int):
+            Number of frames in total.
+        return_array (bool, optional):
+            Whether to return the frames in an array, allocated
+            once when the first frame arrives.
+            Defaults to False.
+        array_buffer (Union[np.ndarray, None], optional):
+            An array, or a np.memmap, in shape [data_len, h, w, 3],
+            to be filled with the frames. If not None, it will
+            be returned. Defaults to None.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        ValueError: array_buffer does not match the frames.
+
+    Returns:
+        Union[np.ndarray, None]:
+            Frames in shape [data_len, h, w, 3], or None.
+    """
+    if not return_array and array_buffer is None:
+        for _ in sframe_iter:
+            pass
+        return None
+    for frame_idx, sframe in enumerate(sframe_iter):
+        if frame_idx == 0:
+            if array_buffer is None:
+                array_buffer = np.empty(
+                    shape=(data_len, *sframe.shape), dtype=sframe.dtype)
+            elif array_buffer.shape != (data_len, *sframe.shape):
+                logger = get_logger(logger)
+                logger.error(f'Shape of array_buffer {array_buffer.shape}' +
+                             ' does not match frames,' +
+                             f' expecting {(data_len, *sframe.shape)}.')
+                raise ValueError
+        array_buffer[frame_idx] = sframe
+    return array_buffer
@@ -1,5 +1,5 @@
 # yapf: disable
-from typing import Union
+from typing import Tuple, Union
 
 import numpy as np
 
@@ -88,6 +88,65 @@ def visualize_keypoints2d(
     if not plot_points and not plot_lines:
         logger.error('plot_points or plot_lines must be True.')
         raise ValueError
+    point_palette, mframe_point_data, mframe_point_mask, \
+        line_palette, mframe_line_data, mframe_line_mask = \
+        _get_keypoints_palettes(
+            keypoints=keypoints,
+            n_dim=2,
+            plot_points=plot_points,
+            plot_lines=plot_lines,
+            logger=logger)
+    ret_value = plot_video(
+        output_path=output_path,
+        overwrite=overwrite,
+        return_array=return_array,
+        mframe_point_data=mframe_point_data,
+        mframe_line_data=mframe_line_data,
+        mframe_point_mask=mframe_point_mask,
+        mframe_line_mask=mframe_line_mask,
+        point_palette=point_palette,
+        line_palette=line_palette,
+        background_arr=background_arr,
+        background_dir=background_dir,
+        background_video=background_video,
+        height=height,
+        width=width,
+        disable_tqdm=disable_tqdm,
+        logger=logger)
+    return ret_value
+
+
+def _get_keypoints_palettes(
+    keypoints: Keypoints, n_dim: int, plot_points: bool, plot_lines: bool,
+    logger: logging.Logger
+) -> Tuple[Union[PointPalette, None], Union[np.ndarray, None], Union[
+        np.ndarray, None], Union[LinePalette, None], Union[np.ndarray, None],
+           Union[np.ndarray, None]]:
+    """Get palettes and multi-frame data of keypoints. If n_person > 1, each
+    person has its own color, else each point and line has different color.
+
+    Args:
+        keypoints (Keypoints):
+            An instance of class Keypoints.
+        n_dim (int):
+            Number of location dimensions, 2 or 3.
+        plot_points (bool):
+            Whether to get point palette and data.
+        plot_lines (bool):
+            Whether to get line palette and data.
+        logger (logging.Logger):
+            Logger for logging.
+
+    Returns:
+        Tuple[Union[PointPalette, None], Union[np.ndarray, None],
+              Union[np.ndarray, None], Union[LinePalette, None],
+              Union[np.ndarray, None], Union[np.ndarray, None]]:
+            point_palette, mframe_point_data, mframe_point_mask,
+            line_palette, mframe_line_data and mframe_line_mask.
+            Point data are in shape [n_frame, n_person * n_kps, n_dim],
+            masks are in shape [n_frame, n_person * n_kps] and
+            [n_frame, n_person * n_line].
+    """
     n_frame = keypoints.get_frame_number()
     n_person = keypoints.get_person_number()
     n_kps = keypoints.get_keypoints_number()
@@ -97,7 +156,7 @@ def visualize_keypoints2d(
         mode='rgb',
         logger=logger)
     if plot_points:
-        point_template = keypoints.get_keypoints()[0, 0, ..., :2]
+        point_template = keypoints.get_keypoints()[0, 0, ..., :n_dim]
         point_palette_list = []
         # construct palette for each person
         for person_idx in range(n_person):
@@ -113,8 +172,8 @@ def visualize_keypoints2d(
                                                      logger)
         else:
             point_palette = point_palette_list[0]
-        mframe_point_data = keypoints.get_keypoints()[..., :2].reshape(
-            n_frame, n_person * n_kps, 2)
+        mframe_point_data = keypoints.get_keypoints()[..., :n_dim].reshape(
+            n_frame, n_person * n_kps, n_dim)
         mframe_point_mask = keypoints.get_mask().reshape(
             n_frame, n_person * n_kps)
         # if only one person,
@@ -129,7 +188,7 @@ def visualize_keypoints2d(
         mframe_point_mask = None
     if plot_lines:
         limbs = get_limbs_from_keypoints(keypoints=keypoints, )
-        point_template = keypoints.get_keypoints()[0, 0, ..., :2]
+        point_template = keypoints.get_keypoints()[0, 0, ..., :n_dim]
         conn = limbs.get_connections()
         conn_array = np.asarray(conn)
         n_line = len(conn)
@@ -148,8 +207,8 @@ def visualize_keypoints2d(
             line_palette = LinePalette.concatenate(line_palette_list, logger)
         else:
             line_palette = line_palette_list[0]
-        mframe_line_data = keypoints.get_keypoints()[..., :2].reshape(
-            n_frame, n_person * n_kps, 2)
+        mframe_line_data = keypoints.get_keypoints()[..., :n_dim].reshape(
+            n_frame, n_person * n_kps, n_dim)
         mframe_line_mask = np.ones(shape=(n_frame, n_person * n_line))
         point_mask = keypoints.get_mask()
         # if both two points of a line has mask 1
@@ -177,21 +236,5 @@ def visualize_keypoints2d(
         line_palette = None
         mframe_line_data = None
         mframe_line_mask = None
-    ret_value = plot_video(
-        output_path=output_path,
-        overwrite=overwrite,
-        return_array=return_array,
-        mframe_point_data=mframe_point_data,
-        mframe_line_data=mframe_line_data,
-        mframe_point_mask=mframe_point_mask,
-        mframe_line_mask=mframe_line_mask,
-        point_palette=point_palette,
-        line_palette=line_palette,
-        background_arr=background_arr,
-        background_dir=background_dir,
-        background_video=background_video,
-        height=height,
-        width=width,
-        disable_tqdm=disable_tqdm,
-        logger=logger)
-    return ret_value
+    return point_palette, mframe_point_data, mframe_point_mask, \
+        line_palette, mframe_line_data, mframe_line_mask
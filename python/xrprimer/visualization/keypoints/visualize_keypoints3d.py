@@ -1,5 +1,5 @@
 # yapf: disable
-from typing import Union
+from typing import List, Tuple, Union
 
 import numpy as np
 
@@ -15,16 +15,24 @@ from xrprimer.transform.convention.world import (
     WorldClass,
     convert_world,
 )
-from xrprimer.transform.limbs import get_limbs_from_keypoints
 from xrprimer.transform.point import Points3DRotation
 from xrprimer.utils.log_utils import get_logger, logging
 from ..matplotlib.plot_video import plot_video
-from ..palette import LinePalette, PointPalette, get_different_colors
+from ..opencv.plot_mview_video import plot_mview_video
+from ..palette import LinePalette
 from ..presets import create_coordinate_axis
-from .visualize_keypoints2d import visualize_keypoints2d
+from ..rasterizer.plot_video import plot_video as plot_video_rasterizer
+from .visualize_keypoints2d import (
+    _get_keypoints_palettes,
+    visualize_keypoints2d,
+)
 
 # yapf: enable
 
+# size of a default matplotlib figure, in inches
+_MPL_FIG_HEIGHT = 4.8
+_MPL_FIG_WIDTH = 6.4
+
 
 def visualize_keypoints3d_projected(
     # input args
@@ -143,6 +151,136 @@ def visualize_keypoints3d_projected(
     return ret_value
 
 
+def visualize_keypoints3d_projected_mview(
+    # input args
+    keypoints: Keypoints,
+    cameras: List[Union[PinholeCameraParameter, FisheyeCameraParameter]],
+    # output args
+    output_path: str,
+    overwrite: bool = True,
+    return_array: bool = False,
+    plot_points: bool = True,
+    plot_lines: bool = True,
+    # background args
+    background_dirs: Union[List[str], None] = None,
+    background_videos: Union[List[str], None] = None,
+    # mosaic args
+    n_cols: Union[int, None] = None,
+    tile_resolution: Union[Tuple[int, int], None] = None,
+    # parallel args
+    n_workers: int = 4,
+    # verbose args
+    disable_tqdm: bool = True,
+    logger: Union[None, str,
+                  logging.Logger] = None) -> Union[None, np.ndarray]:
+    """Visualize multi-frame keypoints3d projected to all cameras of a rig,
+    overlay with each view's 2D images, and tile all views into a grid
+    mosaic in a single video. Keypoints are projected to all views in one
+    batch, and backgrounds of all views are decoded in parallel. For plot
+    args, please either plot_points or plot_lines, or both. For background
+    args, please offer at most one of them.
+
+    Args:
+        keypoints (Keypoints):
+            An instance of class Keypoints. If n_person > 1,
+            each person has its own color, else each point
+            and line has different color.
+        cameras (List[Union[PinholeCameraParameter,
+                FisheyeCameraParameter]]):
+            Camera parameters of all views, in the same order as
+            background_dirs or background_videos.
+        output_path (str):
+            Path to the output mp4 video file or image directory.
+        overwrite (bool, optional):
+            Whether to overwrite the file at output_path.
+            Defaults to True.
+        return_array (bool, optional):
+            Whether to return the video array. If True,
+            please make sure your RAM is enough for the video.
+            Defaults to False, return None.
+        plot_points (bool, optional):
+            Whether to plot points according to keypoints'
+            location.
+            Defaults to True.
+        plot_lines (bool, optional):
+            Whether to plot lines according to keypoints'
+            limbs. Defaults to True.
+        background_dirs (Union[List[str], None], optional):
+            Paths to the image directories for background,
+            one for each camera. Defaults to None.
+        background_videos (Union[List[str], None], optional):
+            Paths to the videos for background,
+            one for each camera. Defaults to None.
+        n_cols (Union[int, None], optional):
+            Number of views in a row of the mosaic.
+            Defaults to None, ceil(sqrt(n_view)).
+        tile_resolution (Union[Tuple[int, int], None], optional):
+            Resolution (height, width) of each view in the mosaic.
+            Defaults to None, resolution of the first camera.
+        n_workers (int, optional):
+            Number of threads reading background images.
+            Defaults to 4.
+        disable_tqdm (bool, optional):
+            Whether to disable tqdm progress bar.
+            Defaults to True.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        ValueError: Neither plot_points nor plot_lines is True.
+
+    Returns:
+        Union[np.ndarray, None]:
+            Plotted multi-frame mosaic array or None.
+            If it's an array, its shape shall be
+            [n_frame, n_row * tile_height, n_col * tile_width, 3].
+    """
+    logger = get_logger(logger)
+    if not plot_points and not plot_lines:
+        logger.error('plot_points or plot_lines must be True.')
+        raise ValueError
+    n_view = len(cameras)
+    n_frame = keypoints.get_frame_number()
+    n_person = keypoints.get_person_number()
+    n_kps = keypoints.get_keypoints_number()
+    # project 3d keypoints to all views in one batch
+    projector = OpencvProjector(camera_parameters=cameras, logger=logger)
+    mview_kps2d = projector.project(
+        points=keypoints.get_keypoints()[..., :3].reshape(
+            n_frame * n_person * n_kps, 3),
+        points_mask=keypoints.get_mask().reshape(n_frame * n_person * n_kps,
+                                                 1))
+    mview_kps2d = mview_kps2d.reshape(n_view, n_frame, n_person * n_kps, 2)
+    point_palette, _, mframe_point_mask, \
+        line_palette, _, mframe_line_mask = \
+        _get_keypoints_palettes(
+            keypoints=keypoints,
+            n_dim=2,
+            plot_points=plot_points,
+            plot_lines=plot_lines,
+            logger=logger)
+    ret_value = plot_mview_video(
+        output_path=output_path,
+        overwrite=overwrite,
+        return_array=return_array,
+        mview_point_data=mview_kps2d if plot_points else None,
+        mview_line_data=mview_kps2d if plot_lines else None,
+        mview_point_mask=mframe_point_mask,
+        mview_line_mask=mframe_line_mask,
+        point_palette=point_palette,
+        line_palette=line_palette,
+        background_dirs=background_dirs,
+        background_videos=background_videos,
+        view_resolutions=[(camera.height, camera.width) for camera in cameras],
+        n_cols=n_cols,
+        tile_resolution=tile_resolution,
+        n_workers=n_workers,
+        disable_tqdm=disable_tqdm,
+        logger=logger)
+    return ret_value
+
+
 def visualize_keypoints3d(
     # input args
     keypoints: Keypoints,
@@ -156,6 +294,7 @@ def visualize_keypoints3d(
     plot_points: bool = True,
     plot_lines: bool = True,
     dpi: float = 180,
+    backend: str = 'matplotlib',
     # verbose args
     disable_tqdm: bool = True,
     logger: Union[None, str,
@@ -194,6 +333,12 @@ def visualize_keypoints3d(
             limbs. Defaults to True.
         dpi (float, optional):
             Dots per inch. Defaults to 180.
+        backend (str, optional):
+            Backend for plotting, `matplotlib` or `rasterizer`.
+            The rasterizer backend projects data by virtual
+            pinhole cameras and draws with opencv, which is much
+            faster and plots the same view at the same resolution.
+            Defaults to `matplotlib`.
         disable_tqdm (bool, optional):
             Whether to disable tqdm progress bar.
             Defaults to True.
@@ -203,6 +348,7 @@ def visualize_keypoints3d(
 
     Raises:
         ValueError: Neither plot_points nor plot_lines is True.
+        ValueError: backend is not supported.
 
     Returns:
         Union[np.ndarray, None]:
@@ -214,95 +360,19 @@ def visualize_keypoints3d(
     if not plot_points and not plot_lines:
         logger.error('plot_points or plot_lines must be True.')
         raise ValueError
+    if backend not in ('matplotlib', 'rasterizer'):
+        logger.error('backend should be matplotlib or rasterizer,' +
+                     f' but got {backend}.')
+        raise ValueError
     n_frame = keypoints.get_frame_number()
-    n_person = keypoints.get_person_number()
-    n_kps = keypoints.get_keypoints_number()
-    mperson_colors = get_different_colors(
-        number_of_colors=n_person,
-        enable_random=False,
-        mode='rgb',
-        logger=logger)
-    if plot_points:
-        point_template = keypoints.get_keypoints()[0, 0, ..., :3]
-        point_palette_list = []
-        # construct palette for each person
-        for person_idx in range(n_person):
-            point_palette = PointPalette(
-                point_array=point_template,
-                name=f'point_palette_{person_idx}',
-                color_array=mperson_colors[person_idx],
-                logger=logger)
-            point_palette_list.append(point_palette)
-        # concat mperson's palette into one
-        if len(point_palette_list) > 1:
-            point_palette = PointPalette.concatenate(point_palette_list,
-                                                     logger)
-        else:
-            point_palette = point_palette_list[0]
-        mframe_point_data = keypoints.get_keypoints()[..., :3].reshape(
-            n_frame, n_person * n_kps, 3)
-        mframe_point_mask = keypoints.get_mask().reshape(
-            n_frame, n_person * n_kps)
-        # if only one person,
-        # use different colors for different points
-        if n_person == 1:
-            point_colors = get_different_colors(
-                number_of_colors=n_kps, mode='rgb', logger=logger)
-            point_palette.set_color_array(point_colors)
-    else:
-        point_palette = None
-        mframe_point_data = None
-        mframe_point_mask = None
-    if plot_lines:
-        limbs = get_limbs_from_keypoints(keypoints=keypoints, )
-        point_template = keypoints.get_keypoints()[0, 0, ..., :3]
-        conn = limbs.get_connections()
-        conn_array = np.asarray(conn)
-        n_line = len(conn)
-        line_palette_list = []
-        # construct palette for each person
-        for person_idx in range(n_person):
-            line_palette = LinePalette(
-                conn_array=conn_array,
-                point_array=point_template,
-                name=f'line_palette_{person_idx}',
-                color_array=mperson_colors[person_idx],
-                logger=logger)
-            line_palette_list.append(line_palette)
-        # concat mperson's palette into one
-        if len(line_palette_list) > 1:
-            line_palette = LinePalette.concatenate(line_palette_list, logger)
-        else:
-            line_palette = line_palette_list[0]
-        mframe_line_data = keypoints.get_keypoints()[..., :3].reshape(
-            n_frame, n_person * n_kps, 3)
-        mframe_line_mask = np.ones(shape=(n_frame, n_person * n_line))
-        point_mask = keypoints.get_mask()
-        # if both two points of a line has mask 1
-        # the line gets mask 1
-        for frame_idx in range(n_frame):
-            for person_idx in range(n_person):
-                for conn_idx, point_idxs in enumerate(conn):
-                    valid_flag = 1
-                    for point_idx in point_idxs:
-                        valid_flag *= point_mask[frame_idx, person_idx,
-                                                 point_idx]
-                    if valid_flag > 0:
-                        mframe_line_mask[frame_idx,
-                                         person_idx * n_line + conn_idx] = 1
-                    else:
-                        mframe_line_mask[frame_idx,
-                                         person_idx * n_line + conn_idx] = 0
-        # if only one person,
-        # use different colors for different parts
-        if n_person == 1:
-            conn_colors = get_different_colors(
-                number_of_colors=n_line, mode='rgb', logger=logger)
-            line_palette.set_color_array(conn_colors)
-    else:
-        line_palette = None
-        mframe_line_data = None
-        mframe_line_mask = None
+    point_palette, mframe_point_data, mframe_point_mask, \
+        line_palette, mframe_line_data, mframe_line_mask = \
+        _get_keypoints_palettes(
+            keypoints=keypoints,
+            n_dim=3,
+            plot_points=plot_points,
+            plot_lines=plot_lines,
+            logger=logger)
     # create an identity axis at the origin
     # of the world coordinate
     if plot_axis:
@@ -344,7 +414,7 @@ def visualize_keypoints3d(
     mframe_line_data = None \
         if mframe_line_data is None \
         else rotation(mframe_line_data)
-    ret_value = plot_video(
+    plot_kwargs = dict(
         output_path=output_path,
         overwrite=overwrite,
         return_array=return_array,
@@ -354,7 +424,17 @@ def visualize_keypoints3d(
         mframe_line_mask=mframe_line_mask,
         point_palette=point_palette,
         line_palette=line_palette,
-        dpi=dpi,
         disable_tqdm=disable_tqdm,
         logger=logger)
+    if backend == 'matplotlib':
+        ret_value = plot_video(dpi=dpi, **plot_kwargs)
+    else:
+        # same resolution and sizes as a default matplotlib figure,
+        # whose sizes are in points(1/72 inch)
+        ret_value = plot_video_rasterizer(
+            height=int(round(_MPL_FIG_HEIGHT * dpi / 2)) * 2,
+            width=int(round(_MPL_FIG_WIDTH * dpi / 2)) * 2,
+            linewidth=2.0 * dpi / 72,
+            markersize=5.0 * dpi / 72,
+            **plot_kwargs)
     return ret_value
@@ -1,4 +1,4 @@
-from .plot_frame import plot_frame
+from .plot_frame import MatplotlibRenderer, plot_frame
 from .plot_video import plot_video
 
-__all__ = ['plot_frame', 'plot_video']
+__all__ = ['MatplotlibRenderer', 'plot_frame', 'plot_video']
@@ -1,4 +1,3 @@
-import io
 from typing import Union
 
 import cv2
@@ -9,8 +8,9 @@ from xrprimer.visualization.palette.line_palette import LinePalette
 from xrprimer.visualization.palette.point_palette import PointPalette
 
 try:
-    from matplotlib import pyplot as plt
-    from mpl_toolkits.mplot3d import Axes3D
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
     has_matplotlib = True
     import_exception = ''
 except (ImportError, ModuleNotFoundError):
@@ -32,6 +32,7 @@ def plot_frame(point_palette: Union[PointPalette, None] = None,
                linewidth: float = 2.0,
                markersize: float = 5.0,
                dpi: float = 180.0,
+               renderer: Union['MatplotlibRenderer', None] = None,
                logger: Union[None, str, logging.Logger] = None) -> np.ndarray:
     """Plot 1-frame 3D points and/or lines, with matplotlib.
 
@@ -65,7 +66,12 @@ def plot_frame(point_palette: Union[PointPalette, None] = None,
             Defaults to 5.0.
         dpi (float, optional):
             Resolution of the figure in dots-per-inch as a float.
+            Ignored when renderer is not None.
             Defaults to 180.0.
+        renderer (Union[MatplotlibRenderer, None], optional):
+            A persistent renderer, reused across frames to
+            save the cost of creating figures.
+            Defaults to None, create a renderer for this frame.
         logger (Union[None, str, logging.Logger], optional):
             Logger for logging. If None, root logger will be selected.
             Defaults to None.
@@ -106,87 +112,179 @@ def plot_frame(point_palette: Union[PointPalette, None] = None,
                 points3d = np.concatenate((points3d, valid_points), axis=0)
         visual_range = _get_visual_range(
             points_array=points3d, scale=1.1, logger=logger)
-    # create fig
-    fig = plt.figure()
-    ax = Axes3D(fig, auto_add_to_figure=False)
-    fig.add_axes(ax)
-    ax.set_xlim(*visual_range[0])
-    ax.set_ylim(*visual_range[1])
-    ax.set_zlim(*visual_range[2])
-    ax.view_init(cam_latitude, cam_longtitude)
-    # draw lines on canvas
-    if line_palette is not None:
-        color_array = line_palette.color_array.astype(np.float32) / 255.0
-        for line_idx in range(len(line_palette)):
-            conn_mask = line_palette.conn_mask[line_idx]
-            if conn_mask == 0:
-                continue
-            conn = line_palette.conn_array[line_idx]
-            two_points = line_palette.point_array[conn, :]
-            color = color_array[line_idx]
-            ax.plot([two_points[0, 0], two_points[1, 0]],
-                    [two_points[0, 1], two_points[1, 1]],
-                    [two_points[0, 2], two_points[1, 2]],
-                    color=color,
-                    linewidth=linewidth)
-    # draw points on canvas
-    if point_palette is not None:
-        color_array = point_palette.color_array.astype(np.float32) / 255.0
-        for point_idx in range(len(point_palette)):
-            point_mask = point_palette.point_mask[point_idx]
-            if point_mask == 0:
-                continue
-            point_loc = point_palette.point_array[point_idx, :]
-            color = color_array[point_idx]
-            ax.plot([
-                point_loc[0],
-            ], [
-                point_loc[1],
-            ], [
-                point_loc[2],
-            ],
-                    marker='o',
-                    markersize=markersize,
-                    color=color)
-    img_arr = _get_cv2mat_from_matplotlib(fig=fig, dpi=dpi)
-    plt.close()
+    if renderer is None:
+        frame_renderer = MatplotlibRenderer(dpi=dpi, logger=logger)
+    else:
+        frame_renderer = renderer
+    img_arr = frame_renderer.render(
+        point_palette=point_palette,
+        line_palette=line_palette,
+        visual_range=visual_range,
+        cam_latitude=cam_latitude,
+        cam_longtitude=cam_longtitude,
+        linewidth=linewidth,
+        markersize=markersize)
+    if renderer is None:
+        frame_renderer.close()
     return img_arr
 
 
+class MatplotlibRenderer:
+    """A persistent renderer for 3D points and lines. It keeps one figure
+    and 3D axes, updates artists' data and the view angles per frame, and
+    reads pixels from the Agg canvas buffer directly.
+
+    It does not touch pyplot's global state, so it is safe to create one
+    renderer per thread or process.
+    """
+
+    def __init__(self,
+                 dpi: float = 180.0,
+                 logger: Union[None, str, logging.Logger] = None) -> None:
+        """
+        Args:
+            dpi (float, optional):
+                Resolution of the figure in dots-per-inch as a float.
+                Defaults to 180.0.
+            logger (Union[None, str, logging.Logger], optional):
+                Logger for logging. If None, root logger will be selected.
+                Defaults to None.
+
+        Raises:
+            ImportError: matplotlib has not been installed.
+        """
+        self.logger = get_logger(logger)
+        if not has_matplotlib:
+            self.logger.error(import_exception)
+            raise ImportError
+        self.fig = Figure(dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_axes((0, 0, 1, 1), projection='3d')
+        self.line_collection = Line3DCollection([])
+        self.ax.add_collection(self.line_collection)
+        self.scatter = None
+
+    def render(self,
+               point_palette: Union[PointPalette, None],
+               line_palette: Union[LinePalette, None],
+               visual_range: np.ndarray,
+               cam_latitude: float = 10.0,
+               cam_longtitude: float = 45.0,
+               linewidth: float = 2.0,
+               markersize: float = 5.0) -> np.ndarray:
+        """Render one frame.
+
+        Args:
+            point_palette (Union[PointPalette, None]):
+                An instance of PointPalette, or None.
+            line_palette (Union[LinePalette, None]):
+                An instance of LinePalette, or None.
+            visual_range (np.ndarray):
+                Visible range array whose shape is [3, 2].
+            cam_latitude (float, optional):
+                Camera latitude. Defaults to 10.0.
+            cam_longtitude (float, optional):
+                Camera longtitude. Defaults to 45.0.
+            linewidth (float, optional):
+                Linewidth for lines. Defaults to 2.0.
+            markersize (float, optional):
+                Markersize for points. Defaults to 5.0.
+
+        Returns:
+            np.ndarray: The plotted image array, in shape [h, w, 3].
+        """
+        ax = self.ax
+        ax.set_xlim(*visual_range[0])
+        ax.set_ylim(*visual_range[1])
+        ax.set_zlim(*visual_range[2])
+        ax.view_init(cam_latitude, cam_longtitude)
+        # update lines
+        segments = np.zeros(shape=(0, 2, 3))
+        line_colors = np.zeros(shape=(0, 3))
+        if line_palette is not None:
+            valid_idxs = np.where(line_palette.conn_mask != 0)[0]
+            segments = line_palette.point_array[
+                line_palette.conn_array[valid_idxs]][..., :3]
+            line_colors = line_palette.color_array[valid_idxs].astype(
+                np.float32) / 255.0
+        self.line_collection.set_segments(segments)
+        self.line_collection.set_color(line_colors)
+        self.line_collection.set_linewidth(linewidth)
+        # update points, drawn above lines as ax.plot() did
+        if self.scatter is not None:
+            self.scatter.remove()
+            self.scatter = None
+        if point_palette is not None:
+            valid_idxs = np.where(point_palette.point_mask != 0)[0]
+            points = point_palette.point_array[valid_idxs]
+            point_colors = point_palette.color_array[valid_idxs].astype(
+                np.float32) / 255.0
+            self.scatter = ax.scatter(
+                points[:, 0],
+                points[:, 1],
+                points[:, 2],
+                s=markersize**2,
+                c=point_colors,
+                marker='o',
+                linewidths=1.0,
+                depthshade=False,
+                zorder=3)
+        self.canvas.draw()
+        # buffer_rgba() is a view of the canvas, converted in one copy
+        rgba_arr = np.asarray(self.canvas.buffer_rgba())
+        img_arr = cv2.cvtColor(rgba_arr, cv2.COLOR_RGBA2BGR)
+        return img_arr
+
+    def close(self) -> None:
+        """Release the figure."""
+        self.fig.clear()
+
+
 def _get_visual_range(
         points_array: np.ndarray,
         scale: float,
+        percentile: float = 0.0,
         logger: Union[None, str, logging.Logger] = None) -> np.ndarray:
+    """Get a cubic visual range covering points_array. NaN in points_array
+    is ignored.
+
+    Args:
+        points_array (np.ndarray):
+            An array of points, in shape [..., n_dim].
+        scale (float):
+            Scale of the range against the bbox of points.
+        percentile (float, optional):
+            Percentile of points ignored at both ends of each
+            axis, in [0, 50). Set it > 0 to keep outliers from
+            enlarging the range and shrinking the view.
+            Defaults to 0.0, covering all points.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        ValueError: percentile is not in [0, 50).
+
+    Returns:
+        np.ndarray: Visual range in shape [n_dim, 2].
+    """
     logger = get_logger(logger)
     if scale < 1:
         logger.warning(
             'visual_range smaller than bbox will make some data unvisible.')
+    if percentile < 0 or percentile >= 50:
+        logger.error(f'percentile should be in [0, 50), but got {percentile}.')
+        raise ValueError
     n_dim = points_array.shape[-1]
     flat_array = points_array.reshape(-1, n_dim)
-    axis_stat = np.zeros(shape=[n_dim, 4])
-    for axis_idx in range(n_dim):
-        axis_data = flat_array[:, axis_idx]
-        axis_min = np.min(axis_data)
-        axis_max = np.max(axis_data)
-        axis_mid = (axis_min + axis_max) / 2.0
-        axis_span = axis_max - axis_min
-        axis_stat[axis_idx] = np.asarray(
-            (axis_min, axis_max, axis_mid, axis_span))
-    max_span = np.max(axis_stat[:, 3]) * scale
-    visual_range = np.zeros_like(axis_stat[:, :2])
-    for axis_idx in range(n_dim):
-        visual_range[axis_idx, 0] =\
-            axis_stat[axis_idx, 2] - max_span/2.0
-        visual_range[axis_idx, 1] =\
-            axis_stat[axis_idx, 2] + max_span/2.0
+    if percentile > 0:
+        axis_min, axis_max = np.nanpercentile(
+            flat_array, (percentile, 100 - percentile), axis=0)
+    else:
+        axis_min = np.nanmin(flat_array, axis=0)
+        axis_max = np.nanmax(flat_array, axis=0)
+    axis_mid = (axis_min + axis_max) / 2.0
+    max_span = np.max(axis_max - axis_min) * scale
+    visual_range = np.stack(
+        (axis_mid - max_span / 2.0, axis_mid + max_span / 2.0), axis=1)
     return visual_range
-
-
-def _get_cv2mat_from_matplotlib(fig, dpi=180) -> np.ndarray:
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', dpi=dpi)
-    buf.seek(0)
-    png_bytes = np.frombuffer(buf.getvalue(), dtype=np.uint8)
-    buf.close()
-    img_arr = cv2.imdecode(png_bytes, 1)
-    return img_arr
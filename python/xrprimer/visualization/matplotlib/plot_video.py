@@ -1,22 +1,23 @@
 # yapf: disable
-import os
-from typing import List, Tuple, Union
+from typing import Generator, List, Tuple, Union
 
-import cv2
 import numpy as np
 from tqdm import tqdm
 
-from xrprimer.utils.ffmpeg_utils import VideoWriter
 from xrprimer.utils.log_utils import get_logger, logging
 from xrprimer.utils.path_utils import check_path_suffix
 from xrprimer.utils.visualization_utils import (
     check_data_len,
     check_mframe_data_src,
     check_output_path,
+    collect_frames,
+    render_frames_in_order,
+    write_frames,
 )
 from ..palette.line_palette import LinePalette
+from ..palette.mframe_palette import MframeLinePalette, MframePointPalette
 from ..palette.point_palette import PointPalette
-from .plot_frame import _get_visual_range
+from .plot_frame import MatplotlibRenderer, _get_visual_range
 from .plot_frame import plot_frame as plot_frame_matplotlib
 
 # yapf: enable
@@ -27,11 +28,14 @@ def plot_video(
     output_path: str,
     overwrite: bool = True,
     return_array: bool = False,
+    array_buffer: Union[np.ndarray, None] = None,
+    return_generator: bool = False,
     # conditional output args
     fps: Union[float, None] = None,
     img_format: Union[str, None] = None,
     # plot args
     visual_range: Union[None, np.ndarray] = None,
+    visual_range_percentile: float = 0.0,
     mframe_point_data: Union[np.ndarray, None] = None,
     mframe_line_data: Union[np.ndarray, None] = None,
     mframe_point_mask: Union[np.ndarray, None] = None,
@@ -39,10 +43,12 @@ def plot_video(
     point_palette: Union[PointPalette, None] = None,
     line_palette: Union[LinePalette, None] = None,
     dpi: float = 180.0,
+    # parallel args
+    n_workers: int = 1,
     # verbose args
     disable_tqdm: bool = False,
-    logger: Union[None, str,
-                  logging.Logger] = None) -> Union[np.ndarray, None]:
+    logger: Union[None, str, logging.Logger] = None
+) -> Union[np.ndarray, Generator[np.ndarray, None, None], None]:
     """Plot a video(or a number of images) with matplotlib. For plot args,
     please offer either points or lines, or both.
 
@@ -56,6 +62,18 @@ def plot_video(
             Whether to return the video array. If True,
             please make sure your RAM is enough for the video.
             Defaults to False, return None.
+        array_buffer (Union[np.ndarray, None], optional):
+            A preallocated array, or a np.memmap for videos
+            larger than RAM, in shape [n_frame, height, width, 3].
+            If not None, plotted frames are written into it
+            and it is returned.
+            Defaults to None, allocate an array if return_array.
+        return_generator (bool, optional):
+            Whether to return a generator yielding the plotted
+            frames lazily. Frames are rendered and written to
+            output_path while the generator is consumed.
+            Cannot be used with return_array or array_buffer.
+            Defaults to False.
         fps (Union[float, None], optional):
             Frames per second for the output video.
             Defaults to None, 30 fps when writing a video.
@@ -66,6 +84,12 @@ def plot_video(
             Visible range array whose shape is [3, 2],
             ((x_min, x_max), (y_min, y_max), (z_min, z_max))
             Defaults to None, calculated from data whose mask==1.
+        visual_range_percentile (float, optional):
+            When visual_range is None, percentile of points
+            ignored at both ends of each axis, in [0, 50).
+            Set it > 0 to keep outlier frames from shrinking
+            the view.
+            Defaults to 0.0, covering all visible points.
         mframe_point_data (Union[np.ndarray, None], optional):
             Multi-frame point data,
             in shape [n_frame, n_point, 3].
@@ -94,6 +118,11 @@ def plot_video(
         dpi (float, optional):
             Resolution of the figure in dots-per-inch as a float.
             Defaults to 180.0.
+        n_workers (int, optional):
+            Number of processes rendering frames. If > 1,
+            frame chunks are rendered in a process pool, each worker
+            with its own palette copies, and written in order.
+            Defaults to 1, render in the current process.
         disable_tqdm (bool, optional):
             Whether to disable tqdm progress bar.
             Defaults to False.
@@ -119,109 +148,158 @@ def plot_video(
         mframe_line_data,
     ]
     data_len = check_data_len(data_list=data_to_check, logger=logger)
-    # init some var
-    video_writer = None
-    arr_to_return = None
+    if return_generator and \
+            (return_array or array_buffer is not None):
+        logger.error('Argument return_generator cannot be used' +
+                     ' with return_array or array_buffer.')
+        raise ValueError
     # check whether to write video or write images
     if check_path_suffix(output_path, '.mp4'):
-        write_video = True
-        write_img = not write_video
-        fps = fps if fps is not None else 30.0
         if img_format is not None:
             logger.warning('Argument img_format is useless when' +
                            ' writing a video. To suppress this warning,' +
                            ' do not pass it.')
     else:
-        write_video = False
-        write_img = not write_video
-        img_format = img_format \
-            if img_format is not None \
-            else '%06d.png'
         if fps is not None:
             logger.warning('Argument fps is useless when' +
                            ' writing image files. To suppress this warning,' +
                            ' do not pass it.')
+    # convert and validate multi-frame data only once
+    mframe_point_palette = MframePointPalette(
+        point_palette=point_palette,
+        mframe_point_array=mframe_point_data,
+        mframe_point_mask=mframe_point_mask,
+        logger=logger) if point_palette is not None else None
+    mframe_line_palette = MframeLinePalette(
+        line_palette=line_palette,
+        mframe_point_array=mframe_line_data,
+        mframe_conn_mask=mframe_line_mask,
+        logger=logger) if line_palette is not None else None
     # auto visual_range if None
     if visual_range is None:
-        points3d = None
-        if point_palette is not None:
-            if mframe_point_mask is not None:
-                n_frame, n_point = mframe_point_mask.shape
-                valid_idxs = np.where(mframe_point_mask.reshape(-1) == 1)
-                points3d = mframe_point_data.reshape(n_frame * n_point,
-                                                     -1)[valid_idxs[0], :]
-            else:
-                n_frame, n_point, _ = mframe_point_data.shape
-                points3d = mframe_point_data.reshape(n_frame * n_point, -1)
-        if line_palette is not None:
-            if mframe_line_mask is not None:
-                valid_idxs = np.where(mframe_line_mask == 1)
-            else:
-                n_line = len(line_palette.conn_mask)
-                n_frame = mframe_line_data.shape[0]
-                valid_idxs = (
-                    np.arange(n_frame).reshape(1,
-                                               -1).repeat(n_line,
-                                                          axis=0).reshape(-1),
-                    np.arange(n_line).reshape(-1,
-                                              1).repeat(n_frame,
-                                                        axis=1).reshape(-1),
-                )
-            for frame_idx, line_idx in zip(valid_idxs[0], valid_idxs[1]):
-                valid_point_idxs = line_palette.conn_array[line_idx, :]
-                valid_points = mframe_line_data[frame_idx, valid_point_idxs, :]
-                if points3d is None:
-                    points3d = valid_points
-                else:
-                    points3d = np.concatenate((points3d, valid_points), axis=0)
+        points3d = _get_mframe_points3d(
+            mframe_point_data=mframe_point_data
+            if point_palette is not None else None,
+            mframe_point_mask=mframe_point_mask,
+            mframe_line_data=mframe_line_data
+            if line_palette is not None else None,
+            mframe_line_mask=mframe_line_mask,
+            conn_array=line_palette.conn_array
+            if line_palette is not None else None)
         visual_range = _get_visual_range(
-            points_array=points3d, scale=1.1, logger=logger)
+            points_array=points3d,
+            scale=1.1,
+            percentile=visual_range_percentile,
+            logger=logger)
     lat_long_list = _get_camera_positions(n_frames=data_len)
-    # to save time for list file and sort
-    for frame_idx in tqdm(range(0, data_len), disable=disable_tqdm):
-        if point_palette is not None:
-            point_palette.set_point_array(mframe_point_data[frame_idx])
-            if mframe_point_mask is not None:
-                point_palette.set_point_mask(
-                    np.expand_dims(mframe_point_mask[frame_idx], -1))
-        if line_palette is not None:
-            line_palette.set_point_array(mframe_line_data[frame_idx])
-            if mframe_line_mask is not None:
-                line_palette.set_conn_mask(
-                    np.expand_dims(mframe_line_mask[frame_idx], -1))
-        result_sframe = plot_frame_matplotlib(
-            point_palette=point_palette,
-            line_palette=line_palette,
+
+    def get_chunk_kwargs(chunk_start: int, chunk_end: int) -> dict:
+        return dict(
+            mframe_point_palette=mframe_point_palette.slice_frames(
+                chunk_start, chunk_end)
+            if mframe_point_palette is not None else None,
+            mframe_line_palette=mframe_line_palette.slice_frames(
+                chunk_start, chunk_end)
+            if mframe_line_palette is not None else None,
             visual_range=visual_range,
-            cam_latitude=lat_long_list[frame_idx][0],
-            cam_longtitude=lat_long_list[frame_idx][1],
+            lat_long_list=lat_long_list[chunk_start:chunk_end],
             dpi=dpi,
             logger=logger)
-        if write_img:
-            cv2.imwrite(
-                filename=os.path.join(output_path,
-                                      f'{img_format}' % frame_idx),
-                img=result_sframe)
-        if write_video:
-            video_writer = video_writer \
-                if video_writer is not None \
-                else VideoWriter(
-                    output_path=output_path,
-                    resolution=result_sframe.shape[:2],
-                    fps=fps,
-                    n_frames=data_len,
-                    disable_log=False,
-                    logger=logger
-                )
-            video_writer.write(result_sframe)
-        if return_array:
-            unsqueezed_sframe = np.expand_dims(result_sframe, axis=0)
-            arr_to_return = unsqueezed_sframe \
-                if arr_to_return is None \
-                else np.concatenate((arr_to_return, unsqueezed_sframe), axis=0)
-    if video_writer is not None:
-        video_writer.close()
-    return arr_to_return if return_array else None
+
+    if n_workers > 1:
+        sframe_iter = render_frames_in_order(
+            render_func=_plot_frames_to_array,
+            get_chunk_kwargs=get_chunk_kwargs,
+            data_len=data_len,
+            n_workers=n_workers)
+    else:
+        sframe_iter = _plot_frames(**get_chunk_kwargs(0, data_len))
+    frame_iter = write_frames(
+        sframe_iter=tqdm(sframe_iter, total=data_len, disable=disable_tqdm),
+        output_path=output_path,
+        data_len=data_len,
+        fps=fps,
+        img_format=img_format,
+        logger=logger)
+    if return_generator:
+        return frame_iter
+    return collect_frames(
+        sframe_iter=frame_iter,
+        data_len=data_len,
+        return_array=return_array,
+        array_buffer=array_buffer,
+        logger=logger)
+
+
+def _get_mframe_points3d(mframe_point_data: Union[np.ndarray, None],
+                         mframe_point_mask: Union[np.ndarray, None],
+                         mframe_line_data: Union[np.ndarray, None],
+                         mframe_line_mask: Union[np.ndarray, None],
+                         conn_array: Union[np.ndarray, None]) -> np.ndarray:
+    """Gather all visible points of all frames in one pass.
+
+    Returns:
+        np.ndarray: Visible points in shape [n_visible_point, 3].
+    """
+    points_list = []
+    if mframe_point_data is not None:
+        n_dim = mframe_point_data.shape[-1]
+        if mframe_point_mask is not None:
+            points_list.append(mframe_point_data[mframe_point_mask == 1])
+        else:
+            points_list.append(mframe_point_data.reshape(-1, n_dim))
+    if mframe_line_data is not None:
+        n_dim = mframe_line_data.shape[-1]
+        # [n_frame, n_line, 2, n_dim]
+        line_ends = mframe_line_data[:, conn_array]
+        if mframe_line_mask is not None:
+            line_ends = line_ends[mframe_line_mask == 1]
+        points_list.append(line_ends.reshape(-1, n_dim))
+    return np.concatenate(points_list, axis=0)
+
+
+def _plot_frames(
+    mframe_point_palette: Union[MframePointPalette, None],
+    mframe_line_palette: Union[MframeLinePalette, None],
+    visual_range: np.ndarray,
+    lat_long_list: List[Tuple[float, float]],
+    dpi: float,
+    logger: Union[None, str, logging.Logger] = None
+) -> Generator[np.ndarray, None, None]:
+    """Plot a chunk of frames one by one. All the mframe args and
+    lat_long_list have been sliced to the chunk.
+
+    Yields:
+        np.ndarray: A plotted frame in shape [h, w, 3].
+    """
+    # one persistent renderer for all frames in the chunk
+    renderer = MatplotlibRenderer(dpi=dpi, logger=logger)
+    try:
+        for frame_idx in range(len(lat_long_list)):
+            # per-frame views, no conversion or validation
+            point_palette = mframe_point_palette.get_frame(frame_idx) \
+                if mframe_point_palette is not None else None
+            line_palette = mframe_line_palette.get_frame(frame_idx) \
+                if mframe_line_palette is not None else None
+            yield plot_frame_matplotlib(
+                point_palette=point_palette,
+                line_palette=line_palette,
+                visual_range=visual_range,
+                cam_latitude=lat_long_list[frame_idx][0],
+                cam_longtitude=lat_long_list[frame_idx][1],
+                renderer=renderer,
+                logger=logger)
+    finally:
+        renderer.close()
+
+
+def _plot_frames_to_array(**kwargs) -> np.ndarray:
+    """Plot a chunk of frames in a worker process.
+
+    Returns:
+        np.ndarray: Plotted frames in shape [n_frame, h, w, 3].
+    """
+    return np.stack(list(_plot_frames(**kwargs)), axis=0)
 
 
 def _get_camera_positions(
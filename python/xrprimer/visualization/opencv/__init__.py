@@ -1,4 +1,5 @@
 from .plot_frame import plot_frame
+from .plot_mview_video import plot_mview_video
 from .plot_video import plot_video
 
-__all__ = ['plot_frame', 'plot_video']
+__all__ = ['plot_frame', 'plot_mview_video', 'plot_video']
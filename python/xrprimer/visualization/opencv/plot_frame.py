@@ -3,7 +3,6 @@ from typing import Union, overload
 import cv2
 import numpy as np
 
-from xrprimer.transform.image.color import rgb2bgr
 from xrprimer.utils.log_utils import get_logger, logging
 from xrprimer.visualization.palette.line_palette import LinePalette
 from xrprimer.visualization.palette.point_palette import PointPalette
@@ -130,40 +129,66 @@ def plot_frame(point_palette: Union[PointPalette, None] = None,
             line_thickness = max(int(min(canvas.shape[:2]) / 300), 1)
         else:
             line_thickness = int(line_thickness)
-        color_array = rgb2bgr(line_palette.color_array.copy())
-        for line_idx in range(len(line_palette)):
-            conn_mask = line_palette.conn_mask[line_idx]
-            if conn_mask == 0:
-                continue
-            conn = line_palette.conn_array[line_idx]
-            points = np.around(
-                line_palette.point_array[conn, :], decimals=0).astype(np.int32)
-            color = color_array[line_idx]
-            cv2.line(
-                img=canvas,
-                pt1=points[0],
-                pt2=points[1],
-                color=color.tolist(),
-                thickness=line_thickness)
+        _draw_lines(
+            canvas=canvas,
+            point_array=line_palette.point_array,
+            conn_array=line_palette.conn_array,
+            conn_mask=line_palette.conn_mask,
+            color_array_bgr=line_palette.get_color_array_bgr(),
+            thickness=line_thickness)
     # draw points on canvas
     if point_palette is not None:
         if point_radius == 'auto':
             point_radius = max(int(min(canvas.shape[:2]) / 70), 1)
         else:
             point_radius = int(point_radius)
-        color_array = rgb2bgr(point_palette.color_array.copy())
-        for point_idx in range(len(point_palette)):
-            point_mask = point_palette.point_mask[point_idx]
-            if point_mask == 0:
-                continue
-            point_loc = np.around(
-                point_palette.point_array[point_idx, :],
-                decimals=0).astype(np.int32)
-            color = color_array[point_idx]
-            cv2.circle(
-                img=canvas,
-                center=point_loc[:2],
-                radius=point_radius,
-                color=color.tolist(),
-                thickness=-1)
+        _draw_points(
+            canvas=canvas,
+            point_array=point_palette.point_array,
+            point_mask=point_palette.point_mask,
+            color_array_bgr=point_palette.get_color_array_bgr(),
+            radius=point_radius)
     return canvas
+
+
+def _draw_lines(canvas: np.ndarray, point_array: np.ndarray,
+                conn_array: np.ndarray, conn_mask: np.ndarray,
+                color_array_bgr: np.ndarray, thickness: int) -> None:
+    """Draw visible lines on canvas in place. Points are rounded once, and
+    consecutive lines sharing a color are drawn by one cv2.polylines call,
+    which keeps the drawing order of cv2.line."""
+    visible_idxs = np.where(conn_mask != 0)[0]
+    if len(visible_idxs) == 0:
+        return
+    # round all points once, [n_visible_line, 2, 2]
+    points = np.around(
+        point_array[conn_array[visible_idxs]][..., :2],
+        decimals=0).astype(np.int32)
+    colors = color_array_bgr[visible_idxs]
+    # split visible lines into runs of the same color
+    color_changed = np.any(colors[1:] != colors[:-1], axis=1)
+    run_starts = np.concatenate(([0], np.where(color_changed)[0] + 1))
+    run_ends = np.concatenate((run_starts[1:], [len(visible_idxs)]))
+    for run_start, run_end in zip(run_starts.tolist(), run_ends.tolist()):
+        cv2.polylines(
+            img=canvas,
+            pts=list(points[run_start:run_end]),
+            isClosed=False,
+            color=colors[run_start].tolist(),
+            thickness=thickness)
+
+
+def _draw_points(canvas: np.ndarray, point_array: np.ndarray,
+                 point_mask: np.ndarray, color_array_bgr: np.ndarray,
+                 radius: int) -> None:
+    """Draw visible points on canvas in place. Points are rounded and colors
+    are converted to python lists once for all points."""
+    visible_idxs = np.where(point_mask != 0)[0]
+    if len(visible_idxs) == 0:
+        return
+    points = np.around(
+        point_array[visible_idxs, :2], decimals=0).astype(np.int32).tolist()
+    colors = color_array_bgr[visible_idxs].tolist()
+    for point, color in zip(points, colors):
+        cv2.circle(
+            img=canvas, center=point, radius=radius, color=color, thickness=-1)
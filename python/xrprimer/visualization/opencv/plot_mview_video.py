@@ -0,0 +1,436 @@
+import math
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generator, List, Tuple, Union
+
+import cv2
+import numpy as np
+from tqdm import tqdm
+
+from xrprimer.utils.ffmpeg_utils import MultiVideoReader, VideoInfoReader
+from xrprimer.utils.log_utils import get_logger, logging
+from xrprimer.utils.path_utils import check_path_suffix
+from xrprimer.utils.visualization_utils import (
+    check_data_len,
+    check_mframe_data_src,
+    check_output_path,
+    collect_frames,
+    write_frames,
+)
+from ..palette.line_palette import LinePalette
+from ..palette.point_palette import PointPalette
+from .plot_frame import _draw_lines, _draw_points
+
+
+def plot_mview_video(
+    # output args
+    output_path: str,
+    overwrite: bool = True,
+    return_array: bool = False,
+    array_buffer: Union[np.ndarray, None] = None,
+    return_generator: bool = False,
+    # conditional output args
+    fps: Union[float, None] = None,
+    img_format: Union[str, None] = None,
+    # plot args
+    mview_point_data: Union[np.ndarray, None] = None,
+    mview_line_data: Union[np.ndarray, None] = None,
+    mview_point_mask: Union[np.ndarray, None] = None,
+    mview_line_mask: Union[np.ndarray, None] = None,
+    point_palette: Union[PointPalette, None] = None,
+    line_palette: Union[LinePalette, None] = None,
+    line_thickness: Union[str, int] = 'auto',
+    point_radius: Union[str, int] = 'auto',
+    # background args
+    background_dirs: Union[List[str], None] = None,
+    background_videos: Union[List[str], None] = None,
+    view_resolutions: Union[List[Tuple[int, int]], None] = None,
+    # mosaic args
+    n_cols: Union[int, None] = None,
+    tile_resolution: Union[Tuple[int, int], None] = None,
+    # parallel args
+    n_workers: int = 4,
+    # verbose args
+    disable_tqdm: bool = False,
+    logger: Union[None, str, logging.Logger] = None
+) -> Union[np.ndarray, Generator[np.ndarray, None, None], None]:
+    """Plot multi-view 2D points and/or lines on their own backgrounds, tile
+    all views into a grid mosaic, and write a single video(or a number of
+    images). Backgrounds of all views are decoded in parallel. For plot args,
+    please offer either points or lines, or both. For background args, please
+    offer at most one of them.
+
+    Args:
+        output_path (str):
+            Path to the output mp4 video file or image directory.
+        overwrite (bool, optional):
+            Whether to overwrite the file at output_path.
+            Defaults to True.
+        return_array (bool, optional):
+            Whether to return the video array. If True,
+            please make sure your RAM is enough for the video.
+            Defaults to False, return None.
+        array_buffer (Union[np.ndarray, None], optional):
+            A preallocated array, or a np.memmap for videos
+            larger than RAM, in shape [n_frame, height, width, 3].
+            If not None, plotted frames are written into it
+            and it is returned.
+            Defaults to None, allocate an array if return_array.
+        return_generator (bool, optional):
+            Whether to return a generator yielding the plotted
+            frames lazily. Cannot be used with return_array
+            or array_buffer.
+            Defaults to False.
+        fps (Union[float, None], optional):
+            Frames per second for the output video.
+            Defaults to None, 30 fps when writing a video.
+        img_format (Union[str, None], optional):
+            Name format for the output image file.
+            Defaults to None, `%06d.png` when writing images.
+        mview_point_data (Union[np.ndarray, None], optional):
+            Multi-view multi-frame point data,
+            in shape [n_view, n_frame, n_point, 2].
+            Defaults to None.
+        mview_line_data (Union[np.ndarray, None], optional):
+            Multi-view multi-frame line data, locations for line
+            ends, in shape [n_view, n_frame, n_point, 2].
+            Defaults to None.
+        mview_point_mask (Union[np.ndarray, None], optional):
+            Visibility mask of point data, in shape
+            [n_view, n_frame, n_point], or [n_frame, n_point]
+            shared by all views.
+            Defaults to None, use point_palette.point_mask.
+        mview_line_mask (Union[np.ndarray, None], optional):
+            Visibility mask of line data, in shape
+            [n_view, n_frame, n_line], or [n_frame, n_line]
+            shared by all views.
+            Defaults to None, use line_palette.conn_mask.
+        point_palette (Union[PointPalette, None], optional):
+            An instance of PointPalette. Color and
+            visibility are kept by point_palette.
+            Defaults to None, do not plot points.
+        line_palette (Union[LinePalette, None], optional):
+            An instance of LinePalette. Connection,
+            color and
+            visibility are kept by point_palette.
+            Defaults to None, do not plot lines.
+        line_thickness (Union[str, int], optional):
+            Thickness of lines in pixel, in the mosaic tile.
+            Defaults to 'auto'.
+        point_radius (Union[str, int], optional):
+            Radius of point circles in pixel, in the mosaic tile.
+            Defaults to 'auto'.
+        background_dirs (Union[List[str], None], optional):
+            Paths to the image directories for background,
+            one for each view. Defaults to None.
+        background_videos (Union[List[str], None], optional):
+            Paths to the videos for background,
+            one for each view. Defaults to None.
+        view_resolutions (Union[List[Tuple[int, int]], None], optional):
+            Resolution (height, width) of the image space of
+            point and line data, one for each view, e.g. the
+            resolution of each camera. Data are scaled from it
+            to the mosaic tile.
+            Required if no background is offered.
+            Defaults to None, resolution of each background.
+        n_cols (Union[int, None], optional):
+            Number of views in a row of the mosaic.
+            Defaults to None, ceil(sqrt(n_view)).
+        tile_resolution (Union[Tuple[int, int], None], optional):
+            Resolution (height, width) of each view in the mosaic.
+            Odd numbers are rounded up to even ones for libx264.
+            Defaults to None, resolution of the first view.
+        n_workers (int, optional):
+            Number of threads reading background images.
+            Defaults to 4.
+        disable_tqdm (bool, optional):
+            Whether to disable tqdm progress bar.
+            Defaults to False.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        ValueError: Data of views do not match.
+        ValueError: Both background_dirs and background_videos
+            are passed.
+        ValueError: Number of backgrounds or view_resolutions
+            does not match n_view.
+        ValueError: Number of background images does not match
+            data, or background videos are shorter than data.
+        ValueError: view_resolutions is None without background.
+        ValueError: return_generator is used with return_array
+            or array_buffer.
+
+    Returns:
+        Union[np.ndarray, Generator[np.ndarray, None, None], None]:
+            Plotted mosaic image array in shape
+            [n_frame, n_row * tile_height, n_col * tile_width, 3],
+            a generator of mosaic frames, or None.
+    """
+    logger = get_logger(logger)
+    # check parent and whether to overwrite
+    check_output_path(
+        output_path=output_path, overwrite=overwrite, logger=logger)
+    # check if no fewer than one mframe data source
+    check_mframe_data_src(
+        mframe_point_data=mview_point_data,
+        mframe_line_data=mview_line_data,
+        logger=logger)
+    n_view_set = set([
+        len(data) for data in (mview_point_data, mview_line_data)
+        if data is not None
+    ])
+    if len(n_view_set) != 1:
+        logger.error('Number of views of mview_point_data and' +
+                     ' mview_line_data do not match.')
+        raise ValueError
+    n_view = n_view_set.pop()
+    data_len = check_data_len(
+        data_list=[
+            data[0] if data is not None else None
+            for data in (mview_point_data, mview_line_data)
+        ],
+        logger=logger)
+    if return_generator and \
+            (return_array or array_buffer is not None):
+        logger.error('Argument return_generator cannot be used' +
+                     ' with return_array or array_buffer.')
+        raise ValueError
+    # check whether to write video or write images
+    if check_path_suffix(output_path, '.mp4'):
+        if img_format is not None:
+            logger.warning('Argument img_format is useless when' +
+                           ' writing a video. To suppress this warning,' +
+                           ' do not pass it.')
+    else:
+        if fps is not None:
+            logger.warning('Argument fps is useless when' +
+                           ' writing image files. To suppress this warning,' +
+                           ' do not pass it.')
+    # check backgrounds and find the resolution of each view
+    if background_dirs is not None and background_videos is not None:
+        logger.error('Please pass at most one background source' +
+                     ' between background_dirs and background_videos.')
+        raise ValueError
+    mview_background_paths = None
+    src_dict = dict(
+        background_dirs=background_dirs,
+        background_videos=background_videos,
+        view_resolutions=view_resolutions)
+    for src_name, src_list in src_dict.items():
+        if src_list is not None and len(src_list) != n_view:
+            logger.error(f'Length of {src_name} should be {n_view},' +
+                         f' but got {len(src_list)}.')
+            raise ValueError
+    if background_dirs is not None:
+        mview_background_paths = []
+        for background_dir in background_dirs:
+            background_paths = [
+                os.path.join(background_dir, file_name)
+                for file_name in sorted(os.listdir(background_dir))
+            ]
+            if len(background_paths) != data_len:
+                logger.error(f'Number of images in {background_dir}' +
+                             f' should be {data_len},' +
+                             f' but got {len(background_paths)}.')
+                raise ValueError
+            mview_background_paths.append(background_paths)
+        if view_resolutions is None:
+            view_resolutions = [
+                cv2.imread(background_paths[0]).shape[:2]
+                for background_paths in mview_background_paths
+            ]
+    elif background_videos is not None:
+        video_resolutions = []
+        for background_video in background_videos:
+            video_info = VideoInfoReader(background_video, logger=logger)
+            if int(video_info['nb_frames']) < data_len:
+                logger.error(f'{background_video} is shorter than data,' +
+                             f' {video_info["nb_frames"]} < {data_len}.')
+                raise ValueError
+            video_resolutions.append(
+                (int(video_info['height']), int(video_info['width'])))
+        if view_resolutions is None:
+            view_resolutions = video_resolutions
+    elif view_resolutions is None:
+        logger.error('Please offer view_resolutions when there' +
+                     ' is no background.')
+        raise ValueError
+    # decide the mosaic layout
+    n_cols = int(n_cols) if n_cols is not None \
+        else int(math.ceil(math.sqrt(n_view)))
+    n_cols = min(max(n_cols, 1), n_view)
+    n_rows = int(math.ceil(n_view / n_cols))
+    if tile_resolution is None:
+        tile_resolution = view_resolutions[0]
+    tile_height = int(tile_resolution[0]) + int(tile_resolution[0]) % 2
+    tile_width = int(tile_resolution[1]) + int(tile_resolution[1]) % 2
+    # scale data from each view's image space to its tile, once for all
+    scale = np.array([(tile_width / float(resolution[1]),
+                       tile_height / float(resolution[0]))
+                      for resolution in view_resolutions])[:, None, None, :]
+    sframe_iter = _plot_mview_frames(
+        mview_point_data=mview_point_data[..., :2] *
+        scale if point_palette is not None else None,
+        mview_line_data=mview_line_data[..., :2] *
+        scale if line_palette is not None else None,
+        mview_point_mask=_get_mview_mask(
+            mview_point_mask, n_view,
+            point_palette.point_mask if point_palette is not None else None,
+            data_len),
+        mview_line_mask=_get_mview_mask(
+            mview_line_mask, n_view,
+            line_palette.conn_mask if line_palette is not None else None,
+            data_len),
+        point_palette=point_palette,
+        line_palette=line_palette,
+        line_thickness=line_thickness,
+        point_radius=point_radius,
+        mview_background_paths=mview_background_paths,
+        background_videos=background_videos,
+        data_len=data_len,
+        n_cols=n_cols,
+        n_rows=n_rows,
+        tile_height=tile_height,
+        tile_width=tile_width,
+        n_workers=n_workers,
+        logger=logger)
+    frame_iter = write_frames(
+        sframe_iter=tqdm(sframe_iter, total=data_len, disable=disable_tqdm),
+        output_path=output_path,
+        data_len=data_len,
+        fps=fps,
+        img_format=img_format,
+        logger=logger)
+    if return_generator:
+        return frame_iter
+    return collect_frames(
+        sframe_iter=frame_iter,
+        data_len=data_len,
+        return_array=return_array,
+        array_buffer=array_buffer,
+        logger=logger)
+
+
+def _plot_mview_frames(
+    mview_point_data: Union[np.ndarray, None],
+    mview_line_data: Union[np.ndarray, None],
+    mview_point_mask: Union[np.ndarray, None],
+    mview_line_mask: Union[np.ndarray, None],
+    point_palette: Union[PointPalette, None],
+    line_palette: Union[LinePalette, None],
+    line_thickness: Union[str, int],
+    point_radius: Union[str, int],
+    mview_background_paths: Union[List[List[str]], None],
+    background_videos: Union[List[str], None],
+    data_len: int,
+    n_cols: int,
+    n_rows: int,
+    tile_height: int,
+    tile_width: int,
+    n_workers: int,
+    logger: Union[None, str, logging.Logger] = None
+) -> Generator[np.ndarray, None, None]:
+    """Plot mosaic frames one by one. Data have been scaled to the tile
+    resolution, and palettes are only read, never modified.
+
+    Yields:
+        np.ndarray: A mosaic frame in shape
+            [n_rows * tile_height, n_cols * tile_width, 3].
+    """
+    n_view = len(mview_point_data) if mview_point_data is not None \
+        else len(mview_line_data)
+    line_thickness = max(int(min(tile_height, tile_width) / 300), 1) \
+        if line_thickness == 'auto' else int(line_thickness)
+    point_radius = max(int(min(tile_height, tile_width) / 70), 1) \
+        if point_radius == 'auto' else int(point_radius)
+    video_reader = None
+    executor = None
+    # per-view imread futures of the frames prefetched
+    pending_futures = deque()
+    if background_videos is not None:
+        # one decoding process and thread for each view
+        video_reader = MultiVideoReader(
+            input_paths=background_videos,
+            resolution=(tile_height, tile_width),
+            end=None,
+            disable_log=True,
+            logger=logger)
+    elif mview_background_paths is not None:
+        executor = ThreadPoolExecutor(max_workers=max(int(n_workers), 1))
+    try:
+        for frame_idx in range(data_len):
+            # decode backgrounds of all views
+            if video_reader is not None:
+                mview_background = video_reader.get_next_frame()
+            elif executor is not None:
+                # keep 2 frames of all views in flight
+                while len(pending_futures) < 2 and \
+                        frame_idx + len(pending_futures) < data_len:
+                    prefetch_idx = frame_idx + len(pending_futures)
+                    pending_futures.append([
+                        executor.submit(cv2.imread,
+                                        background_paths[prefetch_idx])
+                        for background_paths in mview_background_paths
+                    ])
+                mview_background = [
+                    future.result() for future in pending_futures.popleft()
+                ]
+            else:
+                mview_background = None
+            mosaic = np.zeros(
+                shape=(n_rows * tile_height, n_cols * tile_width, 3),
+                dtype=np.uint8)
+            for view_idx in range(n_view):
+                if mview_background is None:
+                    canvas = np.zeros(
+                        shape=(tile_height, tile_width, 3), dtype=np.uint8)
+                else:
+                    background = mview_background[view_idx]
+                    if background.shape[:2] != (tile_height, tile_width):
+                        canvas = cv2.resize(background,
+                                            (tile_width, tile_height))
+                    else:
+                        # decoded frames may be read-only
+                        canvas = background.copy()
+                if line_palette is not None:
+                    _draw_lines(
+                        canvas=canvas,
+                        point_array=mview_line_data[view_idx, frame_idx],
+                        conn_array=line_palette.conn_array,
+                        conn_mask=mview_line_mask[view_idx, frame_idx],
+                        color_array_bgr=line_palette.get_color_array_bgr(),
+                        thickness=line_thickness)
+                if point_palette is not None:
+                    _draw_points(
+                        canvas=canvas,
+                        point_array=mview_point_data[view_idx, frame_idx],
+                        point_mask=mview_point_mask[view_idx, frame_idx],
+                        color_array_bgr=point_palette.get_color_array_bgr(),
+                        radius=point_radius)
+                row_idx, col_idx = divmod(view_idx, n_cols)
+                mosaic[row_idx * tile_height:(row_idx + 1) * tile_height,
+                       col_idx * tile_width:(col_idx + 1) *
+                       tile_width] = canvas
+            yield mosaic
+    finally:
+        if video_reader is not None:
+            video_reader.close()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def _get_mview_mask(mask: Union[np.ndarray, None], n_view: int,
+                    palette_mask: Union[np.ndarray, None],
+                    data_len: int) -> Union[np.ndarray, None]:
+    """Broadcast a mask to [n_view, n_frame, n_elem] without copying."""
+    if palette_mask is None:
+        return None
+    if mask is None:
+        mask = palette_mask.reshape(1, 1, -1)
+    mask = np.asarray(mask)
+    if mask.ndim == 2:
+        mask = mask[None]
+    return np.broadcast_to(mask, (n_view, data_len, mask.shape[-1]))
@@ -1,19 +1,23 @@
 import os
-from typing import Union
+from typing import Generator, List, Union
 
 import cv2
 import numpy as np
 from tqdm import tqdm
 
-from xrprimer.utils.ffmpeg_utils import VideoReader, VideoWriter
+from xrprimer.utils.ffmpeg_utils import VideoReader
 from xrprimer.utils.log_utils import get_logger, logging
 from xrprimer.utils.path_utils import check_path_suffix
 from xrprimer.utils.visualization_utils import (
     check_data_len,
     check_mframe_data_src,
     check_output_path,
+    collect_frames,
+    render_frames_in_order,
+    write_frames,
 )
 from ..palette.line_palette import LinePalette
+from ..palette.mframe_palette import MframeLinePalette, MframePointPalette
 from ..palette.point_palette import PointPalette
 from .plot_frame import plot_frame as plot_frame_opencv
 
@@ -23,6 +27,8 @@ def plot_video(
     output_path: str,
     overwrite: bool = True,
     return_array: bool = False,
+    array_buffer: Union[np.ndarray, None] = None,
+    return_generator: bool = False,
     # conditional output args
     fps: Union[float, None] = None,
     img_format: Union[str, None] = None,
@@ -39,10 +45,12 @@ def plot_video(
     background_video: Union[np.ndarray, None] = None,
     height: Union[int, None] = None,
     width: Union[int, None] = None,
+    # parallel args
+    n_workers: int = 1,
     # verbose args
     disable_tqdm: bool = False,
-    logger: Union[None, str,
-                  logging.Logger] = None) -> Union[np.ndarray, None]:
+    logger: Union[None, str, logging.Logger] = None
+) -> Union[np.ndarray, Generator[np.ndarray, None, None], None]:
     """Plot a video(or a number of images) with opencv. For plot args, please
     offer either points or lines, or both. For background args, please offer
     only one of them.
@@ -57,6 +65,18 @@ def plot_video(
             Whether to return the video array. If True,
             please make sure your RAM is enough for the video.
             Defaults to False, return None.
+        array_buffer (Union[np.ndarray, None], optional):
+            A preallocated array, or a np.memmap for videos
+            larger than RAM, in shape [n_frame, height, width, 3].
+            If not None, plotted frames are written into it
+            and it is returned.
+            Defaults to None, allocate an array if return_array.
+        return_generator (bool, optional):
+            Whether to return a generator yielding the plotted
+            frames lazily. Frames are rendered and written to
+            output_path while the generator is consumed.
+            Cannot be used with return_array or array_buffer.
+            Defaults to False.
         fps (Union[float, None], optional):
             Frames per second for the output video.
             Defaults to None, 30 fps when writing a video.
@@ -100,6 +120,11 @@ def plot_video(
             Height of background. Defaults to None.
         width (Union[int, None], optional):
             Width of background. Defaults to None.
+        n_workers (int, optional):
+            Number of processes rendering frames. If > 1,
+            frame chunks are rendered in a process pool, each worker
+            with its own palette copies, and written in order.
+            Defaults to 1, render in the current process.
         disable_tqdm (bool, optional):
             Whether to disable tqdm progress bar.
             Defaults to False.
@@ -136,96 +161,157 @@ def plot_video(
         background_video
     ]
     data_len = check_data_len(data_list=data_to_check, logger=logger)
-    # init some var
-    video_writer = None
-    video_reader = None
-    arr_to_return = None
-    # to save time for list file and sort
-    file_names_cache = None
+    if return_generator and \
+            (return_array or array_buffer is not None):
+        logger.error('Argument return_generator cannot be used' +
+                     ' with return_array or array_buffer.')
+        raise ValueError
     # check whether to write video or write images
     if check_path_suffix(output_path, '.mp4'):
-        write_video = True
-        write_img = not write_video
-        fps = fps if fps is not None else 30.0
         if img_format is not None:
             logger.warning('Argument img_format is useless when' +
                            ' writing a video. To suppress this warning,' +
                            ' do not pass it.')
     else:
-        write_video = False
-        write_img = not write_video
-        img_format = img_format \
-            if img_format is not None \
-            else '%06d.png'
         if fps is not None:
             logger.warning('Argument fps is useless when' +
                            ' writing image files. To suppress this warning,' +
                            ' do not pass it.')
-    for frame_idx in tqdm(range(0, data_len), disable=disable_tqdm):
-        # prepare background array for this batch
-        if background_arr is not None:
-            background_sframe = background_arr[frame_idx, ...].copy()
-        elif background_dir is not None:
-            file_names_cache = file_names_cache \
-                if file_names_cache is not None \
-                else sorted(os.listdir(background_dir))
-            file_name = file_names_cache[frame_idx]
-            background_sframe = cv2.imread(
-                os.path.join(background_dir, file_name))
-        elif background_video is not None:
-            video_reader = video_reader \
-                if video_reader is not None \
-                else VideoReader(
-                    input_path=background_video,
-                    disable_log=True,
-                    logger=logger
-                )
-            background_sframe = video_reader.get_next_frame()
-        else:
-            background_sframe = np.zeros(
-                shape=(height, width, 3), dtype=np.uint8)
-        if point_palette is not None:
-            point_palette.set_point_array(mframe_point_data[frame_idx])
-            if mframe_point_mask is not None:
-                point_palette.set_point_mask(
-                    np.expand_dims(mframe_point_mask[frame_idx], -1))
-        if line_palette is not None:
-            line_palette.set_point_array(mframe_line_data[frame_idx])
-            if mframe_line_mask is not None:
-                line_palette.set_conn_mask(
-                    np.expand_dims(mframe_line_mask[frame_idx], -1))
-        result_sframe = plot_frame_opencv(
-            point_palette=point_palette,
-            line_palette=line_palette,
-            background_arr=background_sframe,
+    # list and sort file names only once
+    background_paths = [
+        os.path.join(background_dir, file_name)
+        for file_name in sorted(os.listdir(background_dir))
+    ] if background_dir is not None else None
+
+    # convert and validate multi-frame data only once
+    mframe_point_palette = MframePointPalette(
+        point_palette=point_palette,
+        mframe_point_array=mframe_point_data,
+        mframe_point_mask=mframe_point_mask,
+        logger=logger) if point_palette is not None else None
+    mframe_line_palette = MframeLinePalette(
+        line_palette=line_palette,
+        mframe_point_array=mframe_line_data,
+        mframe_conn_mask=mframe_line_mask,
+        logger=logger) if line_palette is not None else None
+
+    def get_chunk_kwargs(chunk_start: int, chunk_end: int) -> dict:
+        return dict(
+            mframe_point_palette=mframe_point_palette.slice_frames(
+                chunk_start, chunk_end)
+            if mframe_point_palette is not None else None,
+            mframe_line_palette=mframe_line_palette.slice_frames(
+                chunk_start, chunk_end)
+            if mframe_line_palette is not None else None,
+            background_arr=_slice_or_none(background_arr, chunk_start,
+                                          chunk_end),
+            background_paths=_slice_or_none(background_paths, chunk_start,
+                                            chunk_end),
+            background_video=background_video,
+            video_start=chunk_start,
+            video_end=chunk_end if chunk_end < data_len else None,
+            height=height,
+            width=width,
             logger=logger)
-        if write_img:
-            cv2.imwrite(
-                filename=os.path.join(output_path,
-                                      f'{img_format}' % frame_idx),
-                img=result_sframe)
-        if write_video:
-            video_writer = video_writer \
-                if video_writer is not None \
-                else VideoWriter(
-                    output_path=output_path,
-                    resolution=result_sframe.shape[:2],
-                    fps=fps,
-                    n_frames=data_len,
-                    disable_log=False,
-                    logger=logger
-                )
-            video_writer.write(result_sframe)
-        if return_array:
-            unsqueezed_sframe = np.expand_dims(result_sframe, axis=0)
-            arr_to_return = unsqueezed_sframe \
-                if arr_to_return is None \
-                else np.concatenate((arr_to_return, unsqueezed_sframe), axis=0)
-    if video_writer is not None:
-        video_writer.close()
-    if video_reader is not None:
-        video_reader.close()
-    return arr_to_return if return_array else None
+
+    if n_workers > 1:
+        sframe_iter = render_frames_in_order(
+            render_func=_plot_frames_to_array,
+            get_chunk_kwargs=get_chunk_kwargs,
+            data_len=data_len,
+            n_workers=n_workers)
+    else:
+        sframe_iter = _plot_frames(**get_chunk_kwargs(0, data_len))
+    frame_iter = write_frames(
+        sframe_iter=tqdm(sframe_iter, total=data_len, disable=disable_tqdm),
+        output_path=output_path,
+        data_len=data_len,
+        fps=fps,
+        img_format=img_format,
+        logger=logger)
+    if return_generator:
+        return frame_iter
+    return collect_frames(
+        sframe_iter=frame_iter,
+        data_len=data_len,
+        return_array=return_array,
+        array_buffer=array_buffer,
+        logger=logger)
+
+
+def _plot_frames(
+    mframe_point_palette: Union[MframePointPalette, None],
+    mframe_line_palette: Union[MframeLinePalette, None],
+    background_arr: Union[np.ndarray, None],
+    background_paths: Union[List[str], None],
+    background_video: Union[str, None],
+    video_start: int,
+    video_end: Union[int, None],
+    height: Union[int, None],
+    width: Union[int, None],
+    logger: Union[None, str, logging.Logger] = None
+) -> Generator[np.ndarray, None, None]:
+    """Plot a chunk of frames one by one. All the mframe and background args
+    have been sliced to the chunk, except background_video, which is read
+    from video_start to video_end.
+
+    Yields:
+        np.ndarray: A plotted frame in shape [h, w, 3].
+    """
+    data_len = check_data_len(
+        data_list=[
+            mframe_point_palette, mframe_line_palette, background_arr,
+            background_paths
+        ],
+        logger=logger)
+    video_reader = None
+    if background_video is not None:
+        video_reader = VideoReader(
+            input_path=background_video,
+            start=video_start,
+            end=video_end,
+            disable_log=True,
+            logger=logger)
+    try:
+        for frame_idx in range(data_len):
+            # prepare background array for this frame
+            if background_arr is not None:
+                background_sframe = background_arr[frame_idx, ...].copy()
+            elif background_paths is not None:
+                background_sframe = cv2.imread(background_paths[frame_idx])
+            elif video_reader is not None:
+                # frames from the pipe are read-only
+                background_sframe = video_reader.get_next_frame().copy()
+            else:
+                background_sframe = np.zeros(
+                    shape=(height, width, 3), dtype=np.uint8)
+            # per-frame views, no conversion or validation
+            point_palette = mframe_point_palette.get_frame(frame_idx) \
+                if mframe_point_palette is not None else None
+            line_palette = mframe_line_palette.get_frame(frame_idx) \
+                if mframe_line_palette is not None else None
+            yield plot_frame_opencv(
+                point_palette=point_palette,
+                line_palette=line_palette,
+                background_arr=background_sframe,
+                logger=logger)
+    finally:
+        if video_reader is not None:
+            video_reader.close()
+
+
+def _plot_frames_to_array(**kwargs) -> np.ndarray:
+    """Plot a chunk of frames in a worker process.
+
+    Returns:
+        np.ndarray: Plotted frames in shape [n_frame, h, w, 3].
+    """
+    return np.stack(list(_plot_frames(**kwargs)), axis=0)
+
+
+def _slice_or_none(data: Union[np.ndarray, list, None], start: int,
+                   end: int) -> Union[np.ndarray, list, None]:
+    return data[start:end] if data is not None else None
 
 
 def _check_background_src(background_arr: Union[np.ndarray, None],
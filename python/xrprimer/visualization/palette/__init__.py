@@ -5,6 +5,7 @@ import numpy as np
 
 from xrprimer.utils.log_utils import get_logger
 from .line_palette import LinePalette
+from .mframe_palette import MframeLinePalette, MframePointPalette
 from .point_palette import PointPalette
 
 try:
@@ -25,7 +26,10 @@ except (ImportError, ModuleNotFoundError):
     import_exception = traceback.format_exc() + '\n'
     import_exception = stack_str + import_exception
 
-__all__ = ['PointPalette', 'LinePalette', 'get_different_colors']
+__all__ = [
+    'PointPalette', 'LinePalette', 'MframePointPalette', 'MframeLinePalette',
+    'get_different_colors'
+]
 
 
 def get_different_colors(
@@ -0,0 +1,232 @@
+# yapf: disable
+import copy
+import logging
+from typing import TYPE_CHECKING, Union
+
+import numpy as np
+
+from xrprimer.utils.log_utils import get_logger
+from xrprimer.utils.visualization_utils import fix_arr_type
+from .line_palette import LinePalette
+from .point_palette import PointPalette
+
+if TYPE_CHECKING:
+    import torch
+# yapf: enable
+
+
+class MframePointPalette:
+    """A class for multi-frame point visualization.
+
+    Locations and visibility masks of all frames are kept in
+    [n_frame, n_point, ...] arrays, converted and validated once at
+    initialization. Per-frame palettes are cheap shallow copies of the
+    template palette, whose arrays are views of the multi-frame arrays.
+    """
+
+    def __init__(self,
+                 point_palette: PointPalette,
+                 mframe_point_array: Union[np.ndarray, 'torch.Tensor'],
+                 mframe_point_mask: Union[np.ndarray, 'torch.Tensor',
+                                          None] = None,
+                 logger: Union[None, str, logging.Logger] = None) -> None:
+        """
+        Args:
+            point_palette (PointPalette):
+                A template point palette, which keeps name and colors.
+                It is never modified.
+            mframe_point_array (Union[np.ndarray, torch.Tensor]):
+                Multi-frame point locations,
+                in shape [n_frame, n_point, location_dim].
+            mframe_point_mask (Union[np.ndarray, torch.Tensor, None],
+                    optional):
+                Multi-frame visibility mask of points,
+                in shape [n_frame, n_point] or [n_frame, n_point, 1].
+                Defaults to None, point_palette.point_mask for all frames.
+            logger (Union[None, str, logging.Logger], optional):
+                Logger for logging. If None, root logger will be selected.
+                Defaults to None.
+
+        Raises:
+            ValueError: Shape of mframe_point_array or mframe_point_mask
+                does not match point_palette.
+        """
+        self.logger = get_logger(logger)
+        self.palette = point_palette
+        # fill the bgr color cache, shared by all per-frame copies
+        self.palette.get_color_array_bgr()
+        self.point_array = _fix_mframe_array(
+            array=mframe_point_array,
+            array_name=f'{point_palette.name}\'s mframe_point_array',
+            n_elem=len(point_palette.point_array),
+            logger=self.logger)
+        self.point_mask = _fix_mframe_mask(
+            mask=mframe_point_mask,
+            array_name=f'{point_palette.name}\'s mframe_point_mask',
+            default_mask=point_palette.point_mask,
+            n_frame=len(self.point_array),
+            logger=self.logger)
+
+    def __len__(self) -> int:
+        return len(self.point_array)
+
+    def get_frame(self, frame_idx: int) -> PointPalette:
+        """Get the point palette of one frame, without copying or validating
+        arrays.
+
+        Args:
+            frame_idx (int):
+                Index of the frame.
+
+        Returns:
+            PointPalette:
+                A shallow copy of the template palette, whose
+                point_array and point_mask are views of this frame.
+        """
+        frame_palette = copy.copy(self.palette)
+        frame_palette.point_array = self.point_array[frame_idx]
+        frame_palette.point_mask = self.point_mask[frame_idx]
+        return frame_palette
+
+    def slice_frames(self, start: int, end: int) -> 'MframePointPalette':
+        """Get a multi-frame palette of frames in [start, end), sharing
+        memory with this one.
+
+        Args:
+            start (int):
+                Start frame index. Inclusive.
+            end (int):
+                End frame index. Exclusive.
+
+        Returns:
+            MframePointPalette: The sliced palette.
+        """
+        ret_palette = copy.copy(self)
+        ret_palette.point_array = self.point_array[start:end]
+        ret_palette.point_mask = self.point_mask[start:end]
+        return ret_palette
+
+
+class MframeLinePalette:
+    """A class for multi-frame line visualization.
+
+    Locations of line ends and visibility masks of lines of all frames are
+    kept in [n_frame, n_point, ...] and [n_frame, n_line] arrays, converted
+    and validated once at initialization. Per-frame palettes are cheap
+    shallow copies of the template palette, whose arrays are views of the
+    multi-frame arrays.
+    """
+
+    def __init__(self,
+                 line_palette: LinePalette,
+                 mframe_point_array: Union[np.ndarray, 'torch.Tensor'],
+                 mframe_conn_mask: Union[np.ndarray, 'torch.Tensor',
+                                         None] = None,
+                 logger: Union[None, str, logging.Logger] = None) -> None:
+        """
+        Args:
+            line_palette (LinePalette):
+                A template line palette, which keeps name, connections
+                and colors. It is never modified.
+            mframe_point_array (Union[np.ndarray, torch.Tensor]):
+                Multi-frame locations of line ends,
+                in shape [n_frame, n_point, location_dim].
+            mframe_conn_mask (Union[np.ndarray, torch.Tensor, None],
+                    optional):
+                Multi-frame visibility mask of lines,
+                in shape [n_frame, n_line] or [n_frame, n_line, 1].
+                Defaults to None, line_palette.conn_mask for all frames.
+            logger (Union[None, str, logging.Logger], optional):
+                Logger for logging. If None, root logger will be selected.
+                Defaults to None.
+
+        Raises:
+            ValueError: Shape of mframe_point_array or mframe_conn_mask
+                does not match line_palette.
+        """
+        self.logger = get_logger(logger)
+        self.palette = line_palette
+        # fill the bgr color cache, shared by all per-frame copies
+        self.palette.get_color_array_bgr()
+        self.point_array = _fix_mframe_array(
+            array=mframe_point_array,
+            array_name=f'{line_palette.name}\'s mframe_point_array',
+            n_elem=len(line_palette.point_array),
+            logger=self.logger)
+        self.conn_mask = _fix_mframe_mask(
+            mask=mframe_conn_mask,
+            array_name=f'{line_palette.name}\'s mframe_conn_mask',
+            default_mask=line_palette.conn_mask,
+            n_frame=len(self.point_array),
+            logger=self.logger)
+
+    def __len__(self) -> int:
+        return len(self.point_array)
+
+    def get_frame(self, frame_idx: int) -> LinePalette:
+        """Get the line palette of one frame, without copying or validating
+        arrays.
+
+        Args:
+            frame_idx (int):
+                Index of the frame.
+
+        Returns:
+            LinePalette:
+                A shallow copy of the template palette, whose
+                point_array and conn_mask are views of this frame.
+        """
+        frame_palette = copy.copy(self.palette)
+        frame_palette.point_array = self.point_array[frame_idx]
+        frame_palette.conn_mask = self.conn_mask[frame_idx]
+        return frame_palette
+
+    def slice_frames(self, start: int, end: int) -> 'MframeLinePalette':
+        """Get a multi-frame palette of frames in [start, end), sharing
+        memory with this one.
+
+        Args:
+            start (int):
+                Start frame index. Inclusive.
+            end (int):
+                End frame index. Exclusive.
+
+        Returns:
+            MframeLinePalette: The sliced palette.
+        """
+        ret_palette = copy.copy(self)
+        ret_palette.point_array = self.point_array[start:end]
+        ret_palette.conn_mask = self.conn_mask[start:end]
+        return ret_palette
+
+
+def _fix_mframe_array(array: Union[np.ndarray,
+                                   'torch.Tensor'], array_name: str,
+                      n_elem: int, logger: logging.Logger) -> np.ndarray:
+    """Convert a multi-frame array to ndarray, and check its shape."""
+    array = fix_arr_type(array)
+    if array.ndim != 3 or array.shape[1] != n_elem:
+        logger.error(f'{array_name} has a wrong shape!' +
+                     f' Expecting (n_frame, {n_elem}, d),' +
+                     f' getting {array.shape}.')
+        raise ValueError
+    return array
+
+
+def _fix_mframe_mask(mask: Union[np.ndarray, 'torch.Tensor', None],
+                     array_name: str, default_mask: np.ndarray, n_frame: int,
+                     logger: logging.Logger) -> np.ndarray:
+    """Convert a multi-frame mask to an uint8 ndarray in [n_frame, n_elem],
+    or broadcast default_mask to all frames without copying."""
+    n_elem = len(default_mask)
+    if mask is None:
+        return np.broadcast_to(default_mask, (n_frame, n_elem))
+    mask = fix_arr_type(mask)
+    if mask.ndim == 3 and mask.shape[-1] == 1:
+        mask = mask[..., 0]
+    if mask.shape != (n_frame, n_elem):
+        logger.error(f'{array_name} has a wrong shape!' +
+                     f' Expecting ({n_frame}, {n_elem}),' +
+                     f' getting {mask.shape}.')
+        raise ValueError
+    return mask.astype(np.uint8)
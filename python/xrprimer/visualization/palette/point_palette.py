@@ -142,6 +142,21 @@ class PointPalette:
             logger=self.logger)
         self.color_array = color_array.astype(np.uint8)
 
+    def get_color_array_bgr(self) -> np.ndarray:
+        """Get color_array in BGR for opencv. The converted array is cached
+        until color_array is replaced, do not modify color_array in place.
+
+        Returns:
+            np.ndarray: A read-only uint8 array of colors in BGR.
+        """
+        cache = getattr(self, '_bgr_color_cache', None)
+        if cache is None or cache[0] is not self.color_array:
+            color_array_bgr = np.ascontiguousarray(self.color_array[..., ::-1])
+            color_array_bgr.setflags(write=False)
+            cache = (self.color_array, color_array_bgr)
+            self._bgr_color_cache = cache
+        return cache[1]
+
     @classmethod
     def concatenate(
             cls,
@@ -0,0 +1,4 @@
+from .plot_frame import get_orbit_camera, plot_frame
+from .plot_video import plot_video
+
+__all__ = ['get_orbit_camera', 'plot_frame', 'plot_video']
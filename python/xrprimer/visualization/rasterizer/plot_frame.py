@@ -0,0 +1,394 @@
+import math
+from typing import Tuple, Union
+
+import cv2
+import numpy as np
+
+from xrprimer.utils.log_utils import get_logger, logging
+from xrprimer.visualization.palette.line_palette import LinePalette
+from xrprimer.visualization.palette.point_palette import PointPalette
+from ..matplotlib.plot_frame import _get_visual_range
+
+# fractional bits of pixel coordinates passed to cv2
+_SHIFT = 4
+_FLOOR_COLOR_BGR = (200, 200, 200)
+_BACKGROUND_VALUE = 255
+# points closer to the camera than this are not drawn
+_NEAR_DEPTH = 1e-6
+
+
+def plot_frame(point_palette: Union[PointPalette, None] = None,
+               line_palette: Union[LinePalette, None] = None,
+               visual_range: Union[None, np.ndarray] = None,
+               cam_latitude: float = 10.0,
+               cam_longtitude: float = 45.0,
+               linewidth: float = 2.0,
+               markersize: float = 5.0,
+               height: int = 480,
+               width: int = 640,
+               plot_floor: bool = True,
+               intrinsic: Union[np.ndarray, None] = None,
+               extrinsic_r: Union[np.ndarray, None] = None,
+               extrinsic_t: Union[np.ndarray, None] = None,
+               logger: Union[None, str, logging.Logger] = None) -> np.ndarray:
+    """Plot 1-frame 3D points and/or lines, projected by a virtual pinhole
+    camera and drawn with opencv. Lines and points are sorted by depth and
+    drawn from far to near, points above lines.
+
+    Args:
+        point_palette (Union[PointPalette, None], optional):
+            An instance of PointPalette. Location, color and
+            visibility are kept by point_palette.
+            Defaults to None, do not plot points.
+        line_palette (Union[LinePalette, None], optional):
+            An instance of LinePalette. Location, connection,
+            color and
+            visibility are kept by point_palette.
+            Defaults to None, do not plot lines.
+        visual_range (Union[None, np.ndarray], optional):
+            Visible range array whose shape is [3, 2],
+            ((x_min, x_max), (y_min, y_max), (z_min, z_max))
+            Defaults to None, calculated from visible data.
+        cam_latitude (float, optional):
+            Camera latitude in a polar coordinate system with
+            respect to the central of visual_range.
+            Defaults to 10.0.
+        cam_longtitude (float, optional):
+            Camera longtitude in a polar coordinate system with
+            respect to the central of visual_range.
+            Defaults to 45.0.
+        linewidth (float, optional):
+            Linewidth for lines, in pixels.
+            Defaults to 2.0.
+        markersize (float, optional):
+            Diameter of points, in pixels.
+            Defaults to 5.0.
+        height (int, optional):
+            Height of the plotted image.
+            Defaults to 480.
+        width (int, optional):
+            Width of the plotted image.
+            Defaults to 640.
+        plot_floor (bool, optional):
+            Whether to plot a grid at the bottom of visual_range.
+            Defaults to True.
+        intrinsic (Union[np.ndarray, None], optional):
+            Intrinsic of a pinhole camera to watch the data,
+            in shape [3, 3], opencv convention.
+            Defaults to None, a camera looking at the central of
+            visual_range from cam_latitude and cam_longtitude.
+        extrinsic_r (Union[np.ndarray, None], optional):
+            World2cam rotation of the camera, in shape [3, 3].
+            Required if intrinsic is not None.
+            Defaults to None.
+        extrinsic_t (Union[np.ndarray, None], optional):
+            World2cam translation of the camera, in shape [3].
+            Required if intrinsic is not None.
+            Defaults to None.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        RuntimeError: Neither point_palette nor line_palette is passed.
+        ValueError: intrinsic is passed without extrinsics.
+
+    Returns:
+        np.ndarray: The plotted image array, in shape [h, w, 3].
+    """
+    logger = get_logger(logger)
+    # check if input is valid
+    if point_palette is None and \
+            line_palette is None:
+        logger.error('To plot a frame, please offer either point_palette' +
+                     ' or line_palette, or both.')
+        raise RuntimeError
+    # confirm visual range
+    if visual_range is None:
+        points3d = []
+        if point_palette is not None:
+            valid_idxs = np.where(point_palette.point_mask != 0)[0]
+            points3d.append(point_palette.point_array[valid_idxs])
+        if line_palette is not None:
+            valid_idxs = np.where(line_palette.conn_mask != 0)[0]
+            valid_conn = line_palette.conn_array[valid_idxs]
+            points3d.append(line_palette.point_array[valid_conn.reshape(-1)])
+        visual_range = _get_visual_range(
+            points_array=np.concatenate(points3d, axis=0),
+            scale=1.1,
+            logger=logger)
+    if intrinsic is None:
+        intrinsic, extrinsic_r, extrinsic_t = get_orbit_camera(
+            visual_range=visual_range,
+            cam_latitude=cam_latitude,
+            cam_longtitude=cam_longtitude,
+            height=height,
+            width=width)
+    elif extrinsic_r is None or extrinsic_t is None:
+        logger.error('Please offer extrinsic_r and extrinsic_t' +
+                     ' with intrinsic.')
+        raise ValueError
+    kwargs = dict(height=height, width=width)
+    if point_palette is not None:
+        valid_idxs = np.where(point_palette.point_mask != 0)[0]
+        kwargs['point_pixels'], kwargs['point_depth'] = project_points(
+            points=point_palette.point_array[valid_idxs, :3],
+            intrinsic=intrinsic,
+            extrinsic_r=extrinsic_r,
+            extrinsic_t=extrinsic_t)
+        kwargs['point_colors'] = \
+            point_palette.get_color_array_bgr()[valid_idxs]
+    if line_palette is not None:
+        valid_idxs = np.where(line_palette.conn_mask != 0)[0]
+        segments = line_palette.point_array[
+            line_palette.conn_array[valid_idxs]][..., :3]
+        kwargs['line_pixels'], kwargs['line_depth'] = project_points(
+            points=segments,
+            intrinsic=intrinsic,
+            extrinsic_r=extrinsic_r,
+            extrinsic_t=extrinsic_t)
+        kwargs['line_colors'] = \
+            line_palette.get_color_array_bgr()[valid_idxs]
+    if plot_floor:
+        kwargs['floor_pixels'], kwargs['floor_depth'] = project_points(
+            points=_get_floor_segments(visual_range),
+            intrinsic=intrinsic,
+            extrinsic_r=extrinsic_r,
+            extrinsic_t=extrinsic_t)
+    return _rasterize(linewidth=linewidth, markersize=markersize, **kwargs)
+
+
+def get_orbit_camera(
+        visual_range: np.ndarray,
+        cam_latitude: float = 10.0,
+        cam_longtitude: float = 45.0,
+        height: int = 480,
+        width: int = 640,
+        fov: float = 30.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get a pinhole camera on an orbit around visual_range, looking at the
+    central of visual_range with z axis up, like the view of a matplotlib 3D
+    axes. The whole visual_range is inside the view.
+
+    Args:
+        visual_range (np.ndarray):
+            Visible range array whose shape is [3, 2].
+        cam_latitude (float, optional):
+            Camera latitude in degrees. Defaults to 10.0.
+        cam_longtitude (float, optional):
+            Camera longtitude in degrees. Defaults to 45.0.
+        height (int, optional):
+            Height of the image. Defaults to 480.
+        width (int, optional):
+            Width of the image. Defaults to 640.
+        fov (float, optional):
+            Field of view on the shorter image side, in degrees.
+            Defaults to 30.0.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            Intrinsic in shape [3, 3], world2cam rotation
+            in shape [3, 3] and translation in shape [3],
+            in opencv convention.
+    """
+    visual_range = np.asarray(visual_range, dtype=np.float64)
+    center = visual_range.mean(axis=1)
+    radius = max(
+        np.linalg.norm(visual_range[:, 1] - visual_range[:, 0]) / 2.0, 1e-6)
+    half_fov = math.radians(fov) / 2.0
+    latitude = math.radians(cam_latitude)
+    longtitude = math.radians(cam_longtitude)
+    direction = np.array(
+        (math.cos(latitude) * math.cos(longtitude),
+         math.cos(latitude) * math.sin(longtitude), math.sin(latitude)))
+    # the bounding sphere of visual_range fits the view
+    eye = center + direction * radius / math.sin(half_fov)
+    forward = -direction
+    right = np.array((-math.sin(longtitude), math.cos(longtitude), 0.0))
+    down = np.cross(forward, right)
+    extrinsic_r = np.stack((right, down, forward), axis=0)
+    extrinsic_t = -extrinsic_r @ eye
+    focal = min(height, width) / 2.0 / math.tan(half_fov)
+    intrinsic = np.array(((focal, 0.0, width / 2.0),
+                          (0.0, focal, height / 2.0), (0.0, 0.0, 1.0)))
+    return intrinsic, extrinsic_r, extrinsic_t
+
+
+def _get_floor_segments(visual_range: np.ndarray,
+                        n_grid: int = 10) -> np.ndarray:
+    """Get line segments of a grid at the bottom(z_min) of visual_range.
+
+    Args:
+        visual_range (np.ndarray):
+            Visible range array whose shape is [3, 2].
+        n_grid (int, optional):
+            Number of cells on each side. Defaults to 10.
+
+    Returns:
+        np.ndarray: Segments in shape [2 * (n_grid + 1), 2, 3].
+    """
+    x_min, x_max = visual_range[0]
+    y_min, y_max = visual_range[1]
+    z_floor = visual_range[2][0]
+    x_ticks = np.linspace(x_min, x_max, n_grid + 1)
+    y_ticks = np.linspace(y_min, y_max, n_grid + 1)
+    segments = np.full(shape=(2, n_grid + 1, 2, 3), fill_value=z_floor)
+    # lines along y axis
+    segments[0, :, :, 0] = x_ticks[:, None]
+    segments[0, :, 0, 1] = y_min
+    segments[0, :, 1, 1] = y_max
+    # lines along x axis
+    segments[1, :, :, 1] = y_ticks[:, None]
+    segments[1, :, 0, 0] = x_min
+    segments[1, :, 1, 0] = x_max
+    return segments.reshape(-1, 2, 3)
+
+
+def project_points(points: np.ndarray, intrinsic: np.ndarray,
+                   extrinsic_r: np.ndarray,
+                   extrinsic_t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Project points by pinhole cameras without distortion. Leading
+    dimensions of points are broadcast against the cameras, so that points
+    of many frames can be projected by their own cameras in one call.
+
+    Args:
+        points (np.ndarray):
+            Points in shape [..., n_point, 3] or [n_frame, ..., 3].
+            When cameras are batched in [n_frame], the first
+            dimension of points shall be n_frame.
+        intrinsic (np.ndarray):
+            Intrinsic in shape [3, 3] or [n_frame, 3, 3].
+        extrinsic_r (np.ndarray):
+            World2cam rotation in shape [3, 3] or [n_frame, 3, 3].
+        extrinsic_t (np.ndarray):
+            World2cam translation in shape [3] or [n_frame, 3].
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]:
+            Pixel locations in shape [..., 2] and
+            depth in camera space in shape [...].
+    """
+    points = np.asarray(points, dtype=np.float64)
+    intrinsic = np.asarray(intrinsic, dtype=np.float64)
+    extrinsic_r = np.asarray(extrinsic_r, dtype=np.float64)
+    extrinsic_t = np.asarray(extrinsic_t, dtype=np.float64)
+    # align batched cameras with the first dimension of points
+    n_extra_dim = points.ndim - 2 - (extrinsic_r.ndim - 2)
+    cam_shape = extrinsic_r.shape[:-2] + (1, ) * n_extra_dim
+    extrinsic_r = extrinsic_r.reshape(cam_shape + (3, 3))
+    extrinsic_t = extrinsic_t.reshape(cam_shape + (1, 3))
+    intrinsic = intrinsic.reshape(cam_shape + (3, 3))
+    points_cam = np.matmul(points, np.swapaxes(extrinsic_r, -1,
+                                               -2)) + extrinsic_t
+    depth = points_cam[..., 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        uv = points_cam[..., :2] / depth[..., None]
+    pixels = np.matmul(uv, np.swapaxes(intrinsic[..., :2, :2], -1, -2)) + \
+        intrinsic[..., None, :2, 2]
+    return pixels, depth
+
+
+def _rasterize(height: int,
+               width: int,
+               point_pixels: Union[np.ndarray, None] = None,
+               point_depth: Union[np.ndarray, None] = None,
+               point_colors: Union[np.ndarray, None] = None,
+               line_pixels: Union[np.ndarray, None] = None,
+               line_depth: Union[np.ndarray, None] = None,
+               line_colors: Union[np.ndarray, None] = None,
+               floor_pixels: Union[np.ndarray, None] = None,
+               floor_depth: Union[np.ndarray, None] = None,
+               linewidth: float = 2.0,
+               markersize: float = 5.0) -> np.ndarray:
+    """Draw projected points and lines on a white canvas. The floor is drawn
+    first, then lines and points sorted from far to near.
+
+    Args:
+        height (int):
+            Height of the canvas.
+        width (int):
+            Width of the canvas.
+        point_pixels (Union[np.ndarray, None], optional):
+            Pixel locations of visible points, in shape [n_point, 2].
+            Defaults to None.
+        point_depth (Union[np.ndarray, None], optional):
+            Depth of visible points, in shape [n_point].
+            Defaults to None.
+        point_colors (Union[np.ndarray, None], optional):
+            BGR colors of visible points, in shape [n_point, 3].
+            Defaults to None.
+        line_pixels (Union[np.ndarray, None], optional):
+            Pixel locations of visible line ends,
+            in shape [n_line, 2, 2]. Defaults to None.
+        line_depth (Union[np.ndarray, None], optional):
+            Depth of visible line ends, in shape [n_line, 2].
+            Defaults to None.
+        line_colors (Union[np.ndarray, None], optional):
+            BGR colors of visible lines, in shape [n_line, 3].
+            Defaults to None.
+        floor_pixels (Union[np.ndarray, None], optional):
+            Pixel locations of floor line ends,
+            in shape [n_floor_line, 2, 2]. Defaults to None.
+        floor_depth (Union[np.ndarray, None], optional):
+            Depth of floor line ends, in shape [n_floor_line, 2].
+            Defaults to None.
+        linewidth (float, optional):
+            Linewidth for lines, in pixels. Defaults to 2.0.
+        markersize (float, optional):
+            Diameter of points, in pixels. Defaults to 5.0.
+
+    Returns:
+        np.ndarray: The plotted image array, in shape [h, w, 3].
+    """
+    canvas = np.full(
+        shape=(height, width, 3), fill_value=_BACKGROUND_VALUE, dtype=np.uint8)
+    thickness = max(int(round(linewidth)), 1)
+    if floor_pixels is not None:
+        floor_pixels, _ = _sort_by_depth(floor_pixels, floor_depth)
+        for start, end in floor_pixels.tolist():
+            cv2.line(canvas, start, end, _FLOOR_COLOR_BGR, 1, cv2.LINE_AA,
+                     _SHIFT)
+    if line_pixels is not None:
+        line_pixels, line_colors = _sort_by_depth(line_pixels, line_depth,
+                                                  line_colors)
+        for (start, end), color in zip(line_pixels.tolist(),
+                                       line_colors.tolist()):
+            cv2.line(canvas, start, end, color, thickness, cv2.LINE_AA, _SHIFT)
+    if point_pixels is not None:
+        radius = max(int(round(markersize / 2.0 * (1 << _SHIFT))), 1)
+        point_pixels, point_colors = _sort_by_depth(point_pixels, point_depth,
+                                                    point_colors)
+        for center, color in zip(point_pixels.tolist(), point_colors.tolist()):
+            cv2.circle(canvas, center, radius, color, -1, cv2.LINE_AA, _SHIFT)
+    return canvas
+
+
+def _sort_by_depth(
+        pixels: np.ndarray,
+        depth: np.ndarray,
+        colors: Union[np.ndarray, None] = None) -> Tuple[np.ndarray, ...]:
+    """Drop elements behind the camera or not finite, sort the others from
+    far to near, and convert pixels to fixed-point integers for cv2.
+
+    Args:
+        pixels (np.ndarray):
+            Pixel locations in shape [n, 2] or [n, k, 2].
+        depth (np.ndarray):
+            Depth in shape [n] or [n, k].
+        colors (Union[np.ndarray, None], optional):
+            Colors in shape [n, 3]. Defaults to None.
+
+    Returns:
+        Tuple[np.ndarray, ...]: Sorted pixels in int32, and sorted colors.
+    """
+    if depth.ndim == 1:
+        depth = depth[:, None]
+    valid = np.all(depth > _NEAR_DEPTH, axis=1) & \
+        np.all(np.isfinite(pixels), axis=tuple(range(1, pixels.ndim)))
+    order = np.where(valid)[0]
+    order = order[np.argsort(-depth[order].mean(axis=1), kind='stable')]
+    # keep fixed-point coordinates far inside the int32 range
+    limit = float(1 << (30 - _SHIFT))
+    fixed_pixels = np.round(
+        np.clip(pixels[order], -limit, limit) * (1 << _SHIFT)).astype(np.int32)
+    colors = colors[order] if colors is not None else None
+    return fixed_pixels, colors
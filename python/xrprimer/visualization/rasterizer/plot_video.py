@@ -0,0 +1,382 @@
+# yapf: disable
+from typing import Generator, Union
+
+import numpy as np
+from tqdm import tqdm
+
+from xrprimer.utils.log_utils import get_logger, logging
+from xrprimer.utils.path_utils import check_path_suffix
+from xrprimer.utils.visualization_utils import (
+    check_data_len,
+    check_mframe_data_src,
+    check_output_path,
+    collect_frames,
+    render_frames_in_order,
+    write_frames,
+)
+from ..matplotlib.plot_frame import _get_visual_range
+from ..matplotlib.plot_video import _get_camera_positions, _get_mframe_points3d
+from ..palette.line_palette import LinePalette
+from ..palette.mframe_palette import MframeLinePalette, MframePointPalette
+from ..palette.point_palette import PointPalette
+from .plot_frame import (
+    _get_floor_segments,
+    _rasterize,
+    get_orbit_camera,
+    project_points,
+)
+
+# yapf: enable
+
+
+def plot_video(
+    # output args
+    output_path: str,
+    overwrite: bool = True,
+    return_array: bool = False,
+    array_buffer: Union[np.ndarray, None] = None,
+    return_generator: bool = False,
+    # conditional output args
+    fps: Union[float, None] = None,
+    img_format: Union[str, None] = None,
+    # plot args
+    visual_range: Union[None, np.ndarray] = None,
+    visual_range_percentile: float = 0.0,
+    mframe_point_data: Union[np.ndarray, None] = None,
+    mframe_line_data: Union[np.ndarray, None] = None,
+    mframe_point_mask: Union[np.ndarray, None] = None,
+    mframe_line_mask: Union[np.ndarray, None] = None,
+    point_palette: Union[PointPalette, None] = None,
+    line_palette: Union[LinePalette, None] = None,
+    height: int = 480,
+    width: int = 640,
+    linewidth: float = 2.0,
+    markersize: float = 5.0,
+    plot_floor: bool = True,
+    intrinsics: Union[np.ndarray, None] = None,
+    extrinsic_rs: Union[np.ndarray, None] = None,
+    extrinsic_ts: Union[np.ndarray, None] = None,
+    # parallel args
+    n_workers: int = 1,
+    # verbose args
+    disable_tqdm: bool = False,
+    logger: Union[None, str, logging.Logger] = None
+) -> Union[np.ndarray, Generator[np.ndarray, None, None], None]:
+    """Plot a video(or a number of images) of 3D points and lines, with a
+    software rasterizer. Data are projected by virtual pinhole cameras on an
+    orbit, the same orbit as the matplotlib backend, and drawn with opencv.
+    No GPU or display is required, and it is orders of magnitude faster than
+    the matplotlib backend. For plot args, please offer either points or
+    lines, or both.
+
+    Args:
+        output_path (str):
+            Path to the output mp4 video file or image directory.
+        overwrite (bool, optional):
+            Whether to overwrite the file at output_path.
+            Defaults to True.
+        return_array (bool, optional):
+            Whether to return the video array. If True,
+            please make sure your RAM is enough for the video.
+            Defaults to False, return None.
+        array_buffer (Union[np.ndarray, None], optional):
+            A preallocated array, or a np.memmap for videos
+            larger than RAM, in shape [n_frame, height, width, 3].
+            If not None, plotted frames are written into it
+            and it is returned.
+            Defaults to None, allocate an array if return_array.
+        return_generator (bool, optional):
+            Whether to return a generator yielding the plotted
+            frames lazily. Frames are rendered and written to
+            output_path while the generator is consumed.
+            Cannot be used with return_array or array_buffer.
+            Defaults to False.
+        fps (Union[float, None], optional):
+            Frames per second for the output video.
+            Defaults to None, 30 fps when writing a video.
+        img_format (Union[str, None], optional):
+            Name format for the output image file.
+            Defaults to None, `%06d.png` when writing images.
+        visual_range (Union[None, np.ndarray], optional):
+            Visible range array whose shape is [3, 2],
+            ((x_min, x_max), (y_min, y_max), (z_min, z_max))
+            Defaults to None, calculated from data whose mask==1.
+        visual_range_percentile (float, optional):
+            When visual_range is None, percentile of points
+            ignored at both ends of each axis, in [0, 50).
+            Defaults to 0.0, covering all visible points.
+        mframe_point_data (Union[np.ndarray, None], optional):
+            Multi-frame point data,
+            in shape [n_frame, n_point, 3].
+            Defaults to None.
+        mframe_line_data (Union[np.ndarray, None], optional):
+            Multi-frame line data, locations for line ends,
+            in shape [n_frame, n_point, 3].
+            Defaults to None.
+        mframe_point_mask (Union[np.ndarray, None], optional):
+            Visibility mask of multi-frame point data,
+            in shape [n_frame, n_point].
+            Defaults to None.
+        mframe_line_mask (Union[np.ndarray, None], optional):
+            Visibility mask of multi-frame line data,
+            in shape [n_frame, n_line].
+            Defaults to None.
+        point_palette (Union[PointPalette, None], optional):
+            An instance of PointPalette. Color and
+            visibility are kept by point_palette.
+            Defaults to None, do not plot points.
+        line_palette (Union[LinePalette, None], optional):
+            An instance of LinePalette. Connection,
+            color and
+            visibility are kept by point_palette.
+            Defaults to None, do not plot lines.
+        height (int, optional):
+            Height of the video. Defaults to 480.
+        width (int, optional):
+            Width of the video. Defaults to 640.
+        linewidth (float, optional):
+            Linewidth for lines, in pixels.
+            Defaults to 2.0.
+        markersize (float, optional):
+            Diameter of points, in pixels.
+            Defaults to 5.0.
+        plot_floor (bool, optional):
+            Whether to plot a grid at the bottom of visual_range.
+            Defaults to True.
+        intrinsics (Union[np.ndarray, None], optional):
+            Intrinsics of pinhole cameras to watch the data,
+            in opencv convention, one for all frames in shape [3, 3]
+            or one for each frame in shape [n_frame, 3, 3].
+            Defaults to None, cameras on an orbit around visual_range.
+        extrinsic_rs (Union[np.ndarray, None], optional):
+            World2cam rotations of the cameras,
+            in shape [3, 3] or [n_frame, 3, 3].
+            Required if intrinsics is not None.
+            Defaults to None.
+        extrinsic_ts (Union[np.ndarray, None], optional):
+            World2cam translations of the cameras,
+            in shape [3] or [n_frame, 3].
+            Required if intrinsics is not None.
+            Defaults to None.
+        n_workers (int, optional):
+            Number of processes rendering frames. If > 1,
+            frame chunks are rendered in a process pool and
+            written in order.
+            Defaults to 1, render in the current process.
+        disable_tqdm (bool, optional):
+            Whether to disable tqdm progress bar.
+            Defaults to False.
+        logger (Union[None, str, logging.Logger], optional):
+            Logger for logging. If None, root logger will be selected.
+            Defaults to None.
+
+    Raises:
+        ValueError: return_generator is used with return_array
+            or array_buffer.
+        ValueError: intrinsics is passed without extrinsics.
+
+    Returns:
+        Union[np.ndarray, Generator[np.ndarray, None, None], None]:
+            Plotted multi-frame image array, a generator of frames,
+            or None.
+    """
+    logger = get_logger(logger)
+    # check parent and whether to overwrite
+    check_output_path(
+        output_path=output_path, overwrite=overwrite, logger=logger)
+    # check if no fewer than one mframe data source
+    check_mframe_data_src(
+        mframe_point_data=mframe_point_data,
+        mframe_line_data=mframe_line_data,
+        logger=logger)
+    data_to_check = [
+        mframe_point_data,
+        mframe_line_data,
+    ]
+    data_len = check_data_len(data_list=data_to_check, logger=logger)
+    if return_generator and \
+            (return_array or array_buffer is not None):
+        logger.error('Argument return_generator cannot be used' +
+                     ' with return_array or array_buffer.')
+        raise ValueError
+    # check whether to write video or write images
+    if check_path_suffix(output_path, '.mp4'):
+        if img_format is not None:
+            logger.warning('Argument img_format is useless when' +
+                           ' writing a video. To suppress this warning,' +
+                           ' do not pass it.')
+    else:
+        if fps is not None:
+            logger.warning('Argument fps is useless when' +
+                           ' writing image files. To suppress this warning,' +
+                           ' do not pass it.')
+    # convert and validate multi-frame data only once
+    mframe_point_palette = MframePointPalette(
+        point_palette=point_palette,
+        mframe_point_array=mframe_point_data,
+        mframe_point_mask=mframe_point_mask,
+        logger=logger) if point_palette is not None else None
+    mframe_line_palette = MframeLinePalette(
+        line_palette=line_palette,
+        mframe_point_array=mframe_line_data,
+        mframe_conn_mask=mframe_line_mask,
+        logger=logger) if line_palette is not None else None
+    # auto visual_range if None
+    if visual_range is None:
+        points3d = _get_mframe_points3d(
+            mframe_point_data=mframe_point_data
+            if point_palette is not None else None,
+            mframe_point_mask=mframe_point_mask,
+            mframe_line_data=mframe_line_data
+            if line_palette is not None else None,
+            mframe_line_mask=mframe_line_mask,
+            conn_array=line_palette.conn_array
+            if line_palette is not None else None)
+        visual_range = _get_visual_range(
+            points_array=points3d,
+            scale=1.1,
+            percentile=visual_range_percentile,
+            logger=logger)
+    # cameras of all frames, stacked in [n_frame, ...]
+    if intrinsics is None:
+        krt_list = [
+            get_orbit_camera(
+                visual_range=visual_range,
+                cam_latitude=latitude,
+                cam_longtitude=longtitude,
+                height=height,
+                width=width) for latitude, longtitude in _get_camera_positions(
+                    n_frames=data_len)
+        ]
+        intrinsics, extrinsic_rs, extrinsic_ts = [
+            np.stack(arrays, axis=0) for arrays in zip(*krt_list)
+        ]
+    elif extrinsic_rs is None or extrinsic_ts is None:
+        logger.error('Please offer extrinsic_rs and extrinsic_ts' +
+                     ' with intrinsics.')
+        raise ValueError
+    else:
+        intrinsics = np.broadcast_to(intrinsics, (data_len, 3, 3))
+        extrinsic_rs = np.broadcast_to(extrinsic_rs, (data_len, 3, 3))
+        extrinsic_ts = np.broadcast_to(
+            np.asarray(extrinsic_ts).reshape(-1, 3), (data_len, 3))
+    floor_segments = _get_floor_segments(visual_range) \
+        if plot_floor else None
+
+    def get_chunk_kwargs(chunk_start: int, chunk_end: int) -> dict:
+        return dict(
+            mframe_point_palette=mframe_point_palette.slice_frames(
+                chunk_start, chunk_end)
+            if mframe_point_palette is not None else None,
+            mframe_line_palette=mframe_line_palette.slice_frames(
+                chunk_start, chunk_end)
+            if mframe_line_palette is not None else None,
+            intrinsics=intrinsics[chunk_start:chunk_end],
+            extrinsic_rs=extrinsic_rs[chunk_start:chunk_end],
+            extrinsic_ts=extrinsic_ts[chunk_start:chunk_end],
+            floor_segments=floor_segments,
+            height=height,
+            width=width,
+            linewidth=linewidth,
+            markersize=markersize)
+
+    if n_workers > 1:
+        sframe_iter = render_frames_in_order(
+            render_func=_plot_frames_to_array,
+            get_chunk_kwargs=get_chunk_kwargs,
+            data_len=data_len,
+            n_workers=n_workers)
+    else:
+        sframe_iter = _plot_frames(**get_chunk_kwargs(0, data_len))
+    frame_iter = write_frames(
+        sframe_iter=tqdm(sframe_iter, total=data_len, disable=disable_tqdm),
+        output_path=output_path,
+        data_len=data_len,
+        fps=fps,
+        img_format=img_format,
+        logger=logger)
+    if return_generator:
+        return frame_iter
+    return collect_frames(
+        sframe_iter=frame_iter,
+        data_len=data_len,
+        return_array=return_array,
+        array_buffer=array_buffer,
+        logger=logger)
+
+
+def _plot_frames(
+    mframe_point_palette: Union[MframePointPalette, None],
+    mframe_line_palette: Union[MframeLinePalette, None],
+    intrinsics: np.ndarray,
+    extrinsic_rs: np.ndarray,
+    extrinsic_ts: np.ndarray,
+    floor_segments: Union[np.ndarray, None],
+    height: int,
+    width: int,
+    linewidth: float,
+    markersize: float,
+) -> Generator[np.ndarray, None, None]:
+    """Plot a chunk of frames one by one. All the mframe palettes and cameras
+    have been sliced to the chunk. Data of the whole chunk are projected in
+    one batch before drawing.
+
+    Yields:
+        np.ndarray: A plotted frame in shape [h, w, 3].
+    """
+    n_frame = len(intrinsics)
+    cameras = dict(
+        intrinsic=intrinsics,
+        extrinsic_r=extrinsic_rs,
+        extrinsic_t=extrinsic_ts)
+    if mframe_point_palette is not None:
+        # [n_frame, n_point, 2], [n_frame, n_point]
+        point_pixels, point_depth = project_points(
+            points=mframe_point_palette.point_array[..., :3], **cameras)
+        point_colors = mframe_point_palette.palette.get_color_array_bgr()
+        mframe_point_valid = mframe_point_palette.point_mask != 0
+    if mframe_line_palette is not None:
+        conn_array = mframe_line_palette.palette.conn_array
+        n_line = len(conn_array)
+        # [n_frame, n_line * 2, 3] -> [n_frame, n_line, 2, 2]
+        mframe_line_ends = mframe_line_palette.point_array
+        line_ends = mframe_line_ends[:, conn_array.reshape(-1), :3]
+        line_pixels, line_depth = project_points(points=line_ends, **cameras)
+        line_pixels = line_pixels.reshape(n_frame, n_line, 2, 2)
+        line_depth = line_depth.reshape(n_frame, n_line, 2)
+        line_colors = mframe_line_palette.palette.get_color_array_bgr()
+        mframe_line_valid = mframe_line_palette.conn_mask != 0
+    if floor_segments is not None:
+        n_floor_line = len(floor_segments)
+        floor_pixels, floor_depth = project_points(
+            points=np.broadcast_to(
+                floor_segments.reshape(1, -1, 3),
+                (n_frame, n_floor_line * 2, 3)),
+            **cameras)
+        floor_pixels = floor_pixels.reshape(n_frame, n_floor_line, 2, 2)
+        floor_depth = floor_depth.reshape(n_frame, n_floor_line, 2)
+    for frame_idx in range(n_frame):
+        kwargs = dict(height=height, width=width)
+        if mframe_point_palette is not None:
+            valid = mframe_point_valid[frame_idx]
+            kwargs['point_pixels'] = point_pixels[frame_idx][valid]
+            kwargs['point_depth'] = point_depth[frame_idx][valid]
+            kwargs['point_colors'] = point_colors[valid]
+        if mframe_line_palette is not None:
+            valid = mframe_line_valid[frame_idx]
+            kwargs['line_pixels'] = line_pixels[frame_idx][valid]
+            kwargs['line_depth'] = line_depth[frame_idx][valid]
+            kwargs['line_colors'] = line_colors[valid]
+        if floor_segments is not None:
+            kwargs['floor_pixels'] = floor_pixels[frame_idx]
+            kwargs['floor_depth'] = floor_depth[frame_idx]
+        yield _rasterize(linewidth=linewidth, markersize=markersize, **kwargs)
+
+
+def _plot_frames_to_array(**kwargs) -> np.ndarray:
+    """Plot a chunk of frames in a worker process.
+
+    Returns:
+        np.ndarray: Plotted frames in shape [n_frame, h, w, 3].
+    """
+    return np.stack(list(_plot_frames(**kwargs)), axis=0)